@@ -0,0 +1,41 @@
+"""add customer_id, account_id and created_at indexes
+
+Revision ID: 5e1f3a7b9d24
+Revises: 9c2d5e7f1a38
+Create Date: 2026-10-17 14:26:09.731452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f3a7b9d24'
+down_revision: Union[str, None] = '9c2d5e7f1a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # messages.chat_id уже покрыт ix_messages_chat_id_created_at
+    op.create_index(op.f('ix_accounts_customer_id'), 'accounts', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_cards_account_id'), 'cards', ['account_id'], unique=False)
+    op.create_index(op.f('ix_loans_customer_id'), 'loans', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_chats_customer_id'), 'chats', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_transactions_created_at'), 'transactions', ['created_at'], unique=False)
+    op.create_index(op.f('ix_loan_applications_created_at'), 'loan_applications', ['created_at'], unique=False)
+    op.create_index('ix_loan_applications_customer_id_created_at', 'loan_applications', ['customer_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_card_applications_created_at'), 'card_applications', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_card_applications_created_at'), table_name='card_applications')
+    op.drop_index('ix_loan_applications_customer_id_created_at', table_name='loan_applications')
+    op.drop_index(op.f('ix_loan_applications_created_at'), table_name='loan_applications')
+    op.drop_index(op.f('ix_transactions_created_at'), table_name='transactions')
+    op.drop_index(op.f('ix_chats_customer_id'), table_name='chats')
+    op.drop_index(op.f('ix_loans_customer_id'), table_name='loans')
+    op.drop_index(op.f('ix_cards_account_id'), table_name='cards')
+    op.drop_index(op.f('ix_accounts_customer_id'), table_name='accounts')
@@ -0,0 +1,33 @@
+"""transactions covering (account_id, created_at) indexes
+
+Revision ID: 9c2d5e7f1a38
+Revises: 4b7e2a91c3d5
+Create Date: 2026-10-17 11:02:47.518903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2d5e7f1a38'
+down_revision: Union[str, None] = '4b7e2a91c3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Новые индексы начинаются с account_id, поэтому полностью заменяют одноколоночные
+    op.create_index('ix_transactions_from_account_id_created_at', 'transactions', ['from_account_id', 'created_at', 'currency', 'amount'], unique=False)
+    op.create_index('ix_transactions_to_account_id_created_at', 'transactions', ['to_account_id', 'created_at', 'currency', 'amount'], unique=False)
+    op.drop_index(op.f('ix_transactions_to_account_id'), table_name='transactions')
+    op.drop_index(op.f('ix_transactions_from_account_id'), table_name='transactions')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_transactions_from_account_id'), 'transactions', ['from_account_id'], unique=False)
+    op.create_index(op.f('ix_transactions_to_account_id'), 'transactions', ['to_account_id'], unique=False)
+    op.drop_index('ix_transactions_to_account_id_created_at', table_name='transactions')
+    op.drop_index('ix_transactions_from_account_id_created_at', table_name='transactions')
@@ -0,0 +1,27 @@
+"""add customers created_at index
+
+Revision ID: b3d8f0c6a417
+Revises: 5e1f3a7b9d24
+Create Date: 2026-10-17 16:48:31.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8f0c6a417'
+down_revision: Union[str, None] = '5e1f3a7b9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Список клиентов в админке листается курсором по (created_at, id)
+    op.create_index(op.f('ix_customers_created_at'), 'customers', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_customers_created_at'), table_name='customers')
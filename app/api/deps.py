@@ -1,9 +1,8 @@
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.base import get_session
+from app.db.base import get_session, get_read_session
 from typing import Optional
-from app.db.repositories.customer_repository import CustomerRepository
-from app.db.repositories.employee_repository import EmployeeRepository
+from app.services.principal_cache import get_customer_principal, get_employee_principal
 
 SESSION_KEY = "user_id"
 EMPLOYEE_SESSION_KEY = "employee_id"
@@ -12,11 +11,16 @@ async def get_db_session():
     async for s in get_session():
         yield s
 
+async def get_read_db_session():
+    """Session for read-only endpoints: reads go to the replica if one is configured."""
+    async for s in get_read_session():
+        yield s
+
 async def get_current_customer(request: Request, session: AsyncSession = Depends(get_db_session)):
     uid = request.session.get(SESSION_KEY)
     if not uid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
-    user = await CustomerRepository(session).get_by_id(int(uid))
+    user = await get_customer_principal(session, int(uid))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -28,14 +32,14 @@ async def get_optional_customer(
     uid = request.session.get(SESSION_KEY)
     if not uid:
         return None
-    user = await CustomerRepository(session).get_by_id(int(uid))
+    user = await get_customer_principal(session, int(uid))
     return user 
 
 async def get_current_employee(request: Request, session: AsyncSession = Depends(get_db_session)):
     employee_data = request.session.get(EMPLOYEE_SESSION_KEY)
     if not employee_data or not isinstance(employee_data, dict) or "id" not in employee_data or "role" not in employee_data:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Employee authentication required")
-    employee = await EmployeeRepository(session).get_by_id(int(employee_data["id"]))
+    employee = await get_employee_principal(session, int(employee_data["id"]))
     if not employee:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Employee not found")
     if employee.role.value != employee_data["role"]:
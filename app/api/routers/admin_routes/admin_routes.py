@@ -3,7 +3,7 @@ from starlette.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.api.deps import get_db_session, get_current_employee, EMPLOYEE_SESSION_KEY
+from app.api.deps import get_db_session, get_read_db_session, get_current_employee, EMPLOYEE_SESSION_KEY
 from app.schemas.auth_schemas import EmplyeeLoginRequest, EmplyeeOut
 from app.services.admin_services.auth_service import AuthService
 from app.services.customer_services.customer_service import CustomerService
@@ -11,6 +11,7 @@ from app.schemas.customer_schemas import CustomerRead, PaginatedItems, AccountRe
 from app.services.admin_services.employee_service import EmployeeService
 from app.db.models import EmployeeRole, Employee
 from app.schemas.employee_schemas import EmployeeRead, EmployeeCreate, PaginatedEmployees
+from app.services.principal_cache import invalidate_employee_principal
 
 import logging
 
@@ -29,7 +30,9 @@ async def login(payload: EmplyeeLoginRequest, request: Request, session: AsyncSe
 
 @router.post("/logout")
 async def logout(request: Request):
-    request.session.pop(EMPLOYEE_SESSION_KEY, None)
+    employee_data = request.session.pop(EMPLOYEE_SESSION_KEY, None)
+    if isinstance(employee_data, dict) and "id" in employee_data:
+        invalidate_employee_principal(int(employee_data["id"]))
     return {"message": "Logged out successfully"}
 
 
@@ -40,13 +43,15 @@ async def get_me(current=Depends(get_current_employee)):
 
 @router.get("/customers", response_model=PaginatedCustomers)
 async def get_all_customers(
-    page: int = 1,
-    page_size: int = 10,
-    session: AsyncSession = Depends(get_db_session),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
-    Retrieve all customers with pagination (page/page_size).
+    Retrieve customers page by page; pass next_cursor to get the next page.
+    The total is only counted when include_total is set.
     Only accessible to admin or manager roles.
     """
     if current_employee.role not in [EmployeeRole.admin, EmployeeRole.manager]:
@@ -56,12 +61,12 @@ async def get_all_customers(
         )
     try:
         service = CustomerService(session)
-        result = await service.get_all_customers(page=page, page_size=page_size)
+        result = await service.get_all_customers(cursor=cursor, page_size=page_size, include_total=include_total)
         return {
             "items": result["customers"],
-            "page": page,
             "page_size": page_size,
-            "total": result["total"]
+            "total": result["total"],
+            "next_cursor": result["next_cursor"]
         }
     except HTTPException as e:
         raise e
@@ -75,7 +80,7 @@ async def get_all_customers(
 @router.get("/customers/{customer_id}", response_model=CustomerRead)
 async def get_customer_by_id(
     customer_id: int,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
@@ -110,7 +115,7 @@ async def get_customer_accounts(
     customer_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
@@ -149,7 +154,7 @@ async def get_customer_cards(
     customer_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
@@ -186,13 +191,14 @@ async def get_customer_cards(
 @router.get("/customers/{customer_id}/transactions", response_model=PaginatedItems[TransactionRead])
 async def get_customer_transactions(
     customer_id: int,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
-    Retrieve paginated transactions for a customer by ID.
+    Retrieve transactions for a customer by ID, newest first; pass next_cursor to get the next page.
     Only accessible to admin or manager roles.
     """
     if current_employee.role not in [EmployeeRole.admin, EmployeeRole.manager]:
@@ -202,16 +208,17 @@ async def get_customer_transactions(
         )
     try:
         service = CustomerService(session)
-        transactions, total = await service.get_transactions_by_customer_id(
+        transactions, next_cursor, total = await service.get_transactions_by_customer_id(
             customer_id=customer_id,
-            page=page,
-            page_size=page_size
+            cursor=cursor,
+            page_size=page_size,
+            include_total=include_total
         )
         return {
             "items": transactions,
-            "page": page,
             "page_size": page_size,
-            "total": total
+            "total": total,
+            "next_cursor": next_cursor
         }
     except HTTPException as e:
         raise e
@@ -227,7 +234,7 @@ async def get_customer_loans(
     customer_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
@@ -266,7 +273,7 @@ async def get_customer_loans(
 async def get_all_employees(
     page: int = 1,
     page_size: int = 10,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
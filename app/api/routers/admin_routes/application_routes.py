@@ -4,7 +4,7 @@ from typing import List, Optional, Dict, Any, Generic, TypeVar
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
 
-from app.api.deps import get_db_session, get_current_employee
+from app.api.deps import get_db_session, get_read_db_session, get_current_employee
 from app.db.models import EmployeeRole, Employee
 from app.services.admin_services.loan_application_service import LoanApplicationService
 from app.services.admin_services.card_application_service import CardApplicationService
@@ -23,9 +23,9 @@ T = TypeVar("T")
 
 class PaginatedItems(GenericModel, Generic[T]):
     items: List[T]
-    page: int
     page_size: int
-    total: int
+    total: Optional[int] = None        # только при include_total
+    next_cursor: Optional[str] = None  # None — последняя страница
 
 
 # ---------- Loan Applications ----------
@@ -40,13 +40,14 @@ router = APIRouter(prefix="/api/admin/applications", tags=["applications"])
 
 @router.get("/loans", response_model=PaginatedItems[EnrichedLoanApplication])
 async def get_loan_applications(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
-    Retrieve all loan applications with pagination.
+    Retrieve loan applications page by page (oldest first); pass next_cursor to get the next page.
     Only accessible to admin or manager roles.
     """
     if current_employee.role not in [EmployeeRole.admin, EmployeeRole.manager]:
@@ -56,13 +57,13 @@ async def get_loan_applications(
         )
 
     service = LoanApplicationService(session)
-    result = await service.get_all(page=page, page_size=page_size)
+    result = await service.get_all(cursor=cursor, page_size=page_size, include_total=include_total)
 
     return {
         "items": result["loan_applications"],  # список EnrichedLoanApplication
-        "page": page,
         "page_size": page_size,
         "total": result["total"],
+        "next_cursor": result["next_cursor"],
     }
 
 
@@ -90,13 +91,14 @@ async def update_loan_application_status(
 # ---------- Card Applications ----------
 @router.get("/cards", response_model=PaginatedItems[CardApplicationRead])
 async def get_card_applications(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False),
+    session: AsyncSession = Depends(get_read_db_session),
     current_employee: Employee = Depends(get_current_employee),
 ):
     """
-    Retrieve all card applications with pagination.
+    Retrieve card applications page by page (oldest first); pass next_cursor to get the next page.
     Only accessible to admin or manager roles.
     """
     if current_employee.role not in [EmployeeRole.admin, EmployeeRole.manager]:
@@ -106,12 +108,12 @@ async def get_card_applications(
         )
 
     service = CardApplicationService(session)
-    result = await service.get_all(page=page, page_size=page_size)
+    result = await service.get_all(cursor=cursor, page_size=page_size, include_total=include_total)
     return {
         "items": result["card_applications"],
-        "page": page,
         "page_size": page_size,
         "total": result["total"],
+        "next_cursor": result["next_cursor"],
     }
 
 
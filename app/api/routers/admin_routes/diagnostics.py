@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_current_employee
+from app.db.base import engine, pool_stats, read_engine
+from app.db.models import EmployeeRole, Employee
+from app import logging_config
+from app.services.customer_services.message_write_queue import message_write_queue
+from app.services.knowledge_services.knowledge_store import knowledge_store
+from app.services.mcp_services import customer_cache
+from app.services import principal_cache
+from app.services.security import password_hasher
+from app.tracing import RingBufferExporter, tracer
+from app.services.llm_services.http_client import llm_http
+
+
+router = APIRouter(prefix="/api/admin/diagnostics", tags=["diagnostics"])
+
+
+def _require_staff(current_employee: Employee) -> None:
+    if current_employee.role not in [EmployeeRole.admin, EmployeeRole.manager]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access restricted to admin or manager roles",
+        )
+
+
+@router.get("/llm-http")
+async def get_llm_http_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Connection pool state of the shared upstream LLM client.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return llm_http.stats()
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Connection pool state of the primary and (if configured) read-replica engines.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(read_engine) if read_engine is not None else None,
+    }
+
+
+@router.get("/knowledge")
+async def get_knowledge_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Hit/miss/reload counters and loaded file versions of the knowledge cache.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return knowledge_store.stats()
+
+
+@router.get("/message-queue")
+async def get_message_queue_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Depth, flush latency and error counters of the write-behind message queue.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return message_write_queue.stats()
+
+
+@router.get("/customer-cache")
+async def get_customer_cache_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Size and hit rate of the customer profile / account-id caches used by the banking tools.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return customer_cache.stats()
+
+
+@router.get("/principal-cache")
+async def get_principal_cache_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Size and hit rate of the authenticated customer / employee cache behind the session-cookie dependencies.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return principal_cache.stats()
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Queue depth, wait and run time of the bcrypt thread pool used by login and registration.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return password_hasher.stats()
+
+
+@router.get("/logging")
+async def get_logging_stats(current_employee: Employee = Depends(get_current_employee)):
+    """
+    Depth of the log record queue, records dropped because it was full and sampling rates.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return logging_config.stats()
+
+
+def _trace_buffer() -> RingBufferExporter:
+    buffer = tracer.exporter(RingBufferExporter)
+    if buffer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ring buffer trace exporter is disabled (add 'ring' to TRACING_EXPORTERS)",
+        )
+    return buffer
+
+
+@router.get("/traces")
+async def get_recent_traces(
+    limit: int = Query(20, ge=1, le=200),
+    current_employee: Employee = Depends(get_current_employee),
+):
+    """
+    Most recent conversation traces (newest first) with their total duration.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    return _trace_buffer().recent(limit)
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, current_employee: Employee = Depends(get_current_employee)):
+    """
+    All spans of one trace: start offset, duration, attributes and events.
+    Only accessible to admin or manager roles.
+    """
+    _require_staff(current_employee)
+    trace = _trace_buffer().get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+    return trace
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db_session, get_current_customer, SESSION_KEY
 from app.schemas.auth_schemas import RegisterRequest, LoginRequest, CustomerOut
 from app.services.customer_services.auth_service import AuthService
+from app.services.principal_cache import invalidate_customer_principal
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
@@ -27,7 +28,9 @@ async def login(payload: LoginRequest, request: Request, session: AsyncSession =
 
 @router.post("/logout")
 async def logout(request: Request):
-    request.session.pop(SESSION_KEY, None)
+    uid = request.session.pop(SESSION_KEY, None)
+    if uid:
+        invalidate_customer_principal(int(uid))
     return {"message": "Logged out successfully"}
 
 @router.get("/user", response_model=CustomerOut)
@@ -1,15 +1,171 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app import metrics
 from app.settings import settings
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(
-    settings.database_url, 
-    echo = settings.db_echo,
-    future = True
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long a checkout waits (db_pool_checkout_seconds)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.db_pool_checkout_seconds.observe(time.perf_counter() - started)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    u = make_url(url)
+    return u.get_backend_name() == "sqlite" and u.database not in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Pool and driver options for create_async_engine depending on the backend."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    options: Dict[str, Any] = {}
+
+    if backend == "sqlite" and not _is_sqlite_file(url):
+        # :memory: — одно соединение на процесс (StaticPool по умолчанию)
+        return options
+
+    # aiosqlite по умолчанию без пула (NullPool): каждое соединение открывает файл
+    # и заново выполняет PRAGMA; для остальных бэкендов это тот же QueuePool + замер ожидания
+    options["poolclass"] = MeteredQueuePool
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+    if u.get_driver_name() == "asyncpg" and settings.db_statement_timeout_ms:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)},
+        }
+    return options
+
+
+def _sqlite_pragmas() -> Dict[str, Any]:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+    }
+
+
+def _install_sqlite_pragmas(engine: AsyncEngine) -> None:
+    """
+    Apply PRAGMAs to every new SQLite connection.
+
+    WAL lets readers work while a writer holds the lock (the default rollback
+    journal blocks everybody), busy_timeout makes a second writer wait instead
+    of failing with "database is locked".
+    """
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_engine_from_url(url: str) -> AsyncEngine:
+    """create_async_engine with the pool / PRAGMA settings from Settings."""
+    engine = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        future=True,
+        **_engine_options(url),
+    )
+    if _is_sqlite_file(url):
+        _install_sqlite_pragmas(engine)
+    event.listen(engine.sync_engine, "before_cursor_execute", metrics.count_query)
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Current state of the engine's connection pool (for diagnostics)."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "pool": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+        )
+    return stats
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica and writes to the primary.
+
+    INSERT/UPDATE/DELETE, flushes and SELECT ... FOR UPDATE go to the primary.
+    Once the session has written anything, all following reads stay on the
+    primary as well, so a request always sees its own writes.
+    """
+
+    def __init__(self, *, primary: Engine, replica: Engine, **kw: Any) -> None:
+        super().__init__(**kw)
+        self.primary = primary
+        self.replica = replica
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.wrote or isinstance(clause, UpdateBase):
+            self.wrote = True
+            return self.primary
+        if clause is not None and getattr(clause, "_for_update_arg", None) is not None:
+            self.wrote = True
+            return self.primary
+        return self.replica
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_to_primary(session: RoutingSession, flush_context: Any, instances: Any) -> None:
+    # Всё, что пишет flush, и чтения после него идут в основную БД
+    session.wrote = True
+
+
+def make_routing_sessionmaker(primary: AsyncEngine, replica: AsyncEngine) -> async_sessionmaker:
+    """Session factory for read-mostly code paths (see RoutingSession)."""
+    return async_sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        primary=primary.sync_engine,
+        replica=replica.sync_engine,
+        expire_on_commit=False,
+    )
+
+
+engine = create_engine_from_url(settings.database_url)
+# Реплика для чтения; без read_database_url всё идёт в основную БД
+read_engine: Optional[AsyncEngine] = (
+    create_engine_from_url(settings.read_database_url) if settings.read_database_url else None
 )
 
 SessionLocal = async_sessionmaker(
@@ -18,6 +174,15 @@ SessionLocal = async_sessionmaker(
     class_=AsyncSession
 )
 
+# Админские списки и тулы только для чтения; записи всё равно уходят в основную БД
+ReadSessionLocal = (
+    make_routing_sessionmaker(engine, read_engine) if read_engine is not None else SessionLocal
+)
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Optional, List
 from sqlalchemy import (
-    String, Integer, Date, DateTime, ForeignKey, Numeric, Enum, Text
+    String, Integer, Date, DateTime, ForeignKey, Numeric, Enum, Text, Index
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
@@ -116,7 +116,7 @@ class Customer(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True)
     address: Mapped[str] = mapped_column(Text)
     password_hash: Mapped[str] = mapped_column(String(255))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)  # курсор списка клиентов
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Связи
@@ -129,7 +129,7 @@ class Account(Base):
     __tablename__ = "accounts"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"))
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), index=True)
     account_number: Mapped[str] = mapped_column(String(34), unique=True)  # IBAN
     account_type: Mapped[AccountType] = mapped_column(Enum(AccountType))
     currency: Mapped[str] = mapped_column(String(3))  # ISO код валюты
@@ -158,7 +158,7 @@ class Card(Base):
     __tablename__ = "cards"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"))
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), index=True)
     card_number: Mapped[str] = mapped_column(String(16), unique=True)  # В реальном банке — хранить зашифрованно
     card_type: Mapped[CardType] = mapped_column(Enum(CardType))
     expiration_date: Mapped[date]
@@ -175,10 +175,10 @@ class Transaction(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     from_account_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("accounts.id"), nullable=True, index=True
+        ForeignKey("accounts.id"), nullable=True
     )
     to_account_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("accounts.id"), nullable=True, index=True
+        ForeignKey("accounts.id"), nullable=True
     )
     transaction_type: Mapped[TransactionType] = mapped_column(Enum(TransactionType))
     amount: Mapped[Numeric] = mapped_column(Numeric(18, 2))
@@ -188,7 +188,7 @@ class Transaction(Base):
         Enum(TransactionStatus), default=TransactionStatus.pending
     )
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
@@ -204,11 +204,18 @@ class Transaction(Base):
         foreign_keys=[to_account_id],
     )
 
+    __table_args__ = (
+        # Покрывающие индексы: выборки по счёту и периоду, SUM(amount) GROUP BY currency
+        # считаются по индексу, без чтения строк таблицы
+        Index("ix_transactions_from_account_id_created_at", "from_account_id", "created_at", "currency", "amount"),
+        Index("ix_transactions_to_account_id_created_at", "to_account_id", "created_at", "currency", "amount"),
+    )
+
 class Loan(Base):
     __tablename__ = "loans"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"))
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), index=True)
     loan_type: Mapped[LoanType] = mapped_column(Enum(LoanType))
     principal_amount: Mapped[Numeric] = mapped_column(Numeric(18, 2))  # Сумма кредита
     interest_rate: Mapped[Numeric] = mapped_column(Numeric(5, 2))      # Процентная ставка
@@ -256,7 +263,7 @@ class Chat(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[Optional[str]] = mapped_column(String(255))
-    customer_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    customer_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     agent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("employees.id"), nullable=True)
     status: Mapped[ChatStatus] = mapped_column(Enum(ChatStatus), default=ChatStatus.open)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -278,6 +285,11 @@ class Message(Base):
     # Связь с чатом
     chat: Mapped["Chat"] = relationship(back_populates="messages")
 
+    __table_args__ = (
+        # История чата: WHERE chat_id = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_messages_chat_id_created_at", "chat_id", "created_at"),
+    )
+
 # ========================
 # Новые таблицы для заявок
 # ========================
@@ -297,12 +309,17 @@ class LoanApplication(Base):
     own_contribution: Mapped[Optional[Numeric]] = mapped_column(Numeric(18, 2))  # Собственный взнос
     collateral: Mapped[Optional[str]] = mapped_column(Text)  # Күрөө
     status: Mapped[LoanApplicationStatus] = mapped_column(Enum(LoanApplicationStatus), default=LoanApplicationStatus.pending)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)  # очередь заявок в админке
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Связь с клиентом
     customer: Mapped["Customer"] = relationship(back_populates="loan_applications")
 
+    __table_args__ = (
+        # Заявки клиента (проверка статуса, история) — сразу в порядке подачи
+        Index("ix_loan_applications_customer_id_created_at", "customer_id", "created_at"),
+    )
+
 class CardApplication(Base):
     """
     Заявки на получение карт
@@ -315,7 +332,7 @@ class CardApplication(Base):
     card_type: Mapped[CardType] = mapped_column(Enum(CardType))
     card_name: Mapped[str] = mapped_column(String(50))
     status: Mapped[CardApplicationStatus] = mapped_column(Enum(CardApplicationStatus), default=CardApplicationStatus.pending)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)  # очередь заявок в админке
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Связи
@@ -0,0 +1,114 @@
+"""Keyset (cursor) pagination on (created_at, id)."""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import TTLCache
+from app.settings import settings
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """The cursor passed by the client cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    created_at: datetime
+    id: int
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor for the row after which the next page starts."""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    :param cursor: value of the `cursor` query parameter (None/empty — first page)
+    :raises InvalidCursor: if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return Cursor(created_at=datetime.fromisoformat(created_at), id=int(id))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(
+    stmt: Select,
+    created_at_col: Any,
+    id_col: Any,
+    cursor: Optional[Cursor],
+    page_size: int,
+    *,
+    descending: bool = False,
+) -> Select:
+    """
+    Restrict `stmt` to the page after `cursor`.
+
+    Orders by (created_at, id) and fetches one extra row, so split_page can
+    tell whether there is a next page without a COUNT.
+    """
+    key = tuple_(created_at_col, id_col)
+    if cursor is not None:
+        after = tuple_(cursor.created_at, cursor.id)
+        stmt = stmt.where(key < after if descending else key > after)
+    if descending:
+        stmt = stmt.order_by(created_at_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(created_at_col.asc(), id_col.asc())
+    return stmt.limit(page_size + 1)
+
+
+def split_page(
+    rows: Sequence[T],
+    page_size: int,
+    key: Callable[[T], Tuple[datetime, int]] = lambda row: (row.created_at, row.id),
+) -> Tuple[List[T], Optional[str]]:
+    """Cut the extra row fetched by keyset_page and build next_cursor from the last item."""
+    items = list(rows[:page_size])
+    if len(rows) <= page_size or not items:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
+
+
+class CountCache:
+    """
+    Totals for paginated listings, cached for `ttl` seconds.
+
+    Deep pages no longer pay for a COUNT(*) on every request; the total may
+    lag behind new rows by up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024) -> None:
+        self._cache: TTLCache[int] = TTLCache("pagination_counts", max_size=max_size, ttl=ttl)
+
+    async def get(self, session: AsyncSession, key: Hashable, stmt: Select) -> int:
+        total = self._cache.get(key)
+        if total is None:
+            total = (await session.execute(stmt)).scalar_one() or 0
+            self._cache.set(key, total)
+        return total
+
+    def invalidate(self, key: Hashable) -> None:
+        self._cache.invalidate(key)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+count_cache = CountCache(ttl=settings.pagination_count_cache_ttl)
@@ -3,33 +3,28 @@ from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import LoanApplication, LoanApplicationStatus, CardApplication, CardApplicationStatus
+from app.db.pagination import Cursor, count_cache, keyset_page, split_page
 
 
 class LoanApplicationRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self, page: int = 1, page_size: int = 10) -> Tuple[List[LoanApplication], int]:
+    async def get_all(self, cursor: Optional[Cursor] = None, page_size: int = 10) -> Tuple[List[LoanApplication], Optional[str]]:
         """
-        Получить все заявки на кредиты с пагинацией.
+        Получить заявки на кредиты постранично (курсор по created_at, id).
         Сортировка по дате создания (сначала старые).
+        Возвращает заявки и курсор следующей страницы (None — это последняя).
         """
-        offset = (page - 1) * page_size
-
-        stmt = (
-            select(LoanApplication)
-            .order_by(LoanApplication.created_at.asc())  # ASC → сначала старые
-            .offset(offset)
-            .limit(page_size)
-        )
+        stmt = keyset_page(select(LoanApplication), LoanApplication.created_at, LoanApplication.id, cursor, page_size)  # ASC → сначала старые
         result = await self.session.execute(stmt)
-        applications = result.scalars().all()
+        return split_page(result.scalars().all(), page_size)
 
-        count_stmt = select(func.count()).select_from(LoanApplication)
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar_one()
-
-        return applications, total
+    async def count_all(self) -> int:
+        """
+        Общее число заявок (кэшируется на несколько секунд, см. CountCache).
+        """
+        return await count_cache.get(self.session, ("loan_applications",), select(func.count()).select_from(LoanApplication))
 
     async def update_status(self, application_id: int, new_status: LoanApplicationStatus) -> Optional[LoanApplication]:
         stmt = (
@@ -46,27 +41,21 @@ class CardApplicationRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self, page: int = 1, page_size: int = 10) -> Tuple[List[CardApplication], int]:
+    async def get_all(self, cursor: Optional[Cursor] = None, page_size: int = 10) -> Tuple[List[CardApplication], Optional[str]]:
         """
-        Получить все заявки на карты с пагинацией.
+        Получить заявки на карты постранично (курсор по created_at, id).
         Сортировка по дате создания (сначала старые).
+        Возвращает заявки и курсор следующей страницы (None — это последняя).
         """
-        offset = (page - 1) * page_size
-
-        stmt = (
-            select(CardApplication)
-            .order_by(CardApplication.created_at.asc())  # ASC → сначала старые
-            .offset(offset)
-            .limit(page_size)
-        )
+        stmt = keyset_page(select(CardApplication), CardApplication.created_at, CardApplication.id, cursor, page_size)  # ASC → сначала старые
         result = await self.session.execute(stmt)
-        applications = result.scalars().all()
+        return split_page(result.scalars().all(), page_size)
 
-        count_stmt = select(func.count()).select_from(CardApplication)
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar_one()
-
-        return applications, total
+    async def count_all(self) -> int:
+        """
+        Общее число заявок (кэшируется на несколько секунд, см. CountCache).
+        """
+        return await count_cache.get(self.session, ("card_applications",), select(func.count()).select_from(CardApplication))
 
     async def update_status(self, application_id: int, new_status: CardApplicationStatus) -> Optional[CardApplication]:
         stmt = (
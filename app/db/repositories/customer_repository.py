@@ -1,14 +1,17 @@
-from typing import List, Optional, Tuple
-from sqlalchemy import select, or_, union_all, func
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, and_, or_, union_all, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import text
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from app.db.models import Customer, Account, Card, Transaction, Loan
+from app.db.pagination import Cursor, count_cache, keyset_page, split_page
+
+# Больше счетов — история строится из двух веток с IN вместо двух веток на счёт
+MAX_ACCOUNT_BRANCHES = 16
 
 class CustomerRepository:
     def __init__(self, session: AsyncSession):
@@ -18,6 +21,19 @@ class CustomerRepository:
         res = await self.session.execute(select(Customer).where(Customer.id == customer_id))
         return res.scalar_one_or_none()
 
+    async def get_by_ids(self, customer_ids: Iterable[int]) -> Dict[int, Customer]:
+        """
+        Retrieve several customers with one IN query.
+
+        :param customer_ids: IDs of the customers (duplicates are fine).
+        :return: Dict of customer ID -> Customer; missing IDs are absent.
+        """
+        ids = set(customer_ids)
+        if not ids:
+            return {}
+        res = await self.session.execute(select(Customer).where(Customer.id.in_(ids)))
+        return {c.id: c for c in res.scalars().all()}
+
     async def get_by_email(self, email: str) -> Optional[Customer]:
         res = await self.session.execute(select(Customer).where(Customer.email == email))
         return res.scalar_one_or_none()
@@ -27,26 +43,23 @@ class CustomerRepository:
         await self.session.flush()  # чтобы получить id без отдельного запроса
         return customer
 
-    async def get_all_customers(self, page: int = 1, page_size: int = 10) -> Tuple[List[Customer], int]:
+    async def get_all_customers(self, cursor: Optional[Cursor] = None, page_size: int = 10) -> Tuple[List[Customer], Optional[str]]:
         """
-        Retrieve all customers with pagination.
+        Retrieve customers page by page, oldest first (keyset on created_at, id).
 
-        :param page: Page number (1-based).
+        :param cursor: Position after which the page starts (None — first page).
         :param page_size: Number of records per page.
-        :return: Tuple of (list of Customer objects, total count).
+        :return: Tuple of (list of Customer objects, cursor of the next page or None).
         """
-        offset = (page - 1) * page_size
-        # Query for customers
-        stmt = select(Customer).order_by(Customer.id).offset(offset).limit(page_size)
+        stmt = keyset_page(select(Customer), Customer.created_at, Customer.id, cursor, page_size)
         result = await self.session.execute(stmt)
-        customers = result.scalars().all()
-        
-        # Query for total count
-        count_stmt = select(func.count()).select_from(Customer)
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar_one()
-        
-        return customers, total
+        return split_page(result.scalars().all(), page_size)
+
+    async def count_all_customers(self) -> int:
+        """
+        Total number of customers (cached for a few seconds, see CountCache).
+        """
+        return await count_cache.get(self.session, ("customers",), select(func.count()).select_from(Customer))
 
     async def get_accounts_by_customer_id(self, customer_id: int, page: int = 1, page_size: int = 10) -> Tuple[List[Account], int]:
         """
@@ -99,55 +112,84 @@ class CustomerRepository:
         
         return cards, total
 
-    async def get_transactions_by_customer_id(self, customer_id: int, page: int = 1, page_size: int = 10) -> Tuple[List[Transaction], int]:
+    async def get_transactions_by_customer_id(
+        self, customer_id: int, cursor: Optional[Cursor] = None, page_size: int = 10
+    ) -> Tuple[List[Transaction], Optional[str]]:
         """
-        Retrieve transactions for a specific customer (incoming and outgoing via their accounts) with pagination.
+        Retrieve transactions for a specific customer (incoming and outgoing via their accounts),
+        newest first, page by page (keyset on created_at, id).
         
         :param customer_id: The ID of the customer.
-        :param page: Page number for pagination.
+        :param cursor: Position after which the page starts (None — first page).
         :param page_size: Number of records per page.
-        :return: Tuple of (list of Transaction objects, total count).
+        :return: Tuple of (list of Transaction objects, cursor of the next page or None).
         """
-        offset = (page - 1) * page_size
-        
-        # Основной запрос с DISTINCT чтобы избежать дубликатов
-        stmt = (
-            select(Transaction)
-            .distinct()
-            .join(
-                Account, 
-                or_(
-                    Transaction.from_account_id == Account.id,
-                    Transaction.to_account_id == Account.id
-                )
+        acc_ids = await self._account_ids(customer_id)
+        if not acc_ids:
+            return [], None
+        branches = [
+            keyset_page(
+                select(Transaction.id, Transaction.created_at).where(cond),
+                Transaction.created_at, Transaction.id, cursor, page_size, descending=True,
             )
-            .where(Account.customer_id == customer_id)
-            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
-            .offset(offset)
-            .limit(page_size)
+            for cond in self._customer_transaction_conditions(acc_ids)
+        ]
+        # Каждая ветка отдаёт не больше page_size + 1 строк, объединяем и режем ещё раз
+        page = union_all(*(b.subquery().select() for b in branches)).subquery()
+        stmt = keyset_page(
+            select(Transaction).join(page, Transaction.id == page.c.id),
+            page.c.created_at, page.c.id, None, page_size, descending=True,
         )
         
         result = await self.session.execute(stmt)
-        transactions = result.scalars().all()
-        
-        # Запрос для подсчета общего количества (тоже с DISTINCT)
-        count_stmt = (
-            select(func.count(func.distinct(Transaction.id)))
-            .select_from(Transaction)
-            .join(
-                Account, 
-                or_(
-                    Transaction.from_account_id == Account.id,
-                    Transaction.to_account_id == Account.id
-                )
-            )
-            .where(Account.customer_id == customer_id)
+        return split_page(result.scalars().all(), page_size)
+
+    async def count_transactions_by_customer_id(self, customer_id: int) -> int:
+        """
+        Total number of the customer's transactions (cached for a few seconds, see CountCache).
+
+        :param customer_id: The ID of the customer.
+        """
+        acc_ids = select(Account.id).where(Account.customer_id == customer_id)
+        outgoing = select(Transaction.id).where(Transaction.from_account_id.in_(acc_ids))
+        incoming = select(Transaction.id).where(
+            Transaction.to_account_id.in_(acc_ids),
+            or_(Transaction.from_account_id.is_(None), Transaction.from_account_id.not_in(acc_ids)),
         )
-        
-        count_result = await self.session.execute(count_stmt)
-        total = count_result.scalar_one() or 0
-        
-        return transactions, total
+        count_stmt = select(func.count()).select_from(union_all(outgoing, incoming).subquery())
+        return await count_cache.get(self.session, ("customer_transactions", customer_id), count_stmt)
+
+    async def _account_ids(self, customer_id: int) -> List[int]:
+        result = await self.session.execute(select(Account.id).where(Account.customer_id == customer_id))
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _customer_transaction_conditions(acc_ids: List[int]) -> List[Any]:
+        """
+        WHERE clauses of the UNION ALL branches for the customer's history.
+
+        One outgoing and one incoming branch per account: each is a single
+        range of an (account_id, created_at) index already sorted by date, so
+        a page stops after page_size + 1 rows instead of sorting the whole
+        history as the OR-join + DISTINCT did. A transfer between two
+        accounts of the same customer would match both sides, so incoming
+        branches skip rows sent from the customer's own accounts and no
+        DISTINCT is needed.
+
+        Above MAX_ACCOUNT_BRANCHES accounts the compound SELECT would grow
+        past SQLite's limit (500 terms), so there are just two IN branches.
+        """
+        not_own_sender = or_(Transaction.from_account_id.is_(None), Transaction.from_account_id.not_in(acc_ids))
+        if len(acc_ids) > MAX_ACCOUNT_BRANCHES:
+            return [
+                Transaction.from_account_id.in_(acc_ids),
+                and_(Transaction.to_account_id.in_(acc_ids), not_own_sender),
+            ]
+        conditions: List[Any] = []
+        for acc_id in acc_ids:
+            conditions.append(Transaction.from_account_id == acc_id)
+            conditions.append(and_(Transaction.to_account_id == acc_id, not_own_sender))
+        return conditions
 
     async def get_loans_by_customer_id(self, customer_id: int, page: int = 1, page_size: int = 10) -> Tuple[List[Loan], int]:
         """
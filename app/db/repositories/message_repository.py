@@ -1,7 +1,7 @@
 # app/repositories/message_repository.py
 
-from typing import List, Optional
-from sqlalchemy import select
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Row, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Message
@@ -47,10 +47,29 @@ class MessageRepository:
         :return: List of Message objects in the chat, sorted by created_at ascending.
         """
         result = await self.session.execute(
-            select(Message).where(Message.chat_id == chat_id).order_by(Message.created_at)
+            select(Message).where(Message.chat_id == chat_id).order_by(Message.created_at, Message.id)
         )
         return result.scalars().all()
 
+    async def get_last_n(self, chat_id: int, n: int) -> List[Row]:
+        """
+        Retrieve the role and content of the last n messages of a chat.
+        Uses the (chat_id, created_at) index, so the cost does not grow with the chat length.
+
+        :param chat_id: The ID of the chat.
+        :param n: Maximum number of messages to return.
+        :return: List of (role, content) rows, sorted by created_at ascending.
+        """
+        result = await self.session.execute(
+            select(Message.role, Message.content)
+            .where(Message.chat_id == chat_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(n)
+        )
+        rows = result.all()
+        rows.reverse()
+        return rows
+
     async def add(self, message: Message) -> Message:
         """
         Add a new message to the database.
@@ -62,6 +81,16 @@ class MessageRepository:
         await self.session.flush()  # Flush to get the ID without committing
         return message
 
+    async def add_messages(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert several messages with one INSERT statement executed for all rows (executemany).
+        Nothing is loaded back, so use it when the created objects are not needed.
+
+        :param rows: Column values (chat_id, role, content and optionally created_at) for each message.
+        """
+        if rows:
+            await self.session.execute(insert(Message), rows)
+
     async def update(self, message: Message) -> Message:
         """
         Update an existing message in the database.
@@ -0,0 +1,259 @@
+"""
+Application logging: structured records, sampling, redaction and a
+non-blocking queue in front of the real handlers.
+
+`setup_logging()` installs one `NonBlockingQueueHandler` on the root logger.
+The calling thread (usually the event loop) only renders the message and
+puts the record on a bounded queue; a `QueueListener` thread formats it
+(text or JSON) and writes to stderr and the optional log file. When the
+queue is full the record is dropped and counted, so the loop never waits
+on I/O.
+
+Large or sensitive values go through `log_event`:
+
+    log_event(logger, logging.INFO, "llm.payload", "LLM request payload",
+              payload=Lazy(lambda: redact(payload)))
+
+The record is created only if the logger is enabled for the level and the
+category passes its sampling rate (`settings.log_sample_rates`); `Lazy`
+values are computed only then, once, when the record is enqueued.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from app.settings import settings
+from app.tracing import tracer
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# Ключи, значения которых в логах всегда маскируются (без учёта регистра)
+REDACTED_KEYS = frozenset({
+    "password", "password_hash", "token", "access_token", "refresh_token", "authorization",
+    "cookie", "session", "secret", "api_key", "passport_number", "phone_number", "email",
+})
+# Номера карт и счетов внутри текста
+_DIGITS_RE = re.compile(r"\d{12,19}")
+
+
+class Lazy:
+    """A log value computed only when the record is actually emitted."""
+
+    __slots__ = ("fn", "_value", "_done")
+
+    def __init__(self, fn: Callable[[], Any]) -> None:
+        self.fn = fn
+        self._done = False
+        self._value: Any = None
+
+    def resolve(self) -> Any:
+        if not self._done:
+            self._value = self.fn()
+            self._done = True
+        return self._value
+
+    def __str__(self) -> str:
+        return str(self.resolve())
+
+
+def _resolve(value: Any) -> Any:
+    return value.resolve() if isinstance(value, Lazy) else value
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = _DIGITS_RE.sub(lambda m: "*" * (len(m.group()) - 4) + m.group()[-4:], text)
+    if max_chars and len(text) > max_chars:
+        return f"{text[:max_chars]}…(+{len(text) - max_chars} chars)"
+    return text
+
+
+def redact(value: Any, max_chars: Optional[int] = None) -> Any:
+    """
+    Copy of `value` that is safe to log: sensitive keys masked, long digit
+    runs masked, strings cut to `max_chars` (settings.log_max_field_chars).
+    """
+    if max_chars is None:
+        max_chars = settings.log_max_field_chars
+    if isinstance(value, dict):
+        return {
+            k: "***" if str(k).lower() in REDACTED_KEYS else redact(v, max_chars)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v, max_chars) for v in value]
+    if isinstance(value, str):
+        return _truncate(value, max_chars)
+    return value
+
+
+# ---------- sampling ----------
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """"llm.payload=0.01,llm.response=0.1" -> {"llm.payload": 0.01, ...}"""
+    rates: Dict[str, float] = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        category, _, rate = item.partition("=")
+        try:
+            rates[category.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            logging.getLogger(__name__).warning("Invalid log sample rate %r ignored", item)
+    return rates
+
+
+class Sampler:
+    """Per-category sampling; categories without a rate are always logged."""
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        self.rates = rates
+
+    def allow(self, category: str) -> bool:
+        rate = self.rates.get(category, 1.0)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+sampler = Sampler(parse_sample_rates(settings.log_sample_rates))
+
+
+def log_event(logger: logging.Logger, level: int, category: str, msg: str, **fields: Any) -> None:
+    """Log `msg` with structured `fields` if the level is enabled and `category` is sampled."""
+    if not logger.isEnabledFor(level) or not sampler.allow(category):
+        return
+    logger.log(level, msg, extra={"category": category, "fields": fields}, stacklevel=2)
+
+
+# ---------- formatters ----------
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("category", "trace_id"):
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The usual one-line format, with structured fields appended as compact JSON."""
+
+    def __init__(self) -> None:
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + json.dumps(fields, ensure_ascii=False, default=str)
+        return text
+
+
+# ---------- queue ----------
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that drops (and counts) records when the
+    queue is full instead of blocking the caller.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Всё, что зависит от контекста вызова, вычисляем здесь, форматирование — в потоке слушателя
+        record = copy.copy(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {k: _resolve(v) for k, v in fields.items()}
+        span = tracer.current()
+        if span is not None:
+            record.trace_id = span.trace.trace_id
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _build_handlers() -> List[logging.Handler]:
+    formatter = JsonFormatter() if settings.log_format == "json" else TextFormatter()
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if settings.log_file:
+        handlers.append(logging.handlers.WatchedFileHandler(settings.log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging() -> None:
+    """Replace the root handlers with the queue handler (idempotent)."""
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.log_queue_size)
+    _queue_handler = NonBlockingQueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, *_build_handlers(), respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.log_level.upper())
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread after writing out the queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+
+
+def stats() -> Dict[str, Any]:
+    if _queue_handler is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "queued": _queue_handler.queue.qsize(),
+        "queue_size": settings.log_queue_size,
+        "dropped": _queue_handler.dropped,
+        "sample_rates": sampler.rates,
+    }
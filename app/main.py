@@ -2,24 +2,59 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from starlette.middleware.sessions import SessionMiddleware
+from app import metrics
+from app.logging_config import setup_logging
 from app.settings import settings
 from app.api.routers.user_routes import auth as auth_router, conversation as conversation_router, message as message_router, chat as chat_router
-from app.api.routers.admin_routes import admin_routes, knowledge as knowledge_routes, application_routes
+from app.api.routers.admin_routes import admin_routes, knowledge as knowledge_routes, application_routes, diagnostics as diagnostics_routes
+from app.services.customer_services.message_write_queue import message_write_queue
+from app.services.llm_services.http_client import llm_http
+from app.services.llm_services.llm_client import drain_pending_saves
+from app.services.llm_services.mcp_client import mcp_pool
+from app.services.llm_services.tool_registry import tool_registry
+from app.services.security import password_hasher
+from app.tracing import tracer
 from fastapi import FastAPI
 
 
-logging.basicConfig(
-    level=logging.INFO,  # чтобы INFO был виден
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-)
+# Корневой логгер пишет через очередь в отдельном потоке (уровень и формат — settings.log_*)
+setup_logging()
+
+logger = logging.getLogger(__name__)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    llm_http.start()
+    if settings.message_write_behind:
+        message_write_queue.start()
+    if settings.tool_dispatch_mode == "inprocess":
+        await tool_registry.load()
+    else:
+        # Поднимаем пул MCP-сессий заранее, чтобы первый вызов тула не ждал старта процесса
+        try:
+            await mcp_pool.start()
+        except Exception as e:
+            logger.error("Failed to start MCP pool, it will be started on first tool call: %s", e)
+    try:
+        yield
+    finally:
+        # Сначала ждём сохранения ходов и дописываем очередь, потом закрываем остальное
+        await drain_pending_saves(settings.message_save_drain_timeout)
+        await message_write_queue.stop()
+        await mcp_pool.close()
+        await llm_http.aclose()
+        password_hasher.shutdown()
+        await tracer.shutdown()
 
 
-app = FastAPI(title="Bank Assistant API")
+app = FastAPI(title="Bank Assistant API", lifespan=lifespan)
 
 # ✅ Разрешаем CORS
 app.add_middleware(
@@ -30,6 +65,9 @@ app.add_middleware(
     allow_headers=["*"],     # или ["Content-Type", "Authorization"]
 )
 
+# Число SQL-запросов на HTTP-запрос (гистограмма http_request_db_queries в /metrics)
+app.add_middleware(metrics.QueryCountMiddleware)
+
 # ✅ Сессии
 app.add_middleware(
     SessionMiddleware,
@@ -46,8 +84,15 @@ app.include_router(chat_router.router)
 app.include_router(admin_routes.router)
 app.include_router(knowledge_routes.router)
 app.include_router(application_routes.router)
+app.include_router(diagnostics_routes.router)
 
 @app.get("/")
 async def root():
     return {"message": "welcome"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of app.metrics.registry."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
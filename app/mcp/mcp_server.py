@@ -6,13 +6,14 @@ load_dotenv()
 
 import asyncio
 from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 from typing import List, Optional
 import json
 import logging
 
 # --- Async SQLAlchemy session ---
-from app.db.base import SessionLocal  # async_sessionmaker(AsyncSession)
-from app.db.models import Customer
+from app.db.base import SessionLocal, ReadSessionLocal  # async_sessionmaker(AsyncSession)
+from app.services.mcp_services.customer_cache import CustomerSnapshot, get_customer_snapshot
 
 # --- Доменные сервисы без БД ---
 from app.services.mcp_services.common_services import *  # noqa
@@ -24,13 +25,20 @@ from app.services.mcp_services.card_app_service import apply_for_card, check_app
 # ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
 # =====================================================================
 
-async def _get_customer(session, customer_id: int) -> Optional[Customer]:
-    return await session.get(Customer, customer_id)
+async def _get_customer(session, customer_id: int) -> Optional[CustomerSnapshot]:
+    # Профиль кэшируется: несколько тулов за один ход не ходят в БД повторно
+    return await get_customer_snapshot(session, customer_id)
 
 
 # Создаём FastMCP сервер
 server = FastMCP("banking-mcp-server")
 
+# История и выписки читаются с реплики (ReadSessionLocal). Баланс и статусы заявок
+# клиент проверяет сразу после перевода / подачи заявки — они читают основную БД.
+# Тулы только для чтения можно выполнять параллельно; пишущие — строго по очереди
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+WRITE = ToolAnnotations(readOnlyHint=False, destructiveHint=False, idempotentHint=False)
+
 # =====================================================================
 # БАНКОВСКИЕ ИНСТРУМЕНТЫ (работают через Async SQLAlchemy + наши сервисы)
 # Каждый тул принимает lang: str = "ky" и возвращает текст на выбранном языке
@@ -38,7 +46,8 @@ server = FastMCP("banking-mcp-server")
 
 @server.tool(
     name="get_balance",
-    description="Колдонуучунун бардык эсептериндеги жалпы балансты алуу. (lang: ky|ru)"
+    description="Колдонуучунун бардык эсептериндеги жалпы балансты алуу. (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_balance_tool(customer_id: int, lang: str = "ky"):
     async with SessionLocal() as session:
@@ -51,7 +60,8 @@ async def get_balance_tool(customer_id: int, lang: str = "ky"):
 
 @server.tool(
     name="apply_for_loans",
-    description="Насыя учун арыз"
+    description="Насыя учун арыз",
+    annotations=WRITE,
 )
 async def apply_for_loans(
     loan_name: Optional[str] = None,
@@ -72,7 +82,8 @@ async def apply_for_loans(
 
 @server.tool(
     name="check_loan_status",
-    description="Крдет үчүн берилген арыздын статусун текшерет"
+    description="Крдет үчүн берилген арыздын статусун текшерет",
+    annotations=READ_ONLY,
 )
 async def check_loan_status(app_id, customer_id, lang:str = "ky"):
     async with SessionLocal() as session:
@@ -85,7 +96,8 @@ async def check_loan_status(app_id, customer_id, lang:str = "ky"):
 
 @server.tool(
     name="apply_for_cards",
-    description="Карта учун арыз"
+    description="Карта учун арыз",
+    annotations=WRITE,
 )
 async def apply_for_cards(
     card_name: Optional[str] = None,
@@ -102,7 +114,8 @@ async def apply_for_cards(
 
 @server.tool(
     name="check_card_status",
-    description="Карта үчүн берилген арыздын статусун текшерет"
+    description="Карта үчүн берилген арыздын статусун текшерет",
+    annotations=READ_ONLY,
 )
 async def check_card_status(app_id, customer_id, lang:str = "ky"):
     async with SessionLocal() as session:
@@ -115,10 +128,11 @@ async def check_card_status(app_id, customer_id, lang:str = "ky"):
 
 @server.tool(
     name="get_transactions",
-    description="Колдонуучунун акыркы транзакцияларынын тизмесин алуу (limit, default=5). (lang: ky|ru)"
+    description="Колдонуучунун акыркы транзакцияларынын тизмесин алуу (limit, default=5). (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_transactions_tool(customer_id: int, limit: int = 5, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -136,7 +150,8 @@ async def get_transactions_tool(customer_id: int, limit: int = 5, lang: str = "k
 
 @server.tool(
     name="transfer_money",
-    description="Башка колдонуучуга аты боюнча акча которуу. (params: to_name, amount, currency='KGS', lang: ky|ru)"
+    description="Башка колдонуучуга аты боюнча акча которуу. (params: to_name, amount, currency='KGS', lang: ky|ru)",
+    annotations=WRITE,
 )
 async def transfer_money_tool(customer_id: int, to_account_number: str, amount: float = 0, currency: str = "KGS", lang: str = "ky"):
     async with SessionLocal() as session:
@@ -149,10 +164,11 @@ async def transfer_money_tool(customer_id: int, to_account_number: str, amount:
 
 @server.tool(
     name="get_last_incoming_transaction",
-    description="Акыркы кирген транзакция тууралуу маалымат алуу. (lang: ky|ru)"
+    description="Акыркы кирген транзакция тууралуу маалымат алуу. (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_last_incoming_transaction_tool(customer_id: int, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -162,10 +178,11 @@ async def get_last_incoming_transaction_tool(customer_id: int, lang: str = "ky")
 
 @server.tool(
     name="get_accounts_info",
-    description="Колдонуучунун бардык эсептеринин тизмеси жана балансы. (lang: ky|ru)"
+    description="Колдонуучунун бардык эсептеринин тизмеси жана балансы. (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_accounts_info_tool(customer_id: int, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -183,10 +200,11 @@ async def get_accounts_info_tool(customer_id: int, lang: str = "ky"):
 
 @server.tool(
     name="get_incoming_sum_for_period",
-    description="Көрсөтүлгөн аралыкта кирген которуулар (входящие) жалпы суммасы. (YYYY-MM-DD, YYYY-MM-DD; lang: ky|ru)"
+    description="Көрсөтүлгөн аралыкта кирген которуулар (входящие) жалпы суммасы. (YYYY-MM-DD, YYYY-MM-DD; lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_incoming_sum_for_period_tool(customer_id: int, start_date: str, end_date: str, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -196,10 +214,11 @@ async def get_incoming_sum_for_period_tool(customer_id: int, start_date: str, en
 
 @server.tool(
     name="get_outgoing_sum_for_period",
-    description="Көрсөтүлгөн аралыкта чыккан которуулар (исходящие) жалпы суммасы. (YYYY-MM-DD, YYYY-MM-DD; lang: ky|ru)"
+    description="Көрсөтүлгөн аралыкта чыккан которуулар (исходящие) жалпы суммасы. (YYYY-MM-DD, YYYY-MM-DD; lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_outgoing_sum_for_period_tool(customer_id: int, start_date: str, end_date: str, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -209,10 +228,11 @@ async def get_outgoing_sum_for_period_tool(customer_id: int, start_date: str, en
 
 @server.tool(
     name="get_last_3_transfer_recipients",
-    description="Акыркы 3 кото руунун алуучуларынын тизмеси. (lang: ky|ru)"
+    description="Акыркы 3 кото руунун алуучуларынын тизмеси. (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_last_3_transfer_recipients_tool(customer_id: int, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -227,10 +247,11 @@ async def get_last_3_transfer_recipients_tool(customer_id: int, lang: str = "ky"
 
 @server.tool(
     name="get_largest_transaction",
-    description="Эң чоң транзакция (суммасы боюнча) жана анын багыты. (lang: ky|ru)"
+    description="Эң чоң транзакция (суммасы боюнча) жана анын багыты. (lang: ky|ru)",
+    annotations=READ_ONLY,
 )
 async def get_largest_transaction_tool(customer_id: int, lang: str = "ky"):
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         customer = await _get_customer(session, customer_id)
         if not customer:
             return "Колдонуучу табылган жок." if lang == "ky" else "Пользователь не найден."
@@ -250,7 +271,8 @@ async def get_largest_transaction_tool(customer_id: int, lang: str = "ky"):
 
 @server.tool(
     name="list_all_card_names",
-    description="Ai Bank'тагы бардык карталардын тизмесин кайтарат"
+    description="Ai Bank'тагы бардык карталардын тизмесин кайтарат",
+    annotations=READ_ONLY,
 )
 async def list_all_card_names_tool(lang: str = "ky"):
     result = list_all_card_names(lang=lang)
@@ -260,7 +282,8 @@ async def list_all_card_names_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_card_details",
-    description="Карта аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөтү, чыгымдар, лимиттер, сүрөттөмө)."
+    description="Карта аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөтү, чыгымдар, лимиттер, сүрөттөмө).",
+    annotations=READ_ONLY,
 )
 async def get_card_details_tool(card_name: str, lang: str = "ky"):
     result = get_card_details(card_name, lang=lang)
@@ -271,7 +294,8 @@ async def get_card_details_tool(card_name: str, lang: str = "ky"):
 
 @server.tool(
     name="compare_cards",
-    description="Карталарды негизги параметрлер боюнча салыштырат. Аргумент катары карталардын аттарынын тизмеси берилет (2-4 карта)."
+    description="Карталарды негизги параметрлер боюнча салыштырат. Аргумент катары карталардын аттарынын тизмеси берилет (2-4 карта).",
+    annotations=READ_ONLY,
 )
 async def compare_cards_tool(card_names: List[str], lang: str = "ky"):
     cards = compare_cards(card_names, lang=lang)
@@ -308,7 +332,8 @@ async def compare_cards_tool(card_names: List[str], lang: str = "ky"):
 
 @server.tool(
     name="get_card_limits",
-    description="Карта аталышы боюнча лимиттерди кайтарат (ATM, POS, контактсыз ж.б.)."
+    description="Карта аталышы боюнча лимиттерди кайтарат (ATM, POS, контактсыз ж.б.).",
+    annotations=READ_ONLY,
 )
 async def get_card_limits_tool(card_name: str, lang: str = "ky"):
     result = get_card_limits(card_name, lang=lang)
@@ -319,7 +344,8 @@ async def get_card_limits_tool(card_name: str, lang: str = "ky"):
 
 @server.tool(
     name="get_card_benefits",
-    description="Карта аталышы боюнча артыкчылыктарды жана өзгөчөлүктөрдү кайтарат."
+    description="Карта аталышы боюнча артыкчылыктарды жана өзгөчөлүктөрдү кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_card_benefits_tool(card_name: str, lang: str = "ky"):
     result = get_card_benefits(card_name, lang=lang)
@@ -328,7 +354,8 @@ async def get_card_benefits_tool(card_name: str, lang: str = "ky"):
 
 @server.tool(
     name="get_cards_by_type",
-    description="Карталарды түрү боюнча фильтрлейт (дебеттик/кредиттик)."
+    description="Карталарды түрү боюнча фильтрлейт (дебеттик/кредиттик).",
+    annotations=READ_ONLY,
 )
 async def get_cards_by_type_tool(card_type: str, lang: str = "ky"):
     result = get_cards_by_type(card_type, lang=lang)
@@ -337,7 +364,8 @@ async def get_cards_by_type_tool(card_type: str, lang: str = "ky"):
 
 @server.tool(
     name="get_cards_by_payment_system",
-    description="Карталарды төлөм системасы боюнча фильтрлейт (Visa/Mastercard)."
+    description="Карталарды төлөм системасы боюнча фильтрлейт (Visa/Mastercard).",
+    annotations=READ_ONLY,
 )
 async def get_cards_by_payment_system_tool(system: str, lang: str = "ky"):
     result = get_cards_by_payment_system(system, lang=lang)
@@ -346,7 +374,8 @@ async def get_cards_by_payment_system_tool(system: str, lang: str = "ky"):
 
 @server.tool(
     name="get_cards_by_fee_range",
-    description="Карталарды жылдык акы диапазону боюнча фильтрлейт."
+    description="Карталарды жылдык акы диапазону боюнча фильтрлейт.",
+    annotations=READ_ONLY,
 )
 async def get_cards_by_fee_range_tool(min_fee: str = None, max_fee: str = None, lang: str = "ky"):
     result = get_cards_by_fee_range(min_fee, max_fee, lang=lang)
@@ -358,7 +387,8 @@ async def get_cards_by_fee_range_tool(min_fee: str = None, max_fee: str = None,
 
 @server.tool(
     name="get_cards_by_currency",
-    description="Карталарды валюта боюнча фильтрлейт (KGS, USD, EUR)."
+    description="Карталарды валюта боюнча фильтрлейт (KGS, USD, EUR).",
+    annotations=READ_ONLY,
 )
 async def get_cards_by_currency_tool(currency: str, lang: str = "ky"):
     result = get_cards_by_currency(currency, lang=lang)
@@ -367,7 +397,8 @@ async def get_cards_by_currency_tool(currency: str, lang: str = "ky"):
 
 @server.tool(
     name="get_card_instructions",
-    description="Картанын колдонуу көрсөтмөлөрүн кайтарат (Card Plus, Virtual Card үчүн)."
+    description="Картанын колдонуу көрсөтмөлөрүн кайтарат (Card Plus, Virtual Card үчүн).",
+    annotations=READ_ONLY,
 )
 async def get_card_instructions_tool(card_name: str, lang: str = "ky"):
     result = get_card_instructions(card_name, lang=lang)
@@ -390,7 +421,8 @@ async def get_card_instructions_tool(card_name: str, lang: str = "ky"):
 
 @server.tool(
     name="get_card_conditions",
-    description="Картанын шарттарын жана талаптарын кайтарат (Elkart үчүн)."
+    description="Картанын шарттарын жана талаптарын кайтарат (Elkart үчүн).",
+    annotations=READ_ONLY,
 )
 async def get_card_conditions_tool(card_name: str, lang: str = "ky"):
     result = get_card_conditions(card_name, lang=lang)
@@ -409,7 +441,8 @@ async def get_card_conditions_tool(card_name: str, lang: str = "ky"):
 
 @server.tool(
     name="get_cards_with_features",
-    description="Белгилүү өзгөчөлүктөргө ээ карталарды табат."
+    description="Белгилүү өзгөчөлүктөргө ээ карталарды табат.",
+    annotations=READ_ONLY,
 )
 async def get_cards_with_features_tool(features: List[str], lang: str = "ky"):
     result = get_cards_with_features(features, lang=lang)
@@ -421,7 +454,8 @@ async def get_cards_with_features_tool(features: List[str], lang: str = "ky"):
 
 @server.tool(
     name="get_card_recommendations",
-    description="Критерийлерге ылайык карта сунуштарын кайтарат."
+    description="Критерийлерге ылайык карта сунуштарын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_card_recommendations_tool(criteria: dict, lang: str = "ky"):
     result = get_card_recommendations(criteria, lang=lang)
@@ -442,7 +476,8 @@ async def get_card_recommendations_tool(criteria: dict, lang: str = "ky"):
 
 @server.tool(
     name="get_bank_info",
-    description="Банк тууралуу негизги маалыматты кайтарат (аты, негизделген жылы, лицензия)."
+    description="Банк тууралуу негизги маалыматты кайтарат (аты, негизделген жылы, лицензия).",
+    annotations=READ_ONLY,
 )
 async def get_bank_info_tool(lang: str = "ky"):
     result = get_bank_info(lang=lang)
@@ -456,7 +491,8 @@ async def get_bank_info_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_bank_mission",
-    description="Банктын миссиясын жана тарыхын кайтарат."
+    description="Банктын миссиясын жана тарыхын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_bank_mission_tool(lang: str = "ky"):
     return f"{'🎯 Банктын миссиясы' if lang == 'ky' else '🎯 Миссия банка'}:\n\n" + get_bank_mission(lang=lang)
@@ -464,7 +500,8 @@ async def get_bank_mission_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_bank_values",
-    description="Банктын баалуулуктарын жана принциптерин кайтарат."
+    description="Банктын баалуулуктарын жана принциптерин кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_bank_values_tool(lang: str = "ky"):
     values = get_bank_values(lang=lang)
@@ -473,7 +510,8 @@ async def get_bank_values_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_ownership_info",
-    description="Банктын ээлик маалыматтарын кайтарат."
+    description="Банктын ээлик маалыматтарын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_ownership_info_tool(lang: str = "ky"):
     o = get_ownership_info(lang=lang)
@@ -487,7 +525,8 @@ async def get_ownership_info_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_branch_network",
-    description="Банктын филиалдар тармагын кайтарат."
+    description="Банктын филиалдар тармагын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_branch_network_tool(lang: str = "ky"):
     b = get_branch_network(lang=lang)
@@ -502,7 +541,8 @@ async def get_branch_network_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_contact_info",
-    description="Банктын байланыш маалыматтарын кайтарат."
+    description="Банктын байланыш маалыматтарын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_contact_info_tool(lang: str = "ky"):
     c = get_contact_info(lang=lang)
@@ -516,7 +556,8 @@ async def get_contact_info_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_complete_about_us",
-    description="Банк тууралуу толук маалыматты кайтарат."
+    description="Банк тууралуу толук маалыматты кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_complete_about_us_tool(lang: str = "ky"):
     data = get_complete_about_us(lang=lang)
@@ -554,7 +595,8 @@ async def get_complete_about_us_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_about_us_section",
-    description="Банк тууралуу маалыматтын белгилүү бөлүмүн кайтарат."
+    description="Банк тууралуу маалыматтын белгилүү бөлүмүн кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_about_us_section_tool(section: str, lang: str = "ky"):
     data = get_about_us_section(section, lang=lang)
@@ -581,7 +623,8 @@ async def get_about_us_section_tool(section: str, lang: str = "ky"):
 
 @server.tool(
     name="list_all_deposit_names",
-    description="Ai Bank'тагы бардык депозиттердин тизмесин кайтарат"
+    description="Ai Bank'тагы бардык депозиттердин тизмесин кайтарат",
+    annotations=READ_ONLY,
 )
 async def list_all_deposit_names_tool(lang: str = "ky"):
     deposits = list_all_deposit_names(lang=lang)
@@ -590,7 +633,8 @@ async def list_all_deposit_names_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_deposit_details",
-    description="Депозит аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөт, пайыздык ставка, минималдык сумма, сүрөттөмө)."
+    description="Депозит аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөт, пайыздык ставка, минималдык сумма, сүрөттөмө).",
+    annotations=READ_ONLY,
 )
 async def get_deposit_details_tool(deposit_name: str, lang: str = "ky"):
     d = get_deposit_details(deposit_name, lang=lang)
@@ -611,7 +655,8 @@ async def get_deposit_details_tool(deposit_name: str, lang: str = "ky"):
 
 @server.tool(
     name="compare_deposits",
-    description="Депозиттерди негизги параметрлер боюнча салыштырат. Аргумент катары депозиттердин аттарынын тизмеси берилет (2-4 депозит)."
+    description="Депозиттерди негизги параметрлер боюнча салыштырат. Аргумент катары депозиттердин аттарынын тизмеси берилет (2-4 депозит).",
+    annotations=READ_ONLY,
 )
 async def compare_deposits_tool(deposit_names: List[str], lang: str = "ky"):
     deposits = compare_deposits(deposit_names, lang=lang)
@@ -641,7 +686,8 @@ async def compare_deposits_tool(deposit_names: List[str], lang: str = "ky"):
 
 @server.tool(
     name="get_deposits_by_currency",
-    description="Депозиттерди валюта боюнча фильтрлейт (KGS, USD, EUR, RUB)."
+    description="Депозиттерди валюта боюнча фильтрлейт (KGS, USD, EUR, RUB).",
+    annotations=READ_ONLY,
 )
 async def get_deposits_by_currency_tool(currency: str, lang: str = "ky"):
     deposits = get_deposits_by_currency(currency, lang=lang)
@@ -656,7 +702,8 @@ async def get_deposits_by_currency_tool(currency: str, lang: str = "ky"):
 
 @server.tool(
     name="get_deposits_by_term_range",
-    description="Депозиттерди мөөнөт диапазону боюнча фильтрлейт."
+    description="Депозиттерди мөөнөт диапазону боюнча фильтрлейт.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_by_term_range_tool(min_term: str = None, max_term: str = None, lang: str = "ky"):
     deposits = get_deposits_by_term_range(min_term, max_term, lang=lang)
@@ -670,7 +717,8 @@ async def get_deposits_by_term_range_tool(min_term: str = None, max_term: str =
 
 @server.tool(
     name="get_deposits_by_min_amount",
-    description="Депозиттерди минималдык сумма боюнча фильтрлейт."
+    description="Депозиттерди минималдык сумма боюнча фильтрлейт.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_by_min_amount_tool(max_amount: str, lang: str = "ky"):
     deposits = get_deposits_by_min_amount(max_amount, lang=lang)
@@ -684,7 +732,8 @@ async def get_deposits_by_min_amount_tool(max_amount: str, lang: str = "ky"):
 
 @server.tool(
     name="get_deposits_by_rate_range",
-    description="Депозиттерди пайыздык ставка диапазону боюнча фильтрлейт."
+    description="Депозиттерди пайыздык ставка диапазону боюнча фильтрлейт.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_by_rate_range_tool(min_rate: str = None, max_rate: str = None, lang: str = "ky"):
     deposits = get_deposits_by_rate_range(min_rate, max_rate, lang=lang)
@@ -698,7 +747,8 @@ async def get_deposits_by_rate_range_tool(min_rate: str = None, max_rate: str =
 
 @server.tool(
     name="get_deposits_with_replenishment",
-    description="Толуктоого мүмкүндүк берген депозиттерди кайтарат."
+    description="Толуктоого мүмкүндүк берген депозиттерди кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_with_replenishment_tool(lang: str = "ky"):
     deposits = get_deposits_with_replenishment(lang=lang)
@@ -712,7 +762,8 @@ async def get_deposits_with_replenishment_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_deposits_with_capitalization",
-    description="Капитализация мүмкүндүгүн берген депозиттерди кайтарат."
+    description="Капитализация мүмкүндүгүн берген депозиттерди кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_with_capitalization_tool(lang: str = "ky"):
     deposits = get_deposits_with_capitalization(lang=lang)
@@ -726,7 +777,8 @@ async def get_deposits_with_capitalization_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_deposits_by_withdrawal_type",
-    description="Депозиттерди чыгаруу түрү боюнча фильтрлейт."
+    description="Депозиттерди чыгаруу түрү боюнча фильтрлейт.",
+    annotations=READ_ONLY,
 )
 async def get_deposits_by_withdrawal_type_tool(withdrawal_type: str, lang: str = "ky"):
     deposits = get_deposits_by_withdrawal_type(withdrawal_type, lang=lang)
@@ -740,7 +792,8 @@ async def get_deposits_by_withdrawal_type_tool(withdrawal_type: str, lang: str =
 
 @server.tool(
     name="get_deposit_recommendations",
-    description="Критерийлерге ылайык депозит сунуштарын кайтарат."
+    description="Критерийлерге ылайык депозит сунуштарын кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_deposit_recommendations_tool(criteria: dict, lang: str = "ky"):
     deposits = get_deposit_recommendations(criteria, lang=lang)
@@ -758,7 +811,8 @@ async def get_deposit_recommendations_tool(criteria: dict, lang: str = "ky"):
 
 @server.tool(
     name="get_government_securities",
-    description="Мамлекеттик баалуу кагаздарды кайтарат (Treasury Bills, NBKR Notes)."
+    description="Мамлекеттик баалуу кагаздарды кайтарат (Treasury Bills, NBKR Notes).",
+    annotations=READ_ONLY,
 )
 async def get_government_securities_tool(lang: str = "ky"):
     securities = get_government_securities(lang=lang)
@@ -774,7 +828,8 @@ async def get_government_securities_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_child_deposits",
-    description="Балдар үчүн атайын депозиттерди кайтарат."
+    description="Балдар үчүн атайын депозиттерди кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_child_deposits_tool(lang: str = "ky"):
     deposits = get_child_deposits(lang=lang)
@@ -789,7 +844,8 @@ async def get_child_deposits_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_online_deposits",
-    description="Онлайн ачылуучу депозиттерди кайтарат."
+    description="Онлайн ачылуучу депозиттерди кайтарат.",
+    annotations=READ_ONLY,
 )
 async def get_online_deposits_tool(lang: str = "ky"):
     deposits = get_online_deposits(lang=lang)
@@ -804,7 +860,8 @@ async def get_online_deposits_tool(lang: str = "ky"):
 
 @server.tool(
     name="get_faq_by_category",
-    description="Жалпы суроолорго FAQ маалыматтарын колдонуу менен жооп берет. LLM тек гана FAQ маалыматтарын колдонуу керек, жаңы маалымат ойлоп чыгарбоо керек."
+    description="Жалпы суроолорго FAQ маалыматтарын колдонуу менен жооп берет. LLM тек гана FAQ маалыматтарын колдонуу керек, жаңы маалымат ойлоп чыгарбоо керек.",
+    annotations=READ_ONLY,
 )
 async def get_faq_by_category_tool(category: str, lang: str = "ky"):
     result = get_faq_by_category(category, lang=lang)
@@ -816,14 +873,16 @@ async def get_faq_by_category_tool(category: str, lang: str = "ky"):
 
 @server.tool(
     name="list_all_loans",
-    description="Бардык насыялардын тизмесин кайтарат"
+    description="Бардык насыялардын тизмесин кайтарат",
+    annotations=READ_ONLY,
 )
 async def get_list_all_loans(lang: str = "ky"):
     return list_all_loans(lang=lang)
 
 @server.tool(
     name="get_loan_details",
-    description="Бардык насыялардын тизмесин кайтарат"
+    description="Бардык насыялардын тизмесин кайтарат",
+    annotations=READ_ONLY,
 )
 async def get_loan_details(loan_name: str, lang: str = "ky"):
     return loan_details(loan_name=loan_name, lang=lang)
@@ -0,0 +1,304 @@
+"""
+In-process metrics in the Prometheus text exposition format (served at /metrics).
+
+Counters, gauges and histograms are plain Python objects updated without
+locks: every update happens on the event loop thread, and a scrape that
+races an update sees a value at most one update old. Label children are
+cached, so the hot path is a dict lookup plus an integer add; per-token
+counters are added once per leg, not per chunk.
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Секунды: от быстрых запросов к БД до долгих стримов апстрима
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+    has_children = True
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames and self.has_children:
+            self.labels()  # метрика без меток видна в /metrics сразу, с нулём
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self) -> Any:
+        return self.labels()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in sorted(self._children.items()):
+            yield f"{self.name}{_labels_text(self.labelnames, key)} {_number(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(child.counts)):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                yield f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}"
+            labels = _labels_text(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class CallbackMetric(_Metric):
+    """Value read at scrape time, e.g. hit counters kept by a cache itself."""
+
+    has_children = False
+
+    def __init__(
+        self, name: str, help: str, kind: str, fn: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.kind = kind
+        self.fn = fn
+        super().__init__(name, help, labelnames)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self.fn().items()):
+            yield f"{self.name}{_labels_text(self.labelnames, key)} {_number(float(value))}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def callback(
+        self, name: str, help: str, kind: str, fn: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+    ) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help, kind, fn, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------- чат ----------
+
+chat_turns = registry.counter(
+    "chat_turns_total", "Conversation turns by outcome (plain, tool, faq, auth_required, cancelled, error).",
+    ["outcome"],
+)
+chat_active_streams = registry.gauge("chat_active_streams", "SSE conversation streams currently open.")
+llm_ttft_seconds = registry.histogram(
+    "llm_upstream_ttft_seconds", "Time from the upstream request to its first content chunk.", ["leg"],
+)
+llm_duration_seconds = registry.histogram(
+    "llm_upstream_duration_seconds", "Duration of an upstream LLM stream, request to [DONE].", ["leg"],
+)
+llm_tokens = registry.counter("llm_tokens_streamed_total", "Content chunks received from the upstream LLM.", ["leg"])
+tool_calls = registry.counter("tool_calls_total", "Tool calls by tool and status (ok, error, timeout).", ["tool", "status"])
+tool_duration_seconds = registry.histogram("tool_call_duration_seconds", "Tool call latency.", ["tool"])
+
+
+# ---------- данные ----------
+
+db_pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the SQLAlchemy pool (including connect).",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+db_queries_per_request = registry.histogram(
+    "http_request_db_queries", "SQL statements executed while serving one HTTP request.", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+
+
+def _knowledge_cache() -> Dict[Tuple[str, ...], float]:
+    from app.services.knowledge_services.knowledge_store import knowledge_store
+
+    return {
+        ("hit",): knowledge_store.hits,
+        ("miss",): knowledge_store.misses,
+        ("reload",): knowledge_store.reloads,
+        ("error",): knowledge_store.errors,
+    }
+
+
+registry.callback(
+    "knowledge_cache_lookups_total", "Knowledge file cache lookups by result.", "counter", _knowledge_cache, ["result"],
+)
+
+
+def _log_records_dropped() -> Dict[Tuple[str, ...], float]:
+    from app import logging_config
+
+    return {(): logging_config.stats().get("dropped", 0)}
+
+
+registry.callback(
+    "log_records_dropped_total", "Log records dropped because the log queue was full.", "counter",
+    _log_records_dropped,
+)
+
+
+# ---------- запросы к БД на один HTTP-запрос ----------
+
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+
+
+def count_query(*args: Any) -> None:
+    """before_cursor_execute listener: counts statements of the current request."""
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """
+    ASGI middleware that observes http_request_db_queries for every request.
+
+    The counter lives in a contextvar, so it also sees queries made by tasks
+    the request starts (the SSE generator, tool calls); it is read when the
+    response is finished, including the streamed body.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            route = scope.get("route")
+            db_queries_per_request.labels(getattr(route, "path", "unmatched")).observe(counter[0])
+
@@ -10,9 +10,10 @@ T = TypeVar("T")
 
 class PaginatedItems(BaseModel, Generic[T]):
     items: List[T]
-    page: int
+    page: Optional[int] = None          # только для списков с page/page_size
     page_size: int
-    total: int
+    total: Optional[int] = None         # для курсорных списков — только при include_total
+    next_cursor: Optional[str] = None   # None — последняя страница
 
 class CustomerRead(BaseModel):
     id: int
@@ -32,6 +33,6 @@ class CustomerRead(BaseModel):
 
 class PaginatedCustomers(BaseModel):
     items: List[CustomerRead]
-    page: int
     page_size: int
-    total: int
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
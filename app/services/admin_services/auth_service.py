@@ -4,7 +4,7 @@ from fastapi import HTTPException, status
 
 from app.db.models import Employee
 from app.db.repositories.employee_repository import EmployeeRepository
-from app.services.security import hash_password, verify_password
+from app.services.security import hash_password_async, verify_password_async
 
 class AuthService:
     def __init__(self, session: AsyncSession):
@@ -14,6 +14,6 @@ class AuthService:
 
     async def validate_login(self, *, username: str, password: str) ->Employee:
         user = await self.repo.get_by_username(username.lower())
-        if not user or not verify_password(password, user.password_hash):
+        if not user or not await verify_password_async(password, user.password_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
         return user
@@ -1,13 +1,13 @@
 import logging
-from typing import Dict
+from typing import Dict, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.pagination import InvalidCursor, decode_cursor
 from app.db.repositories.app_repository import CardApplicationRepository
 from app.schemas.application_schemas import CardApplicationRead, CardApplicationUpdateStatus
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -20,16 +20,21 @@ class CardApplicationService:
         self.session = session
         self.repo = CardApplicationRepository(session)
 
-    async def get_all(self, page: int = 1, page_size: int = 10) -> Dict:
+    async def get_all(self, cursor: Optional[str] = None, page_size: int = 10, include_total: bool = False) -> Dict:
         """
-        Retrieve all card applications with pagination.
+        Retrieve card applications page by page.
+        `total` is None unless include_total is set.
         """
         try:
-            applications, total = await self.repo.get_all(page=page, page_size=page_size)
+            applications, next_cursor = await self.repo.get_all(cursor=decode_cursor(cursor), page_size=page_size)
+            total = await self.repo.count_all() if include_total else None
             return {
                 "card_applications": [CardApplicationRead.model_validate(app) for app in applications],
+                "next_cursor": next_cursor,
                 "total": total
             }
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to retrieve card applications: {str(e)}")
             raise HTTPException(
@@ -2,19 +2,19 @@ from typing import List, Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status
 from pydantic import BaseModel, constr, EmailStr
-from passlib.context import CryptContext
 from datetime import datetime
 from app.db.models import Employee, EmployeeRole
 
 from app.schemas.employee_schemas import EmployeeRead, EmployeeCreate
 from app.db.repositories.employee_repository import EmployeeRepository
+from app.services.principal_cache import invalidate_employee_principal
+from app.services.security import hash_password_async
 
 
 # Service
 class EmployeeService:
     def __init__(self, session: AsyncSession = Depends()):
         self.repository = EmployeeRepository(session)
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     
     async def create(self, employee_data: EmployeeCreate) -> EmployeeRead:
         """
@@ -30,7 +30,7 @@ class EmployeeService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
 
         # Hash the password
-        password_hash = self.pwd_context.hash(employee_data.password)
+        password_hash = await hash_password_async(employee_data.password)
         
         # Create employee instance
         employee = Employee(
@@ -81,6 +81,8 @@ class EmployeeService:
         success = await self.repository.delete(employee_id)
         if not success:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
+        # Удалённый сотрудник не должен проходить авторизацию по старому снимку
+        invalidate_employee_principal(employee_id)
         return ("Employee deletet succesfully")
 
     async def get_all_employees(self, page: int = 1, page_size: int = 10) -> Dict:
@@ -1,18 +1,77 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.pagination import InvalidCursor, decode_cursor
 from app.db.repositories.app_repository import LoanApplicationRepository
 from app.db.repositories.customer_repository import CustomerRepository
 from app.schemas.customer_schemas import CustomerRead
 from app.schemas.application_schemas import LoanApplicationRead, LoanApplicationUpdateStatus
-from app.services.mcp_services.common_services import load_loans_data
+from app.services.knowledge_services.knowledge_store import knowledge_store
+from app.services.mcp_services.common_services import LOANS_FILENAME, load_loans_data
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# lang -> (версия loans.json, индекс имя кредита -> описание)
+_loan_index_cache: Dict[str, Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+
+
+def _build_loan_index(loan_products: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Индекс имя -> описание кредита. Обходит продукты в том же порядке, что и
+    прежний линейный поиск, и оставляет первое совпадение — результат тот же.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+
+    def add(name: Any, info: Dict[str, Any]) -> None:
+        if name and name not in index:
+            index[name] = info
+
+    for product in loan_products or []:
+        # 1) Главный кредит — копия без подкатегорий, спецпрограмм и спецпредложений
+        main = {
+            key: value
+            for key, value in product.items()
+            if key not in ("subcategories", "special_programs", "special_offers")
+        }
+        add(product.get("name"), main)
+        add(product.get("type"), main)
+
+        # 2) Подкатегории
+        for sub in product.get("subcategories", []):
+            add(sub.get("name"), sub)
+
+        # 3) Спец программы
+        for sp in product.get("special_programs", []):
+            add(sp.get("name"), sp)
+
+        # 4) Спец предложения (могут быть вложенные dict/списки)
+        special_offers = product.get("special_offers", {})
+        if isinstance(special_offers, dict):
+            for region, offers in special_offers.items():
+                if isinstance(offers, list):
+                    for offer in offers:
+                        add(offer.get("name"), offer)
+
+    return index
+
+
+def get_loan_index(lang: str = "ky") -> Dict[str, Dict[str, Any]]:
+    """Индекс кредитов, перестраивается только при новой версии loans.json."""
+    try:
+        version = knowledge_store.version(lang, LOANS_FILENAME)
+    except Exception as e:
+        logger.error(f"Failed to load loans data: {e}")
+        return {}
+    cached = _loan_index_cache.get(lang)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = _build_loan_index(load_loans_data(lang))
+    _loan_index_cache[lang] = (version, index)
+    return index
+
 
 class LoanApplicationService:
     """
@@ -24,15 +83,19 @@ class LoanApplicationService:
         self.repo = LoanApplicationRepository(session)
         self.customer_repo = CustomerRepository(session)
 
-    async def get_all(self, page: int = 1, page_size: int = 10) -> Dict:
+    async def get_all(self, cursor: Optional[str] = None, page_size: int = 10, include_total: bool = False) -> Dict:
         """
-        Retrieve all loan applications with customer and loan info.
+        Retrieve loan applications page by page with customer and loan info.
+        `total` is None unless include_total is set.
         """
         try:
-            applications, total = await self.repo.get_all(page=page, page_size=page_size)
+            applications, next_cursor = await self.repo.get_all(cursor=decode_cursor(cursor), page_size=page_size)
+            total = await self.repo.count_all() if include_total else None
 
-            # Загружаем справочник кредитов один раз
-            loan_products = load_loans_data()
+            # Клиенты всей страницы — одним запросом
+            customers = await self.customer_repo.get_by_ids(app.customer_id for app in applications)
+            customers_data = {cid: CustomerRead.model_validate(c) for cid, c in customers.items()}
+            loan_index = get_loan_index()
 
             enriched_apps = []
             for app in applications:
@@ -40,11 +103,10 @@ class LoanApplicationService:
                 app_data = LoanApplicationRead.model_validate(app)
 
                 # 2) пользователь
-                customer = await self.customer_repo.get_by_id(app.customer_id)
-                customer_data = CustomerRead.model_validate(customer) if customer else None
+                customer_data = customers_data.get(app.customer_id)
 
-                # 3) кредит (поиск по loan_name заявки)
-                loan_info = self._find_loan_info(loan_products, app.loan_type)
+                # 3) кредит (по loan_name заявки)
+                loan_info = loan_index.get(app.loan_type, {}) if app.loan_type else {}
 
                 enriched_apps.append({
                     "application": app_data,
@@ -54,9 +116,12 @@ class LoanApplicationService:
 
             return {
                 "loan_applications": enriched_apps,
+                "next_cursor": next_cursor,
                 "total": total
             }
 
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to retrieve loan applications: {str(e)}")
             raise HTTPException(
@@ -64,46 +129,6 @@ class LoanApplicationService:
                 detail="Failed to retrieve loan applications"
             )
 
-    def _find_loan_info(self, loan_products: Any, loan_name: str) -> Dict[str, Any]:
-        """
-        Ищем кредит по имени (в type, name, subcategories, special_offers/programs).
-        Возвращаем целиком объект, если найден.
-        """
-        if not loan_name or not loan_products:
-            return {}
-
-        for product in loan_products:
-            # 1) Проверяем главный кредит
-            if product.get("name") == loan_name or product.get("type") == loan_name:
-                # Создаем копию продукта без подкатегорий, спецпрограмм и спецпредложений
-                result = {
-                    key: value
-                    for key, value in product.items()
-                    if key not in ("subcategories", "special_programs", "special_offers")
-                }
-                return result
-
-            # 2) Проверяем подкатегории
-            for sub in product.get("subcategories", []):
-                if sub.get("name") == loan_name:
-                    return sub
-
-            # 3) Проверяем спец программы
-            for sp in product.get("special_programs", []):
-                if sp.get("name") == loan_name:
-                    return sp
-
-            # 4) Проверяем спец предложения (могут быть вложенные dict/списки)
-            special_offers = product.get("special_offers", {})
-            if isinstance(special_offers, dict):
-                for region, offers in special_offers.items():
-                    if isinstance(offers, list):
-                        for offer in offers:
-                            if offer.get("name") == loan_name:
-                                return offer
-
-        return {}
-
     async def update_status(self, application_id: int, data: LoanApplicationUpdateStatus) -> LoanApplicationRead:
         """
         Update the status of a loan application.
@@ -4,7 +4,7 @@ from fastapi import HTTPException, status
 
 from app.db.models import Customer
 from app.db.repositories.customer_repository import CustomerRepository
-from app.services.security import hash_password, verify_password
+from app.services.security import hash_password_async, verify_password_async
 
 class AuthService:
     def __init__(self, session: AsyncSession):
@@ -26,7 +26,7 @@ class AuthService:
             phone_number=phone_number or "",
             email=email.lower(),
             address="",
-            password_hash=hash_password(password),
+            password_hash=await hash_password_async(password),
         )
         await self.repo.add(customer)
         await self.session.commit()
@@ -35,6 +35,6 @@ class AuthService:
 
     async def validate_login(self, *, email: str, password: str) -> Customer:
         user = await self.repo.get_by_email(email.lower())
-        if not user or not verify_password(password, user.password_hash):
+        if not user or not await verify_password_async(password, user.password_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
         return user
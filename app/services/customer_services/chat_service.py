@@ -10,7 +10,6 @@ from app.db.repositories.chat_repository import ChatRepository
 from app.db.models import Chat, Customer
 from app.schemas.chat_schemas import ChatCreate, ChatUpdate, Chat as ChatSchema
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ChatService:
@@ -6,11 +6,11 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.repositories.customer_repository import CustomerRepository
+from app.db.pagination import InvalidCursor, decode_cursor
 from app.db.models import Customer
 from app.schemas.customer_schemas import CustomerRead, AccountRead, CardRead, TransactionRead, LoanRead
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CustomerService:
@@ -23,22 +23,30 @@ class CustomerService:
         self.session = session
         self.repo = CustomerRepository(session)
 
-    async def get_all_customers(self, page: int = 1, page_size: int = 10) -> Dict:
+    async def get_all_customers(
+        self, cursor: Optional[str] = None, page_size: int = 10, include_total: bool = False
+    ) -> Dict:
         """
-        Retrieve all customers with pagination.
+        Retrieve customers page by page.
 
-        :param page: Page number (1-based).
+        :param cursor: Opaque cursor from the previous page (None — first page).
         :param page_size: Number of records per page.
-        :return: Dictionary with customers and total count.
-        :raises HTTPException: If an error occurs.
+        :param include_total: Also return the (cached) total count.
+        :return: Dictionary with customers, next_cursor and total (None unless requested).
+        :raises HTTPException: If the cursor is invalid or an error occurs.
         """
         try:
-            offset = (page - 1) * page_size
-            customers, total = await self.repo.get_all_customers(page=page, page_size=page_size)
+            customers, next_cursor = await self.repo.get_all_customers(
+                cursor=decode_cursor(cursor), page_size=page_size
+            )
+            total = await self.repo.count_all_customers() if include_total else None
             return {
                 "customers": [CustomerRead.model_validate(c) for c in customers],
+                "next_cursor": next_cursor,
                 "total": total
             }
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to retrieve customers: {str(e)}")
             raise HTTPException(
@@ -118,21 +126,25 @@ class CustomerService:
             )
 
     async def get_transactions_by_customer_id(
-        self, customer_id: int, page: int = 1, page_size: int = 10
-    ) -> Tuple[List[TransactionRead], int]:
+        self, customer_id: int, cursor: Optional[str] = None, page_size: int = 10, include_total: bool = False
+    ) -> Tuple[List[TransactionRead], Optional[str], Optional[int]]:
         """
-        Retrieve paginated transactions for a customer by ID.
+        Retrieve transactions for a customer by ID, newest first, page by page.
 
         :param customer_id: The ID of the customer.
-        :param page: Page number for pagination.
+        :param cursor: Opaque cursor from the previous page (None — first page).
         :param page_size: Number of transactions per page.
-        :return: Tuple of list of TransactionRead schemas and total count.
+        :param include_total: Also return the (cached) total count.
+        :return: Tuple of list of TransactionRead schemas, next cursor and total (None unless requested).
         """
         try:
-            transactions, total = await self.repo.get_transactions_by_customer_id(
-                customer_id=customer_id, page=page, page_size=page_size
+            transactions, next_cursor = await self.repo.get_transactions_by_customer_id(
+                customer_id=customer_id, cursor=decode_cursor(cursor), page_size=page_size
             )
-            return [TransactionRead.model_validate(t) for t in transactions], total
+            total = await self.repo.count_transactions_by_customer_id(customer_id) if include_total else None
+            return [TransactionRead.model_validate(t) for t in transactions], next_cursor, total
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to retrieve transactions for customer {customer_id}: {str(e)}")
             raise HTTPException(
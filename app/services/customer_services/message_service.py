@@ -1,6 +1,7 @@
 # app/services/message_service.py
 
 from typing import List
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
@@ -36,6 +37,15 @@ class MessageService:
         await self.session.refresh(created_message)
         return MessageSchema.model_validate(created_message)
 
+    async def add_messages(self, messages_data: List[MessageCreate]) -> None:
+        """
+        Create several messages in one statement and one commit.
+
+        :param messages_data: Input data for the messages, in chronological order.
+        """
+        await self.repo.add_messages([m.model_dump() for m in messages_data])
+        await self.session.commit()
+
     async def get_message_by_id(self, message_id: int) -> MessageSchema:
         """
         Retrieve a message by its ID.
@@ -59,6 +69,18 @@ class MessageService:
         messages = await self.repo.get_by_chat_id(chat_id)
         return [MessageSchema.model_validate(m) for m in messages]
 
+    async def get_last_messages(self, chat_id: int, limit: int) -> List[Row]:
+        """
+        Retrieve the most recent messages of a chat for the LLM context.
+
+        :param chat_id: The ID of the chat.
+        :param limit: Maximum number of messages.
+        :return: List of (role, content) rows in chronological order.
+        """
+        if limit <= 0:
+            return []
+        return await self.repo.get_last_n(chat_id, limit)
+
     async def update_message(self, message_id: int, update_data: MessageUpdate) -> MessageSchema:
         """
         Update an existing message.
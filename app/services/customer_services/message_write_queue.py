@@ -0,0 +1,208 @@
+# app/services/customer_services/message_write_queue.py
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from app.db.base import SessionLocal
+from app.db.repositories.message_repository import MessageRepository
+from app.schemas.message_schemas import MessageCreate
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteQueue:
+    """
+    Write-behind queue for chat messages.
+
+    Finished turns are put on an in-memory queue and a background worker
+    inserts them in batches: a flush happens when `batch_size` rows are
+    collected or `flush_interval` seconds after the first pending row,
+    whichever comes first. Transient database errors are retried with
+    exponential backoff; pending rows are flushed on shutdown.
+
+    created_at is taken when the turn is enqueued, so the stored order does
+    not depend on when the batch reaches the database.
+    """
+
+    def __init__(
+        self,
+        *,
+        flush_interval: float,
+        batch_size: int,
+        max_retries: int,
+        retry_backoff: float,
+        max_size: int,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.enqueued_rows = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.retries = 0
+        self.dropped_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done() and not self._stopping
+
+    def start(self) -> None:
+        """Start the background worker (called from the FastAPI lifespan)."""
+        if self.running:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker = asyncio.create_task(self._run(), name="message-write-queue")
+        logger.info("Message write queue started (interval=%ss, batch=%s)", self.flush_interval, self.batch_size)
+
+    async def stop(self) -> None:
+        """Stop accepting turns, flush everything pending and stop the worker."""
+        if self._worker is None:
+            return
+        self._stopping = True
+        # Пустой элемент будит воркер, если он ждёт новых сообщений
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        logger.info("Message write queue stopped, %s rows flushed in total", self.flushed_rows)
+
+    async def put(self, messages: List[MessageCreate]) -> None:
+        """
+        Queue the messages of one turn. Waits if the queue is full.
+
+        :raises RuntimeError: if the queue is not running.
+        """
+        if not self.running:
+            raise RuntimeError("Message write queue is not running")
+        now = datetime.utcnow()
+        rows = [{**m.model_dump(), "created_at": now} for m in messages]
+        await self._queue.put(rows)
+        self.enqueued_rows += len(rows)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                if self._stopping:
+                    break
+                continue
+            batch: List[Dict[str, Any]] = list(item)
+            deadline = loop.time() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = self._stopping
+                    if stop:
+                        break
+                    continue
+                batch.extend(item)
+            await self._flush(batch)
+            if stop:
+                break
+
+        # Дописываем всё, что успели положить до остановки
+        rest: List[Dict[str, Any]] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item:
+                rest.extend(item)
+        for i in range(0, len(rest), self.batch_size):
+            await self._flush(rest[i:i + self.batch_size])
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with SessionLocal() as session:
+            await MessageRepository(session).add_messages(rows)
+            await session.commit()
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        written = len(rows)
+        attempt = 0
+        while True:
+            try:
+                await self._insert(rows)
+                break
+            except IntegrityError as e:
+                # Повтор не поможет — пишем построчно, чтобы потерять только битые строки
+                logger.error("Batch of %s messages rejected, retrying row by row: %s", len(rows), e)
+                written = await self._insert_rows_individually(rows)
+                break
+            except DBAPIError as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.dropped_rows += len(rows)
+                    logger.error("Dropping %s messages after %s failed attempts: %s", len(rows), attempt, e)
+                    return
+                self.retries += 1
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                logger.warning("Message flush failed (attempt %s), retrying in %.2fs: %s", attempt, delay, e)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # Воркер не должен падать из-за одной пачки
+                self.dropped_rows += len(rows)
+                logger.exception("Dropping %s messages after unexpected error: %s", len(rows), e)
+                return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.flushed_rows += written
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    async def _insert_rows_individually(self, rows: List[Dict[str, Any]]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                await self._insert([row])
+                written += 1
+            except DBAPIError as e:
+                self.dropped_rows += 1
+                logger.error("Dropping message for chat_id %s: %s", row.get("chat_id"), e)
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued_rows": self.enqueued_rows,
+            "flushed_rows": self.flushed_rows,
+            "dropped_rows": self.dropped_rows,
+            "flushes": self.flushes,
+            "retries": self.retries,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+message_write_queue = MessageWriteQueue(
+    flush_interval=settings.message_flush_interval_ms / 1000,
+    batch_size=settings.message_flush_batch_size,
+    max_retries=settings.message_flush_max_retries,
+    retry_backoff=settings.message_flush_retry_backoff,
+    max_size=settings.message_queue_max_size,
+)
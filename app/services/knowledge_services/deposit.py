@@ -3,6 +3,8 @@ import logging
 from pathlib import Path
 from fastapi import HTTPException
 
+from .knowledge_store import knowledge_store
+
 logger = logging.getLogger(__name__)
 
 class DepositService:
@@ -110,6 +112,7 @@ class DepositService:
             # Записываем обновленный JSON
             with open(file_path, "w", encoding="utf-8") as file:
                 json.dump(current_data, file, ensure_ascii=False, indent=2)
+            knowledge_store.invalidate(lang, self.filename)
             logger.info(f"Файл успешно обновлён: {file_path}")
             return {"status": "success"}
         except Exception as e:
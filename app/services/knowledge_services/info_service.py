@@ -4,6 +4,8 @@ from pathlib import Path
 from fastapi import HTTPException
 from typing import List, Dict, Any
 
+from .knowledge_store import knowledge_store
+
 logger = logging.getLogger(__name__)
 
 class InfoService:
@@ -142,6 +144,7 @@ class InfoService:
             file_path.parent.mkdir(parents=True, exist_ok=True)
             with open(file_path, "w", encoding="utf-8") as file:
                 json.dump(current_data, file, ensure_ascii=False, indent=2)
+            knowledge_store.invalidate(lang, self.filename)
             logger.info(f"Файл успешно обновлён: {file_path}")
             return {"status": "success", "updated_item": updated_item}
         except Exception as e:
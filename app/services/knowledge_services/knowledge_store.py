@@ -0,0 +1,151 @@
+import itertools
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    data: Any
+    mtime_ns: int
+    size: int
+    version: int
+    loaded_at: float
+    checked_at: float
+
+
+class KnowledgeStore:
+    """
+    In-memory cache of the parsed knowledge/<lang>/*.json files.
+
+    Each file is parsed once and served from memory until its mtime or size
+    changes (checked at most every `stat_interval` seconds) or until
+    invalidate() is called by an admin write. A reload builds a new snapshot
+    and swaps it in under a lock, so readers always see either the old or the
+    new file, never a half-parsed one. If the file cannot be parsed (e.g. it is
+    being written right now) the previous snapshot keeps being served.
+
+    Snapshots are shared between all callers and must be treated as read-only:
+    copy before modifying.
+    """
+
+    def __init__(self, base_dir: Path, stat_interval: float = 1.0) -> None:
+        self.base_dir = Path(base_dir)
+        self.stat_interval = stat_interval
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def _path(self, lang: str, filename: str) -> Path:
+        return self.base_dir / lang / filename
+
+    def get(self, lang: str, filename: str) -> Any:
+        """
+        Return the parsed content of knowledge/<lang>/<filename>.
+
+        :raises OSError: the file does not exist and was never loaded
+        :raises json.JSONDecodeError: the file is invalid and was never loaded
+        """
+        key = (lang, filename)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.stat_interval:
+            self.hits += 1
+            return entry.data
+
+        path = self._path(lang, filename)
+        try:
+            stat = path.stat()
+        except OSError:
+            if entry is None:
+                raise
+            # Файл временно недоступен — отдаём последний снимок
+            self.errors += 1
+            return entry.data
+
+        if entry is not None and (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+            entry.checked_at = now
+            self.hits += 1
+            return entry.data
+
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current is not entry and (stat.st_mtime_ns, stat.st_size) == (current.mtime_ns, current.size):
+                # Другой поток уже перечитал файл
+                self.hits += 1
+                return current.data
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                self.errors += 1
+                if current is None:
+                    raise
+                logger.error(f"Failed to reload {path}, serving previous version: {e}")
+                current.checked_at = now
+                return current.data
+
+            self._entries[key] = _Entry(
+                data=data,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                version=next(self._versions),
+                loaded_at=time.time(),
+                checked_at=now,
+            )
+            if current is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+                logger.info(f"Knowledge file reloaded: {path}")
+            return data
+
+    def version(self, lang: str, filename: str) -> int:
+        """
+        Version of the currently loaded snapshot (loads the file if needed).
+
+        Versions only grow, so derived caches can use them as a key.
+        """
+        self.get(lang, filename)
+        return self._entries[(lang, filename)].version
+
+    def invalidate(self, lang: Optional[str] = None, filename: Optional[str] = None) -> None:
+        """Force a re-stat of the matching files on their next access."""
+        with self._lock:
+            for (entry_lang, entry_filename), entry in self._entries.items():
+                if lang is not None and entry_lang != lang:
+                    continue
+                if filename is not None and entry_filename != filename:
+                    continue
+                entry.checked_at = float("-inf")
+                entry.mtime_ns = -1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "files": [
+                {"lang": lang, "file": filename, "version": e.version, "size": e.size, "loaded_at": e.loaded_at}
+                for (lang, filename), e in sorted(self._entries.items())
+            ],
+        }
+
+
+knowledge_store = KnowledgeStore(
+    base_dir=settings.knowledge_base_dir or Path("knowledge"),
+    stat_interval=settings.knowledge_stat_interval,
+)
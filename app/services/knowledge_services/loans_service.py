@@ -4,6 +4,8 @@ from pathlib import Path
 from fastapi import HTTPException
 from typing import List, Dict, Any
 
+from .knowledge_store import knowledge_store
+
 logger = logging.getLogger(__name__)
 
 class LoansService:
@@ -107,6 +109,7 @@ class LoansService:
 
             with open(file_path, "w", encoding="utf-8") as file:
                 json.dump(file_data, file, ensure_ascii=False, indent=2)
+            knowledge_store.invalidate(lang, self.filename)
             
             logger.info(f"Продукт с типом '{product_type}' успешно обновлен в файле {file_path}")
             return data
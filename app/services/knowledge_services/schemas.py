@@ -4,6 +4,8 @@ from pathlib import Path
 from fastapi import HTTPException
 from typing import Dict, List
 
+from .knowledge_store import knowledge_store
+
 logger = logging.getLogger(__name__)
 
 class SchemasService:
@@ -106,6 +108,7 @@ class SchemasService:
             # Записываем обновлённый JSON
             with open(file_path, "w", encoding="utf-8") as file:
                 json.dump(file_data, file, ensure_ascii=False, indent=2)
+            knowledge_store.invalidate(lang, self.filename)
             logger.info(f"Файл успешно обновлён: {file_path}")
             return {"status": "success"}
 
@@ -6,6 +6,8 @@ import re
 FUNC_RE = re.compile(r"^name=(?P<name>[^,]+)(?:\s*,\s*(?P<args>.*))?$", re.DOTALL)
 ARG_RE = re.compile(r"\s*(?P<k>\w+)\s*=\s*(?P<v>.+?)\s*(?=,\s*\w+=|$)")
 FUNC_CALL_PATTERN = re.compile(r"\[FUNC_CALL:(.*?)\]", re.DOTALL)
+# Opening of a function call marker, used by the streaming parser
+FUNC_CALL_MARKER = "[FUNC_CALL:"
 
 # Restricted functions that require authorization
 RESTRICTED_FUNCTIONS = [
@@ -1,14 +1,20 @@
 """Function call processor for LLM responses."""
 
+import asyncio
 import json
 import logging
-from typing import List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.db.models import Customer
 from app.services.mcp_services.tool_arguments import filter_tool_args
+from app import metrics
+from app.settings import settings
+from app.tracing import tracer
 
 from .constants import RESTRICTED_FUNCTIONS, ERROR_MESSAGES
-from .mcp_client import call_mcp_tool
+from .mcp_client import call_mcp_tool, mcp_pool
+from .tool_registry import tool_registry
 from .utils import parse_func_call
 
 logger = logging.getLogger(__name__)
@@ -48,6 +54,57 @@ class FunctionProcessor:
         }
         return f"data: {json.dumps(sse_data, ensure_ascii=False)}\n\n"
 
+    @staticmethod
+    async def call_tool(name: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Dispatch a tool call in-process or through the MCP pool, depending on settings."""
+        if settings.tool_dispatch_mode == "inprocess":
+            return await tool_registry.call_tool(name, kwargs)
+        return await call_mcp_tool(name, kwargs)
+
+    @staticmethod
+    async def is_read_only(name: str) -> bool:
+        """Whether the tool is marked read-only in the registry the calls are dispatched to."""
+        try:
+            if settings.tool_dispatch_mode == "inprocess":
+                return await tool_registry.is_read_only(name)
+            return await mcp_pool.is_read_only(name)
+        except Exception as e:
+            logger.error("Could not resolve annotations for tool %s: %s", name, e)
+            return False
+
+    @staticmethod
+    async def _run_tool(name: str, kwargs: Dict[str, Any], timeout: Optional[float], index: int = 0) -> str:
+        """Call one tool and turn any failure into an error text for the LLM."""
+        logger.info("Calling tool (%s): %s with args: %s", settings.tool_dispatch_mode, name, kwargs)
+        status = "ok"
+        started = time.perf_counter()
+        with tracer.span("tool.execute", tool=name, index=index, dispatch=settings.tool_dispatch_mode) as span:
+            deadline = asyncio.timeout(timeout)
+            try:
+                async with deadline:
+                    output = await FunctionProcessor.call_tool(name, kwargs)
+                return output or ""
+            except Exception as e:
+                # TimeoutError самого тула (MCP read timeout, httpx, БД) — обычная ошибка, не наш дедлайн
+                if isinstance(e, TimeoutError) and deadline.expired():
+                    logger.error("Tool %s timed out after %ss", name, timeout)
+                    status = "timeout"
+                    span.set(error="timeout")
+                    return f"Ошибка: превышено время ожидания ответа инструмента {name}"
+                logger.error(
+                    "Error processing function call %s with args %s: %s",
+                    name,
+                    kwargs,
+                    str(e),
+                    exc_info=True  # Включаем полный стек ошибки для детального логирования
+                )
+                status = "error"
+                span.set(error=type(e).__name__)
+                return f"Ошибка: {str(e)}"  # LLM will handle politely
+            finally:
+                metrics.tool_calls.labels(name, status).inc()
+                metrics.tool_duration_seconds.labels(name).observe(time.perf_counter() - started)
+
     @staticmethod
     async def process_function_calls(
         func_calls: List[str], 
@@ -56,6 +113,11 @@ class FunctionProcessor:
     ) -> Tuple[List[str], bool]:
         """
         Process function calls and return results.
+
+        Read-only tools run concurrently (at most settings.tool_max_concurrency
+        at a time, each limited by settings.tool_call_timeout). Writing tools run
+        one by one after all reads have finished, in the order the model asked
+        for them. Results keep the order of func_calls.
         
         Args:
             func_calls: List of function call strings to process
@@ -66,12 +128,16 @@ class FunctionProcessor:
             Tuple of (results, is_faq_call) where results is a list of tool outputs
             and is_faq_call indicates if any call was to get_faq_by_category
         """
-        results: List[str] = []
+        results: List[str] = [""] * len(func_calls)
         is_faq = False
+        reads: List[Tuple[int, str, Dict[str, Any]]] = []
+        writes: List[Tuple[int, str, Dict[str, Any]]] = []
         
-        for fc in func_calls:
+        for i, fc in enumerate(func_calls):
             try:
-                name, kwargs = parse_func_call(fc)
+                with tracer.span("tool.parse", index=i) as span:
+                    name, kwargs = parse_func_call(fc)
+                    span.set(tool=name)
                 logger.info("Parsed function call: %s with args: %s", name, kwargs)
                 
                 if name == "get_faq_by_category":
@@ -86,21 +152,31 @@ class FunctionProcessor:
                     kwargs["lang"] = lang
                 
                 # Filter tool arguments
-                kwargs = filter_tool_args(name, kwargs)
-                logger.info("Calling MCP tool: %s with args: %s", name, kwargs)
-                
-                # Call the tool
-                output = await call_mcp_tool(name, kwargs)
-                results.append(output or "")
-                
+                with tracer.span("tool.filter", index=i, tool=name):
+                    kwargs = filter_tool_args(name, kwargs)
             except Exception as e:
-                logger.error(
-                    "Error processing function call %s with args %s: %s",
-                    name,
-                    kwargs,
-                    str(e),
-                    exc_info=True  # Включаем полный стек ошибки для детального логирования
-                )
-                results.append(f"Ошибка: {str(e)}")  # LLM will handle politely
+                logger.error("Error parsing function call %s: %s", fc, e, exc_info=True)
+                results[i] = f"Ошибка: {str(e)}"
+                continue
+
+            if await FunctionProcessor.is_read_only(name):
+                reads.append((i, name, kwargs))
+            else:
+                writes.append((i, name, kwargs))
+
+        if reads:
+            semaphore = asyncio.Semaphore(max(1, settings.tool_max_concurrency))
+
+            async def run_read(i: int, name: str, kwargs: Dict[str, Any]) -> None:
+                async with semaphore:
+                    results[i] = await FunctionProcessor._run_tool(name, kwargs, settings.tool_call_timeout, i)
+
+            async with asyncio.TaskGroup() as tg:
+                for i, name, kwargs in reads:
+                    tg.create_task(run_read(i, name, kwargs))
+
+        # Пишущие тулы не прерываем по таймауту: отмена посреди перевода оставит его в неизвестном состоянии
+        for i, name, kwargs in writes:
+            results[i] = await FunctionProcessor._run_tool(name, kwargs, None, i)
         
-        return results, is_faq
\ No newline at end of file
+        return results, is_faq
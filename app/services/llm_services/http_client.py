@@ -0,0 +1,133 @@
+"""Process-wide HTTP client for the upstream LLM endpoint."""
+
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMHttpClient:
+    """
+    One pooled httpx.AsyncClient shared by all conversations.
+
+    Creating an AsyncClient per request meant a new TCP + TLS handshake for
+    every LLM leg. The shared client keeps connections alive between requests
+    (and multiplexes streams over one connection when HTTP/2 is enabled).
+    It is opened/closed by the FastAPI lifespan and created lazily if used
+    outside of it (scripts, tests).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        http2: bool,
+        connect_timeout: float,
+        read_timeout: float,
+        write_timeout: float,
+        pool_timeout: float,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self.http2 = http2
+        self.http2_active = False
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests_total = 0
+        self.requests_failed = 0
+        self.in_flight = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client
+
+    def start(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            return
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("LLM_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+        self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=http2)
+        self.http2_active = http2
+        logger.info(
+            "LLM HTTP client started (http2=%s, max_connections=%s, keepalive=%s)",
+            http2,
+            self.limits.max_connections,
+            self.limits.max_keepalive_connections,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("LLM HTTP client closed")
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """client.stream() with request accounting for the diagnostics endpoint."""
+        self.requests_total += 1
+        self.in_flight += 1
+        try:
+            async with self.client.stream(method, url, **kwargs) as resp:
+                yield resp
+        except Exception:
+            self.requests_failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the connection pool state."""
+        stats: Dict[str, Any] = {
+            "started": self._client is not None and not self._client.is_closed,
+            "http2": self.http2_active,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "requests_total": self.requests_total,
+            "requests_failed": self.requests_failed,
+            "in_flight": self.in_flight,
+            "connections": 0,
+            "in_use": 0,
+            "idle": 0,
+            "waiting": 0,
+        }
+        # httpcore не публикует метрики пула — читаем его состояние напрямую
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = list(getattr(pool, "_connections", []))
+            stats["connections"] = len(connections)
+            stats["idle"] = sum(1 for c in connections if c.is_idle())
+            stats["in_use"] = stats["connections"] - stats["idle"]
+            stats["waiting"] = sum(1 for r in getattr(pool, "_requests", []) if r.is_queued())
+        return stats
+
+
+llm_http = LLMHttpClient(
+    max_connections=settings.llm_max_connections,
+    max_keepalive_connections=settings.llm_max_keepalive_connections,
+    keepalive_expiry=settings.llm_keepalive_expiry,
+    http2=settings.llm_http2,
+    connect_timeout=settings.llm_connect_timeout,
+    read_timeout=settings.llm_read_timeout,
+    write_timeout=settings.llm_write_timeout,
+    pool_timeout=settings.llm_pool_timeout,
+)
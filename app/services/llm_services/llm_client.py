@@ -1,22 +1,52 @@
 """LLM client for AI Bank assistant."""
 
+import asyncio
 import json
 import logging
-from typing import Any, AsyncGenerator, Dict, List, Optional
+import time
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
 
 import httpx
+from app.db.base import SessionLocal
 from app.db.models import Customer, MessageRole
 from app.services.llm_services.system_promt import get_system_prompt, get_faq_system_prompt, get_tool_response_system_prompt
 from app.services.customer_services.message_service import MessageService
+from app.services.customer_services.message_write_queue import message_write_queue
 from app.schemas.message_schemas import MessageCreate
+from app import metrics
+from app.logging_config import Lazy, log_event, redact
+from app.settings import settings
+from app.tracing import tracer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .function_processor import FunctionProcessor
+from .http_client import llm_http
 from .prompt_builder import PromptBuilder
-from .utils import extract_func_calls
+from .utils import FuncCallStreamParser, extract_func_calls
 
 logger = logging.getLogger(__name__)
 
+# Strong references to in-flight background saves (the event loop keeps only weak ones)
+_pending_saves: Set[asyncio.Task] = set()
+
+
+async def drain_pending_saves(timeout: float) -> None:
+    """Wait for in-flight turn saves (called on shutdown before the write queue stops)."""
+    if not _pending_saves:
+        return
+    _, pending = await asyncio.wait(list(_pending_saves), timeout=timeout)
+    if pending:
+        logger.warning("%s message saves still running after %ss, giving up", len(pending), timeout)
+
+# Дочерние метрики с метками заранее, чтобы на каждом ходе не искать их по словарю
+_FIRST_LEG_TTFT = metrics.llm_ttft_seconds.labels("first")
+_FIRST_LEG_DURATION = metrics.llm_duration_seconds.labels("first")
+_FIRST_LEG_TOKENS = metrics.llm_tokens.labels("first")
+_SECOND_LEG_TTFT = metrics.llm_ttft_seconds.labels("second")
+_SECOND_LEG_DURATION = metrics.llm_duration_seconds.labels("second")
+_SECOND_LEG_TOKENS = metrics.llm_tokens.labels("second")
+
 
 class AitilLLMClient:
     """
@@ -44,6 +74,7 @@ class AitilLLMClient:
         self.request_timeout = request_timeout
         self.function_processor = FunctionProcessor()
         self.db_session = db_session
+        self.outcome: Optional[str] = None
 
     async def _save_messages_to_db(
         self, 
@@ -58,35 +89,52 @@ class AitilLLMClient:
         :param assistant_response: The assistant's response content
         :param chat_id: The chat ID
         """
-        if not self.db_session:
-            logger.warning("No database session provided, skipping message save")
+        messages = [
+            MessageCreate(chat_id=chat_id, role=MessageRole.user, content=user_message),
+            MessageCreate(chat_id=chat_id, role=MessageRole.assistant, content=assistant_response),
+        ]
+        if message_write_queue.running:
+            # The background writer batches turns from all conversations
+            await message_write_queue.put(messages)
             return
-            
+
         try:
-            message_service = MessageService(self.db_session)
-            
-            # Save user message
-            user_msg_data = MessageCreate(
-                chat_id=chat_id,
-                role=MessageRole.user,
-                content=user_message
-            )
-            await message_service.create_message(user_msg_data)
-            
-            # Save assistant response
-            assistant_msg_data = MessageCreate(
-                chat_id=chat_id,
-                role=MessageRole.assistant,
-                content=assistant_response
-            )
-            await message_service.create_message(assistant_msg_data)
-            
-            logger.info(f"Messages saved to database for chat_id: {chat_id}")
-            
+            # Own short-lived session: the save outlives the stream, and the stream's
+            # session is closed when a client disconnects after [DONE]
+            async with SessionLocal() as session:
+                # Both messages go in one INSERT and one commit
+                await MessageService(session).add_messages(messages)
+            logger.debug("Messages saved to database for chat_id: %s", chat_id)
+
         except Exception as e:
             logger.error(f"Failed to save messages to database: {e}")
             # Don't raise the exception to avoid breaking the main flow
 
+    async def _save_turn(self, user_message: str, assistant_response: str, chat_id: Optional[int]) -> None:
+        """Save the turn if the conversation is bound to a chat."""
+        if not chat_id:
+            return
+        try:
+            chat_id_int = int(chat_id)
+        except (ValueError, TypeError):
+            logger.error(f"Invalid chat_id format: {chat_id}")
+            return
+        with tracer.span("messages.persist", write_behind=message_write_queue.running):
+            await self._save_messages_to_db(user_message, assistant_response, chat_id_int)
+
+    def _schedule_save(self, user_message: str, assistant_response: str, chat_id: Optional[int]) -> asyncio.Task:
+        """
+        Start saving the turn in a background task.
+
+        The caller sends [DONE] first and then awaits the task through
+        asyncio.shield, so a client that disconnects after [DONE] cancels
+        the generator but not the write.
+        """
+        task = asyncio.create_task(self._save_turn(user_message, assistant_response, chat_id))
+        _pending_saves.add(task)
+        task.add_done_callback(_pending_saves.discard)
+        return task
+
     async def astream_answer(
         self,
         message: str,
@@ -97,6 +145,39 @@ class AitilLLMClient:
     ) -> AsyncGenerator[str, None]:
         """Stream answer with function call processing and message saving."""
         lang = language or self.default_language
+        self.outcome = None
+        metrics.chat_active_streams.inc()
+        try:
+            with tracer.span("conversation.turn", lang=lang, chat_id=chat_id, authenticated=user is not None) as turn:
+                # aclosing: при обрыве клиента внутренний генератор (и стрим апстрима) закрывается сразу
+                async with aclosing(self._answer(message, lang=lang, user=user, chat_id=chat_id, turn=turn)) as answer:
+                    async for chunk in answer:
+                        yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            # Клиент, закрывший стрим после [DONE] (пока ждём сохранения), ход не отменял
+            if self.outcome is None:
+                self.outcome = "cancelled"
+            raise
+        except Exception:
+            self.outcome = "error"
+            raise
+        finally:
+            metrics.chat_active_streams.dec()
+            metrics.chat_turns.labels(self.outcome or "error").inc()
+
+    def _set_outcome(self, turn: Any, outcome: str, **attributes: Any) -> None:
+        self.outcome = outcome
+        turn.set(outcome=outcome, **attributes)
+
+    async def _answer(
+        self,
+        message: str,
+        *,
+        lang: str,
+        user: Optional[Customer],
+        chat_id: Optional[int],
+        turn: Any,
+    ) -> AsyncGenerator[str, None]:
         payload = await self._build_payload(
             message=message,
             language=lang,
@@ -105,59 +186,72 @@ class AitilLLMClient:
             chat_id=chat_id,
         )
         
-        # Collect initial response text for function analysis
-        parts: List[str] = []
-        async for chunk in self._raw_stream(payload):
-            parts.append(chunk)
-        
-        full_text = "".join(parts)
-        logger.info("Full initial response text: %s", full_text)
-        func_calls = extract_func_calls(full_text)
-        
+        # Forward the first answer as it arrives; stop forwarding once a FUNC_CALL marker opens
+        parser = FuncCallStreamParser()
+        streamed: List[str] = []
+        with tracer.span("llm.first_leg") as leg:
+            chunks = 0
+            started = time.perf_counter()
+            async for chunk in self._raw_stream(payload):
+                if not chunks:
+                    leg.event("first_token")
+                    _FIRST_LEG_TTFT.observe(time.perf_counter() - started)
+                chunks += 1
+                in_tool_mode = parser.tool_mode
+                text = parser.feed(chunk)
+                if parser.tool_mode and not in_tool_mode:
+                    leg.event("func_call_marker")
+                if text:
+                    streamed.append(text)
+                    yield self.function_processor.format_sse_response(text)
+            tail = parser.flush()
+            if tail:
+                streamed.append(tail)
+                yield self.function_processor.format_sse_response(tail)
+            leg.set(chunks=chunks)
+            _FIRST_LEG_DURATION.observe(time.perf_counter() - started)
+            _FIRST_LEG_TOKENS.inc(chunks)
+
+        tool_text = parser.tool_text
+        log_event(
+            logger, logging.INFO, "llm.response", "Initial LLM response",
+            text=Lazy(lambda: redact("".join(streamed) + tool_text)),
+        )
+        func_calls = extract_func_calls(tool_text)
+
+        # If no function calls, the answer has already been streamed
+        if not func_calls:
+            if tool_text:
+                # The marker never closed — it is plain text after all
+                streamed.append(tool_text)
+                yield self.function_processor.format_sse_response(tool_text)
+            self._set_outcome(turn, "plain")
+            save = self._schedule_save(message, "".join(streamed), chat_id)
+            turn.event("stream_end")
+            yield "data: [DONE]\n\n"
+            await asyncio.shield(save)
+            return
+
         # Check if authorization is required
         restricted_func = self.function_processor.check_authorization_required(func_calls, user)
         if restricted_func:
             error_message = self.function_processor.get_error_message(lang)
-            
-            # Save messages to DB if user is authorized and chat_id exists
-            if chat_id:
-                try:
-                    chat_id_int = int(chat_id)
-                    await self._save_messages_to_db(message, error_message, chat_id_int)
-                except (ValueError, TypeError):
-                    logger.error(f"Invalid chat_id format: {chat_id}")
-            
+            self._set_outcome(turn, "auth_required", restricted_tool=restricted_func)
+            save = self._schedule_save(message, "".join(streamed) + error_message, chat_id)
             yield self.function_processor.format_sse_response(error_message)
+            turn.event("stream_end")
             yield "data: [DONE]\n\n"
-            return
-
-        # If no function calls, stream the original response
-        if not func_calls:
-            # Collect response chunks for saving
-            response_chunks: List[str] = []
-            
-            for part in parts:
-                response_chunks.append(part)
-                yield self.function_processor.format_sse_response(part)
-            
-            # Save messages to DB if user is authorized and chat_id exists
-            if chat_id:
-                try:
-                    chat_id_int = int(chat_id)
-                    full_response = "".join(response_chunks)
-                    await self._save_messages_to_db(message, full_response, chat_id_int)
-                except (ValueError, TypeError):
-                    logger.error(f"Invalid chat_id format: {chat_id}")
-            
-            yield "data: [DONE]\n\n"
+            await asyncio.shield(save)
             return
 
         # Process function calls
-        results, is_faq = await self.function_processor.process_function_calls(
-            func_calls, user, lang
-        )
+        with tracer.span("tools", calls=len(func_calls)):
+            results, is_faq = await self.function_processor.process_function_calls(
+                func_calls, user, lang
+            )
         
         tool_response = "\n".join(results)
+        self._set_outcome(turn, "faq" if is_faq else "tool", tool_calls=len(func_calls))
         
         # Build system prompt for final response
         if is_faq:
@@ -168,8 +262,9 @@ class AitilLLMClient:
             final_user_message = message
 
         # Build final LLM request
-        builder = PromptBuilder(new_system_prompt)
-        new_messages = await builder.build(user_message=final_user_message, user=user)
+        with tracer.span("prompt.build", leg="second"):
+            builder = PromptBuilder(new_system_prompt)
+            new_messages = await builder.build(user_message=final_user_message, user=user)
         
         new_payload = {
             "model": self.model,
@@ -177,34 +272,45 @@ class AitilLLMClient:
             "temperature": self.temperature,
             "stream": True,
         }
-        logger.info("Final LLM request payload: %s", json.dumps(new_payload, ensure_ascii=False, indent=2))
+        log_event(logger, logging.INFO, "llm.payload", "LLM request payload", leg="second", payload=Lazy(lambda: redact(new_payload)))
         
         # Stream the final response and collect chunks for saving
-        response_chunks: List[str] = []
+        response_chunks: List[str] = list(streamed)
+        save: Optional[asyncio.Task] = None
         
-        async for chunk in self._sse_stream(new_payload):
-            # Extract content from SSE format for saving
-            if chunk.startswith("data: ") and chunk != "data: [DONE]\n\n":
-                try:
-                    data = chunk[len("data: "):].strip()
-                    if data and data != "[DONE]":
-                        obj = json.loads(data)
-                        content = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                        if content:
-                            response_chunks.append(content)
-                except json.JSONDecodeError:
-                    pass
-            
-            yield chunk
+        with tracer.span("llm.second_leg") as leg:
+            chunks = 0
+            started = time.perf_counter()
+            async for chunk in self._sse_stream(new_payload):
+                if chunk == "data: [DONE]\n\n":
+                    # The answer is complete: start saving before [DONE] is sent
+                    save = self._schedule_save(message, "".join(response_chunks), chat_id)
+                    turn.event("stream_end")
+                # Extract content from SSE format for saving
+                elif chunk.startswith("data: "):
+                    if not chunks:
+                        leg.event("first_token")
+                        _SECOND_LEG_TTFT.observe(time.perf_counter() - started)
+                    chunks += 1
+                    try:
+                        data = chunk[len("data: "):].strip()
+                        if data and data != "[DONE]":
+                            obj = json.loads(data)
+                            content = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
+                            if content:
+                                response_chunks.append(content)
+                    except json.JSONDecodeError:
+                        pass
+                
+                yield chunk
+            leg.set(chunks=chunks)
+            _SECOND_LEG_DURATION.observe(time.perf_counter() - started)
+            _SECOND_LEG_TOKENS.inc(chunks)
         
         # Save messages to DB if user is authorized and chat_id exists
-        if chat_id:
-            try:
-                chat_id_int = int(chat_id)
-                full_response = "".join(response_chunks)
-                await self._save_messages_to_db(message, full_response, chat_id_int)
-            except (ValueError, TypeError):
-                logger.error(f"Invalid chat_id format: {chat_id}")
+        if save is None:
+            save = self._schedule_save(message, "".join(response_chunks), chat_id)
+        await asyncio.shield(save)
 
     async def _build_payload(
         self,
@@ -216,14 +322,15 @@ class AitilLLMClient:
         chat_id: Optional[int] = None,
     ) -> Dict[str, Any]:
         """Build request payload for LLM."""
-        system_prompt = get_system_prompt(language)
-        builder = PromptBuilder(system_prompt)
-        messages = await builder.build(
-            user_message=message, 
-            user=user, 
-            chat_id=chat_id, 
-            db_session=self.db_session
-        )
+        with tracer.span("prompt.build", leg="first"):
+            system_prompt = get_system_prompt(language)
+            builder = PromptBuilder(system_prompt)
+            messages = await builder.build(
+                user_message=message, 
+                user=user, 
+                chat_id=chat_id, 
+                db_session=self.db_session
+            )
 
         payload = {
             "model": self.model,
@@ -231,59 +338,68 @@ class AitilLLMClient:
             "temperature": self.temperature,
             "stream": stream,
         }
-        logger.info("LLM request payload: %s", json.dumps(payload, ensure_ascii=False, indent=2))
+        log_event(logger, logging.INFO, "llm.payload", "LLM request payload", leg="first", payload=Lazy(lambda: redact(payload)))
         return payload
 
+    def _timeout(self) -> Any:
+        """Per-client timeout override; by default the shared client's timeouts apply."""
+        if self.request_timeout is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return httpx.Timeout(self.request_timeout)
+
     async def _raw_stream(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Stream raw text content for function analysis."""
         headers = {"Accept": "text/event-stream", "Content-Type": "application/json"}
-        timeout = None if self.request_timeout is None else httpx.Timeout(self.request_timeout)
-        
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            async with client.stream("POST", self.llm_url, json=payload, headers=headers) as resp:
-                resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-                    data = line[len("data:"):].strip()
-                    if data == "[DONE]":
-                        break
-                    try:
-                        obj = json.loads(data)
-                        chunk = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                        if chunk:
-                            yield chunk
-                    except json.JSONDecodeError:
-                        continue
+
+        async with llm_http.stream("POST", self.llm_url, json=payload, headers=headers, timeout=self._timeout()) as resp:
+            resp.raise_for_status()
+            tracer.event("upstream_connected", http_version=resp.http_version)
+            done = False
+            async for line in resp.aiter_lines():
+                # После [DONE] дочитываем тело: недочитанный ответ закрывает соединение вместо возврата в пул
+                if done or not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    done = True
+                    continue
+                try:
+                    obj = json.loads(data)
+                    chunk = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
+                    if chunk:
+                        yield chunk
+                except json.JSONDecodeError:
+                    continue
 
     async def _sse_stream(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Stream SSE formatted response to client."""
         headers = {"Accept": "text/event-stream", "Content-Type": "application/json"}
-        timeout = None if self.request_timeout is None else httpx.Timeout(self.request_timeout)
-        
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            async with client.stream("POST", self.llm_url, json=payload, headers=headers) as resp:
-                resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-                    data = line[len("data:"):].strip()
-                    if data == "[DONE]":
-                        yield "data: [DONE]\n\n"
-                        break
-                    try:
-                        obj = json.loads(data)
-                        chunk = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                        if chunk:
-                            yield self.function_processor.format_sse_response(chunk)
-                    except json.JSONDecodeError:
-                        continue
+
+        async with llm_http.stream("POST", self.llm_url, json=payload, headers=headers, timeout=self._timeout()) as resp:
+            resp.raise_for_status()
+            tracer.event("upstream_connected", http_version=resp.http_version)
+            done = False
+            async for line in resp.aiter_lines():
+                if done or not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    done = True
+                    yield "data: [DONE]\n\n"
+                    continue
+                try:
+                    obj = json.loads(data)
+                    chunk = obj.get("choices", [{}])[0].get("delta", {}).get("content", "")
+                    if chunk:
+                        yield self.function_processor.format_sse_response(chunk)
+                except json.JSONDecodeError:
+                    continue
 
 
 def build_llm_client(db_session: Optional[AsyncSession] = None) -> AitilLLMClient:
     """Build and return LLM client instance."""
     return AitilLLMClient(
-        llm_url="https://chat.aitil.kg/mcp_suroo",
+        llm_url=settings.llm_url,
         model="aitil",
         temperature=0.5,
         default_language="ky",
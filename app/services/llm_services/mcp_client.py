@@ -2,34 +2,267 @@
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
 
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, Tool
+
+from app.settings import settings
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 
-async def call_mcp_tool(tool_name: str, tool_args: Dict[str, Any]) -> Optional[str]:
-    """Call MCP tool with given name and arguments."""
-    params = StdioServerParameters(
-        command="python",
+def _server_params() -> StdioServerParameters:
+    return StdioServerParameters(
+        command=sys.executable,
         args=["-m", "app.mcp.mcp_server"],
     )
 
-    async with stdio_client(params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # Initialize connection
-            await session.initialize()
 
-            # Wait for tools to register
-            await asyncio.sleep(0.5)
+def _retryable(error: Exception, read_only: bool) -> bool:
+    """
+    Transport failure of a dead server process that is safe to retry on another session.
+
+    A broken/closed stream means the request was never written. A connection
+    closed while waiting for the reply is ambiguous (the tool may have run),
+    so it is retried only for read-only tools.
+    """
+    if isinstance(error, (anyio.BrokenResourceError, anyio.ClosedResourceError)):
+        return True
+    return read_only and isinstance(error, McpError) and error.error.code == CONNECTION_CLOSED
+
+
+class _PooledSession:
+    """
+    One long-lived `app.mcp.mcp_server` process with an initialized ClientSession.
+
+    stdio_client/ClientSession are anyio context managers and must be entered and
+    exited in the same task, so each session is owned by its own background task
+    that keeps the contexts open until stop() is called.
+    """
+
+    def __init__(self, index: int, params: StdioServerParameters) -> None:
+        self.index = index
+        self._params = params
+        self.session: Optional[ClientSession] = None
+        self.last_used = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> None:
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error = None
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.index}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            raise
+        if self._error is not None:
+            raise RuntimeError(f"MCP session {self.index} failed to start") from self._error
+        self.last_used = time.monotonic()
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self._params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.error("MCP session %s terminated: %s", self.index, e)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    def discard(self) -> None:
+        """Mark the session dead without waiting for the process; the next acquire restarts it."""
+        self._stop.set()
+        self.session = None
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+        self._task = None
+        self.session = None
+
+
+class MCPClientPool:
+    """
+    Pool of warm MCP server sessions shared by all conversations.
+
+    Sessions are started once (normally from the FastAPI lifespan), checked out
+    per tool call, health-checked with a ping when they have been idle for a
+    while and restarted if the server process died. The tool list is fetched
+    once at startup instead of on every call.
+    """
 
-            # Get list of tools to ensure requested tool exists
-            tools = await session.list_tools()
-            if not any(t.name == tool_name for t in tools.tools):
-                raise ValueError(f"Tool {tool_name} not found on MCP server")
+    def __init__(
+        self,
+        *,
+        size: int,
+        call_timeout: float,
+        startup_timeout: float,
+        health_check_interval: float,
+    ) -> None:
+        self.size = max(1, size)
+        self.call_timeout = call_timeout
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+        self.tools: Dict[str, Tool] = {}
+        self.restarts = 0
+        self.retries = 0
+        self._sessions: List[_PooledSession] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._started = False
 
-            # Call the tool
-            result = await session.call_tool(tool_name, tool_args)
-            return result.content[0].text if result.content else None
\ No newline at end of file
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        """Start all sessions and cache the tool list."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._started:
+                return
+            params = _server_params()
+            self._sessions = [_PooledSession(i, params) for i in range(self.size)]
+            self._idle = asyncio.Queue()
+            results = await asyncio.gather(
+                *(s.start(self.startup_timeout) for s in self._sessions),
+                return_exceptions=True,
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                await asyncio.gather(*(s.stop() for s in self._sessions), return_exceptions=True)
+                raise errors[0]
+
+            tools = await self._sessions[0].session.list_tools()
+            self.tools = {t.name: t for t in tools.tools}
+
+            for s in self._sessions:
+                self._idle.put_nowait(s)
+            self._started = True
+            logger.info("MCP pool started: %s sessions, %s tools", self.size, len(self.tools))
+
+    async def close(self) -> None:
+        """Stop all sessions (called on application shutdown)."""
+        if not self._started:
+            return
+        self._started = False
+        await asyncio.gather(*(s.stop() for s in self._sessions), return_exceptions=True)
+        self._sessions = []
+        self._idle = None
+        logger.info("MCP pool stopped")
+
+    async def _restart(self, pooled: _PooledSession) -> None:
+        await pooled.stop()
+        self.restarts += 1
+        logger.warning("Restarting MCP session %s", pooled.index)
+        await pooled.start(self.startup_timeout)
+
+    async def _ensure_healthy(self, pooled: _PooledSession) -> None:
+        if not pooled.alive:
+            await self._restart(pooled)
+            return
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), self.call_timeout)
+        except Exception as e:
+            logger.warning("MCP session %s failed health check: %s", pooled.index, e)
+            await self._restart(pooled)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Check out a healthy session for the duration of one call."""
+        if not self._started:
+            await self.start()
+        pooled = await self._idle.get()
+        try:
+            await self._ensure_healthy(pooled)
+            yield pooled
+        except Exception:
+            # Транспорт в неизвестном состоянии — пересоздаём процесс при следующем вызове
+            await pooled.stop()
+            raise
+        except BaseException:
+            # Вызов отменён (таймаут тула, обрыв клиента), а сервер ещё выполняет запрос на этой
+            # сессии. Ждать остановку под отменой нельзя — помечаем, перезапустит следующий acquire
+            pooled.discard()
+            raise
+        finally:
+            pooled.last_used = time.monotonic()
+            self._idle.put_nowait(pooled)
+
+    async def is_read_only(self, tool_name: str) -> bool:
+        """True if the tool is annotated with readOnlyHint (unknown tools count as writes)."""
+        if not self._started:
+            await self.start()
+        tool = self.tools.get(tool_name)
+        return bool(tool and tool.annotations and tool.annotations.readOnlyHint)
+
+    async def call_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Optional[str]:
+        if not self._started:
+            await self.start()
+        if tool_name not in self.tools:
+            raise ValueError(f"Tool {tool_name} not found on MCP server")
+
+        # Трасса не уходит в процесс mcp_server (в call_tool нет _meta) — меряем ожидание сессии и сам вызов
+        with tracer.span("mcp.call", tool=tool_name) as span:
+            for attempt in (1, 2):
+                try:
+                    async with self.acquire() as pooled:
+                        span.event("session_acquired", session=pooled.index)
+                        result = await pooled.session.call_tool(
+                            tool_name,
+                            tool_args,
+                            read_timeout_seconds=timedelta(seconds=self.call_timeout),
+                        )
+                        return result.content[0].text if result.content else None
+                except Exception as e:
+                    # Процесс сервера умер между проверками здоровья: acquire уже остановил сессию,
+                    # повторяем один раз на свежей
+                    if attempt > 1 or not _retryable(e, await self.is_read_only(tool_name)):
+                        raise
+                    self.retries += 1
+                    span.event("retry", error=type(e).__name__)
+                    logger.warning("MCP call %s failed on a dead session, retrying: %r", tool_name, e)
+
+
+mcp_pool = MCPClientPool(
+    size=settings.mcp_pool_size,
+    call_timeout=settings.mcp_call_timeout,
+    startup_timeout=settings.mcp_startup_timeout,
+    health_check_interval=settings.mcp_health_check_interval,
+)
+
+
+async def call_mcp_tool(tool_name: str, tool_args: Dict[str, Any]) -> Optional[str]:
+    """Call MCP tool with given name and arguments."""
+    return await mcp_pool.call_tool(tool_name, tool_args)
@@ -1,20 +1,19 @@
-import json
-import os
-from pathlib import Path
-KNOWLEDGE_BASE_DIR = Path(os.getenv("KNOWLEDGE_BASE_DIR", "knowledge"))
+from typing import Dict, Tuple
+
+from app.services.knowledge_services.knowledge_store import knowledge_store
+
+SCHEMAS_FILENAME = "schemas.json"
 
 
 # helper: нормализуем код языка
 def _norm_lang(language: str) -> str:
     return "ru" if (language or "").strip().lower() == "ru" else "ky"
 
-# helper: загружаем схемы из JSON файлов
+# helper: загружаем схемы из JSON файлов (через кэш базы знаний)
 def _load_schemas(language: str):
     lang = _norm_lang(language)
-    file_path = KNOWLEDGE_BASE_DIR / lang / "schemas.json"
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return knowledge_store.get(lang, SCHEMAS_FILENAME)
     except FileNotFoundError:
         return {}
     
@@ -22,14 +21,24 @@ def _load_schemas(language: str):
 def _get_schemas(language: str):
     return _load_schemas(language)
 
+# lang -> (версия schemas.json, отрендеренный список функций)
+_docs_cache: Dict[str, Tuple[int, str]] = {}
+
 def generate_function_docs(language: str = "ky") -> str:
     """
     Возвращает человекочитаемый список функций и параметров на выбранном языке.
     language: 'ky' (по умолчанию) или 'ru'
     """
-    schemas = _get_schemas(language)
     lang = _norm_lang(language)
+    try:
+        version = knowledge_store.version(lang, SCHEMAS_FILENAME)
+    except FileNotFoundError:
+        return ""
+    cached = _docs_cache.get(lang)
+    if cached is not None and cached[0] == version:
+        return cached[1]
 
+    schemas = _get_schemas(lang)
     docs = []
     for fname, schema in schemas.items():
         doc_parts = [f"\t{fname}"]
@@ -44,7 +53,9 @@ def generate_function_docs(language: str = "ky") -> str:
             doc_parts.append(f". {label_params}: {param_list}")
             
         docs.append("".join(doc_parts))
-    return "\n".join(docs)
+    rendered = "\n".join(docs)
+    _docs_cache[lang] = (version, rendered)
+    return rendered
 
 def get_allowed_params(func_name: str, language: str = "ky") -> set:
     """
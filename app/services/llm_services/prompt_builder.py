@@ -5,6 +5,8 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.customer_services.message_service import MessageService
 from app.db.models import Customer, MessageRole
+from app.settings import settings
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,21 @@ class PromptBuilder:
             logger.error("Failed to render user profile: %s", e)
             return "Профиль: белгилүү эмес"
 
+    @staticmethod
+    def _apply_char_budget(history: List[Any], max_chars: int) -> List[Any]:
+        """Keep the newest messages whose total content length fits into max_chars (0 = no limit)."""
+        if max_chars <= 0:
+            return history
+        kept: List[Any] = []
+        total = 0
+        for msg in reversed(history):
+            total += len(msg.content or "")
+            if total > max_chars:
+                break
+            kept.append(msg)
+        kept.reverse()
+        return kept
+
     async def build(
         self,
         *,
@@ -50,10 +67,12 @@ class PromptBuilder:
         # Add conversation history if chat_id and db_session are provided
         if chat_id is not None and db_session is not None:
             try:
-                message_service = MessageService(db_session)
-                history_messages = await message_service.get_messages_by_chat_id(chat_id)
-                
-                history_messages = sorted(history_messages, key=lambda x: x.created_at)[-4:]
+                with tracer.span("history.fetch", chat_id=chat_id) as span:
+                    message_service = MessageService(db_session)
+                    history_messages = await message_service.get_last_messages(chat_id, settings.history_max_messages)
+                    history_messages = self._apply_char_budget(history_messages, settings.history_max_chars)
+                    span.set(messages=len(history_messages))
+
                 # Convert history messages to the format expected by LLM
                 for msg in history_messages:
                     role = "user" if msg.role == MessageRole.user else "assistant"
@@ -62,7 +81,7 @@ class PromptBuilder:
                         "content": msg.content
                     })
                     
-                logger.info(f"Added {len(history_messages)} messages from chat history for chat_id: {chat_id}")
+                logger.debug("Added %s messages from chat history for chat_id: %s", len(history_messages), chat_id)
                 
             except Exception as e:
                 logger.error(f"Failed to load conversation history for chat_id {chat_id}: {e}")
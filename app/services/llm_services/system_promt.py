@@ -1,63 +1,153 @@
-import json
-import os
-from pathlib import Path
+import logging
+import threading
+import time
 from datetime import datetime
-from app.services.llm_services.mcp_tools import generate_function_docs
-from typing import Optional
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple, Union
+
 from app.db.models import Customer
+from app.services.knowledge_services.knowledge_store import knowledge_store
+from app.services.llm_services.mcp_tools import SCHEMAS_FILENAME, generate_function_docs
+
+logger = logging.getLogger(__name__)
 
-KNOWLEDGE_BASE_DIR = Path(os.getenv("KNOWLEDGE_BASE_DIR", "knowledge"))
+PROMPTS_FILENAME = "system_prompts.json"
+
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+    _TZ = ZoneInfo("Asia/Bishkek")
+except Exception:
+    # На всякий случай, если zoneinfo недоступен
+    _TZ = None
 
 # helper: нормализуем код языка
 def _norm_lang(language: str) -> str:
     return "ru" if (language or "").strip().lower() == "ru" else "ky"
 
-# helper: загружаем шаблон промпта из JSON файла
-def _load_prompt_template(prompt_name: str, language: str) -> str:
-    lang = _norm_lang(language)
-    file_path = KNOWLEDGE_BASE_DIR / lang / "system_prompts.json"
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            prompts = json.load(f)
-            return prompts.get(prompt_name, {}).get("template", "")
-    except FileNotFoundError:
-        return ""
+
+class CompiledTemplate:
+    """
+    A str.format template parsed once.
+
+    Fields given in `static` are rendered at compile time and merged into the
+    literal text, so render() only has to fill in the per-request fields.
+    """
+
+    _formatter = Formatter()
+
+    def __init__(self, template: str, static: Optional[Dict[str, Any]] = None) -> None:
+        static = static or {}
+        self.parts: List[Union[str, Tuple[str, Optional[str], str]]] = []
+        for literal, field, spec, conversion in self._formatter.parse(template):
+            if literal:
+                self._append_literal(literal)
+            if field is None:
+                continue
+            if field in static:
+                self._append_literal(self._format_field(static[field], conversion, spec))
+            else:
+                self.parts.append((field, conversion, spec))
+
+    def _append_literal(self, text: str) -> None:
+        if self.parts and isinstance(self.parts[-1], str):
+            self.parts[-1] += text
+        else:
+            self.parts.append(text)
+
+    def _format_field(self, value: Any, conversion: Optional[str], spec: str) -> str:
+        return format(self._formatter.convert_field(value, conversion), spec or "")
+
+    def render(self, **values: Any) -> str:
+        return "".join(
+            part if isinstance(part, str) else self._format_field(values[part[0]], part[1], part[2])
+            for part in self.parts
+        )
+
+
+class PromptRegistry:
+    """
+    Compiled system prompt templates per (prompt, language).
+
+    Compiled templates are keyed by the knowledge_store versions of
+    system_prompts.json (and schemas.json for the main prompt, whose function
+    list is rendered into it). Admin writes invalidate the store, which bumps
+    the versions, so the next turn recompiles.
+    """
+
+    def __init__(self) -> None:
+        self._compiled: Dict[Tuple[str, str], Tuple[Tuple[int, ...], CompiledTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def _versions(self, prompt_name: str, lang: str) -> Tuple[int, ...]:
+        versions = (knowledge_store.version(lang, PROMPTS_FILENAME),)
+        if prompt_name == "system_prompt":
+            versions += (knowledge_store.version(lang, SCHEMAS_FILENAME),)
+        return versions
+
+    def _compile(self, prompt_name: str, lang: str) -> CompiledTemplate:
+        prompts = knowledge_store.get(lang, PROMPTS_FILENAME)
+        template = prompts.get(prompt_name, {}).get("template", "")
+        if prompt_name == "system_prompt":
+            suffix = s_ky if lang == "ky" else s_ru
+            # Суффикс добавляется после format, поэтому экранируем фигурные скобки
+            template += suffix.replace("{", "{{").replace("}", "}}")
+            return CompiledTemplate(template, static={"docs": generate_function_docs(lang)})
+        return CompiledTemplate(template)
+
+    def get(self, prompt_name: str, language: str) -> Optional[CompiledTemplate]:
+        lang = _norm_lang(language)
+        key = (prompt_name, lang)
+        try:
+            versions = self._versions(prompt_name, lang)
+        except FileNotFoundError:
+            return None
+        cached = self._compiled.get(key)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        with self._lock:
+            compiled = self._compile(prompt_name, lang)
+            self._compiled[key] = (versions, compiled)
+            logger.info(f"Compiled prompt template {prompt_name} ({lang})")
+        return compiled
+
+    def render(self, prompt_name: str, language: str, **values: Any) -> str:
+        compiled = self.get(prompt_name, language)
+        return compiled.render(**values) if compiled is not None else ""
+
+
+prompt_registry = PromptRegistry()
+
+# Минутная точность — строку достаточно пересчитывать раз в минуту
+_local_dt_cache: Tuple[int, str] = (-1, "")
+
+def _local_dt_str() -> str:
+    """Локальная дата/время (Бишкек) с точностью до минуты."""
+    global _local_dt_cache
+    minute = int(time.time() // 60)
+    if _local_dt_cache[0] != minute:
+        if _TZ is not None:
+            value = datetime.now(_TZ).strftime("%Y-%m-%d %H:%M %Z")
+        else:
+            value = datetime.now().strftime("%Y-%m-%d %H:%M")
+        _local_dt_cache = (minute, value)
+    return _local_dt_cache[1]
 
 def get_system_prompt(language: str) -> str:
     """
     Возвращает системный промпт для AiBank MCP-ассистента.
     :param language: 'ky' (кыргызский, по умолчанию) или 'ru' (русский).
     """
-    global s_ky
-    global s_ru
-    s = s_ky if language == "ky" else s_ru
-    docs = generate_function_docs(language)
-
-    # Локальная дата/время (Бишкек)
-    try:
-        from zoneinfo import ZoneInfo  # Python 3.9+
-        now = datetime.now(ZoneInfo("Asia/Bishkek"))
-        local_dt_str = now.strftime("%Y-%m-%d %H:%M %Z")
-    except Exception:
-        # На всякий случай, если zoneinfo недоступен
-        now = datetime.now()
-        local_dt_str = now.strftime("%Y-%m-%d %H:%M")
-
-    template = _load_prompt_template("system_prompt", language)
-    return (template.format(local_dt_str=local_dt_str, docs=docs)) + s
+    return prompt_registry.render("system_prompt", language, local_dt_str=_local_dt_str())
 
 def get_faq_system_prompt(lang: str, user: Optional[Customer], tool_response: str) -> str:
     """Generate system prompt for FAQ responses."""
     user_name = user.first_name if user else ("Колдонуучу" if lang == "ky" else "Пользователь")
-    template = _load_prompt_template("faq_system_prompt", lang)
-    return template.format(user_name=user_name, lang=lang, tool_response=tool_response)
+    return prompt_registry.render("faq_system_prompt", lang, user_name=user_name, lang=lang, tool_response=tool_response)
 
 def get_tool_response_system_prompt(lang: str, user: Optional[Customer], tool_response: str) -> str:
     """Generate system prompt for tool response processing."""
     user_name = user.first_name if user else ("Колдонуучу" if lang == "ky" else "Пользователь")
-    template = _load_prompt_template("tool_response_system_prompt", lang)
-    return template.format(user_name=user_name, lang=lang, tool_response=tool_response)
-
+    return prompt_registry.render("tool_response_system_prompt", lang, user_name=user_name, lang=lang, tool_response=tool_response)
 
 
 s_ky = 'Жеткиликтүү карталар тизмеси: Visa Classic Debit, Visa Gold Debit, Visa Platinum Debit, Mastercard Standard Debit, Mastercard Gold Debit, Mastercard Platinum Debit, Card Plus, Virtual Card, Visa Classic Credit, Visa Gold Credit, Visa Platinum Credit, Mastercard Standard Credit, Mastercard Gold Credit, Mastercard Platinum Credit, Elkart, Visa Campus Card, Жеткиликтүү депозиттер тизмеси: Demand Deposit, Classic Term Deposit, Replenishable Deposit, Standard Term Deposit, Online Deposit, Child Deposit, Government Treasury Bills, NBKR Notes, Жеткиликтүү насыялар тизмеси: Ар кандай максаттарга кредиттер, Онлайн кредит, Капиталдык оңдоо, Стандарттык керектөөчү кредит, Ыңгайлуу жашоо (KyrSEFF), АУЦАда билим алуу, Автокредиттер, Стандарттык автокредит, Автосалондор менен өнөктөштүк программасы алкагындагы кредиттер, Ипотека, Эркиндик турак жай комплекси, Prime Park турак жай комплекси, Орто-Сай клубдук үйү, Резиденс турак жай комплекси, Bellagio Resort, Talisman Village'
@@ -0,0 +1,55 @@
+"""In-process registry of the tools registered on the FastMCP server."""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from fastmcp.tools import Tool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRegistry:
+    """
+    Calls the `@server.tool` functions of app.mcp.mcp_server directly.
+
+    The registry is built from the FastMCP server object, so it always has the
+    same tools as the external MCP server. Tool.run validates the arguments
+    against the tool signature, exactly as the server does for a JSON-RPC call,
+    but without the stdio hop, and the tools share the API's SQLAlchemy engine.
+    """
+
+    def __init__(self) -> None:
+        self._tools: Optional[Dict[str, Tool]] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def load(self) -> Dict[str, Tool]:
+        """Import the MCP server module and index its tools (once)."""
+        if self._tools is not None:
+            return self._tools
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._tools is None:
+                from app.mcp.mcp_server import server
+
+                self._tools = await server.get_tools()
+                logger.info("Tool registry loaded: %s tools", len(self._tools))
+        return self._tools
+
+    async def is_read_only(self, tool_name: str) -> bool:
+        """True if the tool is annotated with readOnlyHint (unknown tools count as writes)."""
+        tool = (await self.load()).get(tool_name)
+        return bool(tool and tool.annotations and tool.annotations.readOnlyHint)
+
+    async def call_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Optional[str]:
+        tools = await self.load()
+        tool = tools.get(tool_name)
+        if tool is None:
+            raise ValueError(f"Tool {tool_name} not found on MCP server")
+
+        result = await tool.run(tool_args)
+        return result.content[0].text if result.content else None
+
+
+tool_registry = ToolRegistry()
@@ -4,7 +4,7 @@ import json
 import re
 from typing import Any, Dict, List, Tuple
 
-from .constants import FUNC_RE, ARG_RE, FUNC_CALL_PATTERN
+from .constants import FUNC_RE, ARG_RE, FUNC_CALL_PATTERN, FUNC_CALL_MARKER
 
 
 def coerce_value(v: str) -> Any:
@@ -73,4 +73,51 @@ def parse_func_call(s: str) -> Tuple[str, Dict[str, Any]]:
 
 def extract_func_calls(text: str) -> List[str]:
     """Extract function calls from text."""
-    return [m.group(1).strip() for m in FUNC_CALL_PATTERN.finditer(text)]
\ No newline at end of file
+    return [m.group(1).strip() for m in FUNC_CALL_PATTERN.finditer(text)]
+
+
+class FuncCallStreamParser:
+    """
+    Incremental splitter for a streamed LLM answer.
+
+    feed() returns the part of the stream that can be forwarded to the client
+    right away. Only a tail that could still turn into a [FUNC_CALL:...] marker
+    (e.g. "[FUN") is held back. Once the marker opens the parser switches to
+    tool mode and everything from the marker on is collected in tool_text.
+    """
+
+    def __init__(self) -> None:
+        self.tool_mode = False
+        self._pending = ""
+        self._tool_parts: List[str] = []
+
+    @property
+    def tool_text(self) -> str:
+        return "".join(self._tool_parts)
+
+    def feed(self, chunk: str) -> str:
+        if self.tool_mode:
+            self._tool_parts.append(chunk)
+            return ""
+
+        text = self._pending + chunk
+        idx = text.find(FUNC_CALL_MARKER)
+        if idx != -1:
+            self.tool_mode = True
+            self._pending = ""
+            self._tool_parts.append(text[idx:])
+            return text[:idx]
+
+        # The marker has a single "[", so an ambiguous tail can only start at the last one
+        start = text.rfind("[")
+        if start != -1 and FUNC_CALL_MARKER.startswith(text[start:]):
+            self._pending = text[start:]
+            return text[:start]
+        self._pending = ""
+        return text
+
+    def flush(self) -> str:
+        """Return the held-back tail at the end of the stream."""
+        rest, self._pending = self._pending, ""
+        return rest
+
@@ -1,20 +1,15 @@
-import json
-import os
 from typing import List, Dict, Any
 from pathlib import Path
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
+from app.services.knowledge_services.knowledge_store import knowledge_store
 
-KNOWLEDGE_BASE_DIR = Path(os.getenv("KNOWLEDGE_BASE_DIR", "knowledge"))
 
 CARDS_FILENAME = "cards.json"
 
 def load_cards_data(lang: str = "ky") -> Dict[str, Any]:
     try:
-        with open(KNOWLEDGE_BASE_DIR.joinpath(lang, CARDS_FILENAME), encoding='utf-8') as f:
-            cards_json = json.load(f)
-            return cards_json.get('cards', {})
+        return knowledge_store.get(lang, CARDS_FILENAME).get('cards', {})
     except Exception as e:
         logging.exception(f"Error loading cards data: {e}")
         return {}
@@ -240,8 +235,8 @@ def get_card_recommendations(criteria: Dict[str, Any], lang: str = "ky") -> List
                     score += 2
         
         if score > 0:
-            card["recommendation_score"] = score
-            result.append(card)
+            # Снимок из knowledge_store общий — не модифицируем его
+            result.append({**card, "recommendation_score": score})
     
     # Sort by score
     result.sort(key=lambda x: x.get("recommendation_score", 0), reverse=True)
@@ -253,9 +248,7 @@ ABOUT_US_FILENAME = "about-us.json"
 def load_about_us_data(lang: str = "ky") -> Dict[str, Any]:
     """Load about us data from JSON file"""
     try:
-        with open(KNOWLEDGE_BASE_DIR.joinpath(lang, ABOUT_US_FILENAME), encoding='utf-8') as f:
-            about_us_json = json.load(f)
-            return about_us_json.get('about_us', {})
+        return knowledge_store.get(lang, ABOUT_US_FILENAME).get('about_us', {})
     except Exception as e:
         logging.exception(f"Error loading about us data: {e}")
         return {}
@@ -318,9 +311,7 @@ DEPOSITS_FILENAME = "deposits.json"
 def load_deposits_data(lang: str = "ky") -> Dict[str, Any]:
     """Load deposits data from JSON file"""
     try:
-        with open(KNOWLEDGE_BASE_DIR.joinpath(lang, DEPOSITS_FILENAME), encoding='utf-8') as f:
-            deposits_json = json.load(f)
-            return deposits_json.get('deposits', {})
+        return knowledge_store.get(lang, DEPOSITS_FILENAME).get('deposits', {})
     except Exception as e:
         logging.exception(f"Error loading deposits data: {e}")
         return {}
@@ -522,8 +513,7 @@ def get_deposit_recommendations(criteria: Dict[str, Any], lang: str = "ky") -> L
                 score += 2
         
         if score > 0:
-            deposit["recommendation_score"] = score
-            result.append(deposit)
+            result.append({**deposit, "recommendation_score": score})
     
     # Sort by score
     result.sort(key=lambda x: x.get("recommendation_score", 0), reverse=True)
@@ -574,15 +564,12 @@ FAQ_FILENAME = "useful-info.json"
 def load_faq_data(lang: str = "ky") -> Dict[str, List[Dict[str, str]]]:
     """Load FAQ data from JSON file"""
     try:
-        with open(KNOWLEDGE_BASE_DIR.joinpath(lang, FAQ_FILENAME), encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('useful-info', {})
+        return knowledge_store.get(lang, FAQ_FILENAME).get('useful-info', {})
     except Exception as e:
         logging.exception(f"Error loading FAQ data: {e}")
         return {}
 
 def get_faq_by_category(category: str, lang: str = "ky") -> str:
-    print("-------------------get_faq_by_category--------------------------")
     """Answer general questions using FAQ data"""
     data = load_faq_data(lang)
     for category_name in data.keys():
@@ -599,9 +586,7 @@ LOANS_FILENAME = "loans.json"
 
 def load_loans_data(lang: str = "ky") -> Dict[str, Any]:
     try:
-        with open(KNOWLEDGE_BASE_DIR.joinpath(lang, LOANS_FILENAME), encoding='utf-8') as f:
-            cards_json = json.load(f)
-            return cards_json.get('loan_products', {})
+        return knowledge_store.get(lang, LOANS_FILENAME).get('loan_products', {})
     except Exception as e:
         logging.exception(f"Error loading cards data: {e}")
         return {}
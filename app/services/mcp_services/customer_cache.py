@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Account, Customer
+from app.services.cache import TTLCache
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class CustomerSnapshot:
+    """Поля клиента, которые нужны персональным тулам (без ORM-сессии)."""
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    middle_name: Optional[str]
+
+
+# За один ход LLM может вызвать несколько тулов для одного и того же клиента —
+# профиль и список счетов берём из кэша вместо повторных запросов
+customer_profiles: TTLCache[CustomerSnapshot] = TTLCache(
+    "customer_profiles",
+    max_size=settings.customer_cache_max_size,
+    ttl=settings.customer_cache_ttl,
+)
+customer_account_ids: TTLCache[Tuple[int, ...]] = TTLCache(
+    "customer_account_ids",
+    max_size=settings.customer_cache_max_size,
+    ttl=settings.customer_cache_ttl,
+)
+
+
+async def get_customer_snapshot(session: AsyncSession, customer_id: int) -> Optional[CustomerSnapshot]:
+    """
+    Профиль клиента из кэша или из БД.
+
+    :param session: AsyncSession
+    :param customer_id: ID клиента
+    :return: CustomerSnapshot или None, если клиент не найден (промах не кэшируется)
+    """
+    snapshot = customer_profiles.get(customer_id)
+    if snapshot is not None:
+        return snapshot
+    customer = await session.get(Customer, customer_id)
+    if customer is None:
+        return None
+    snapshot = CustomerSnapshot(
+        id=customer.id,
+        first_name=customer.first_name,
+        last_name=customer.last_name,
+        middle_name=customer.middle_name,
+    )
+    customer_profiles.set(customer_id, snapshot)
+    return snapshot
+
+
+async def get_account_ids(session: AsyncSession, customer_id: int) -> Tuple[int, ...]:
+    """
+    ID всех счетов клиента из кэша или из БД.
+
+    :param session: AsyncSession
+    :param customer_id: ID клиента
+    :return: кортеж ID счетов (пустой, если счетов нет)
+    """
+    acc_ids = customer_account_ids.get(customer_id)
+    if acc_ids is not None:
+        return acc_ids
+    stmt = select(Account.id).where(Account.customer_id == customer_id)
+    acc_ids = tuple((await session.execute(stmt)).scalars().all())
+    customer_account_ids.set(customer_id, acc_ids)
+    return acc_ids
+
+
+def invalidate_customer(customer_id: int) -> None:
+    """
+    Сбросить кэш клиента. Вызывать после перевода денег и после любого
+    изменения его счетов (открытие, закрытие, смена статуса). Изменения,
+    сделанные мимо этого процесса, видны через settings.customer_cache_ttl.
+    """
+    customer_profiles.invalidate(customer_id)
+    customer_account_ids.invalidate(customer_id)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "profiles": customer_profiles.stats(),
+        "account_ids": customer_account_ids.stats(),
+    }
@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 import pytz
 from sqlalchemy import select, func, or_, and_, literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 # --- импортируй свои модели из того места, где они у тебя лежат ---
 from app.db.models import (
@@ -19,6 +19,7 @@ from app.db.models import (
     AccountStatus,
     LoanType, LoanApplication, LoanApplicationStatus
 )
+from app.services.mcp_services.customer_cache import get_account_ids, get_customer_snapshot, invalidate_customer
 import logging
 logger = logging.getLogger(__name__)
 # =============================================================
@@ -56,8 +57,8 @@ _MSG: Dict[str, Dict[str, str]] = {
         "accounts_missing": "Эсептер табылган жок.",
         "account_blocked": "Эсеп активдүү эмес.",
         "ok_transfer": "{amount:.2f} сом {to_name} аттуу адамга ийгиликтүү которулду!",
-        "period_in": "{start} - {end} аралыгында кирген которуулар: {total:.2f} сом.",
-        "period_out": "{start} - {end} аралыгында чыккан которуулар: {total:.2f} сом.",
+        "period_in": "{start} - {end} аралыгында кирген которуулар: {total}.",
+        "period_out": "{start} - {end} аралыгында чыккан которуулар: {total}.",
     },
     "ru": {
         "no_accounts": "Ваши банковские счета не найдены.",
@@ -73,8 +74,8 @@ _MSG: Dict[str, Dict[str, str]] = {
         "accounts_missing": "Счета не найдены.",
         "account_blocked": "Счёт не активен.",
         "ok_transfer": "{amount:.2f} сом успешно переведены пользователю {to_name}!",
-        "period_in": "Сумма входящих за период {start} - {end}: {total:.2f} сом.",
-        "period_out": "Сумма исходящих за период {start} - {end}: {total:.2f} сом.",
+        "period_in": "Сумма входящих за период {start} - {end}: {total}.",
+        "period_out": "Сумма исходящих за период {start} - {end}: {total}.",
     },
 }
 
@@ -93,25 +94,85 @@ def _normalize_name(name: str) -> str:
     return " ".join(name.strip().lower().split())
 
 
+# Порядок частей ФИО в ответах тулов (исторически у каждого тула свой)
+_LAST_FIRST_MIDDLE = ("last_name", "first_name", "middle_name")
+_FIRST_LAST_MIDDLE = ("first_name", "last_name", "middle_name")
+_FIRST_MIDDLE_LAST = ("first_name", "middle_name", "last_name")
+
+_FromAccount = aliased(Account, name="from_account")
+_ToAccount = aliased(Account, name="to_account")
+_FromCustomer = aliased(Customer, name="from_customer")
+_ToCustomer = aliased(Customer, name="to_customer")
+
+
+def _transactions_with_parties():
+    """
+    SELECT транзакций вместе с ФИО отправителя и получателя за один запрос.
+    Каждый тул добавляет к нему свои WHERE / ORDER BY / LIMIT.
+    """
+    return (
+        select(
+            Transaction.amount,
+            Transaction.currency,
+            Transaction.description,
+            Transaction.created_at,
+            _FromCustomer.first_name.label("from_first_name"),
+            _FromCustomer.last_name.label("from_last_name"),
+            _FromCustomer.middle_name.label("from_middle_name"),
+            _ToCustomer.first_name.label("to_first_name"),
+            _ToCustomer.last_name.label("to_last_name"),
+            _ToCustomer.middle_name.label("to_middle_name"),
+        )
+        .select_from(Transaction)
+        .outerjoin(_FromAccount, _FromAccount.id == Transaction.from_account_id)
+        .outerjoin(_FromCustomer, _FromCustomer.id == _FromAccount.customer_id)
+        .outerjoin(_ToAccount, _ToAccount.id == Transaction.to_account_id)
+        .outerjoin(_ToCustomer, _ToCustomer.id == _ToAccount.customer_id)
+    )
+
+
+def _party_name(row, side: str, order: Tuple[str, ...], lang: str) -> str:
+    """ФИО отправителя (side="from") или получателя (side="to") из строки _transactions_with_parties."""
+    if getattr(row, f"{side}_first_name") is None:
+        return "белгисиз" if lang == "ky" else "неизвестно"
+    parts = [getattr(row, f"{side}_{field}") for field in order]
+    return " ".join(p.strip() for p in parts if p)
+
+
 # =============================================================
 # Сервисные функции (Async SQLAlchemy 2.0)
 # =============================================================
 
+def _format_totals(totals: Dict[str, Decimal]) -> str:
+    """Суммы по валютам в виде "X KGS, Y USD"; без операций — "0.00 KGS"."""
+    if not totals:
+        return "0.00 KGS"
+    return ", ".join(f"{amount} {currency}" for currency, amount in totals.items())
+
+
+async def _sum_by_currency(session: AsyncSession, stmt) -> Dict[str, Decimal]:
+    """Выполняет SELECT currency, SUM(...) и возвращает {currency: Decimal с 2 знаками}."""
+    rows = (await session.execute(stmt)).all()
+    return {
+        currency: Decimal(total or 0).quantize(Decimal("0.01"))
+        for currency, total in rows
+    }
+
+
 async def get_balance(session: AsyncSession, customer: Customer, *, lang: str = "ky") -> tuple[Optional[str], Optional[str]]:
-    stmt = select(Account).where(Account.customer_id == customer.id)
-    accounts = (await session.execute(stmt)).scalars().all()
-    if not accounts:
+    # Group balances by currency in SQL (currencies in the order the accounts were opened)
+    stmt = (
+        select(Account.currency, func.sum(Account.balance))
+        .where(Account.customer_id == customer.id)
+        .group_by(Account.currency)
+        .order_by(func.min(Account.id))
+    )
+    balance_by_currency = await _sum_by_currency(session, stmt)
+    if not balance_by_currency:
         return None, _t(lang, "no_accounts")
 
-    # Group balances by currency
-    balance_by_currency = {}
-    for account in accounts:
-        currency = account.currency
-        balance = Decimal(account.balance or 0).quantize(Decimal("0.01"))
-        balance_by_currency[currency] = balance_by_currency.get(currency, Decimal("0.00")) + balance
-
     # Format the result as "X KGS, Y USD, ..."
-    balance_str = ", ".join(f"{amount} {currency}" for currency, amount in balance_by_currency.items())
+    balance_str = _format_totals(balance_by_currency)
     
     return balance_str, _t(lang, "total_balance", total=balance_str)
 
@@ -141,14 +202,13 @@ async def get_transactions(
     lang: str = "ky",
 ) -> tuple[List[dict] | None, Optional[str]]:
     # Все аккаунты клиента
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
     # Query both outgoing and incoming transactions for the customer's accounts
     tx_stmt = (
-        select(Transaction)
+        _transactions_with_parties()
         .where(
             or_(
                 Transaction.from_account_id.in_(acc_ids),
@@ -158,65 +218,34 @@ async def get_transactions(
         .order_by(Transaction.created_at.desc())
         .limit(limit)
     )
-    txs = (await session.execute(tx_stmt)).scalars().all()
+    txs = (await session.execute(tx_stmt)).all()
     if not txs:
         return [], _t(lang, "no_transactions")
 
-    resp: List[dict] = []
-    for t in txs:
-        # Determine sender (from_account_id)
-        from_fullname = "белгисиз" if lang == "ky" else "неизвестно"
-        if t.from_account_id:
-            account_stmt = select(Account.customer_id).where(Account.id == t.from_account_id)
-            customer_id = (await session.execute(account_stmt)).scalars().first()
-            if customer_id:
-                customer_stmt = select(Customer).where(Customer.id == customer_id)
-                sender_customer = (await session.execute(customer_stmt)).scalars().first()
-                if sender_customer:
-                    name_parts = [sender_customer.last_name, sender_customer.first_name]
-                    if sender_customer.middle_name:
-                        name_parts.append(sender_customer.middle_name)
-                    from_fullname = " ".join(name_parts)
-
-        # Determine recipient (to_account_id)
-        to_fullname = "белгисиз" if lang == "ky" else "неизвестно"
-        if t.to_account_id:
-            account_stmt = select(Account.customer_id).where(Account.id == t.to_account_id)
-            customer_id = (await session.execute(account_stmt)).scalars().first()
-            if customer_id:
-                customer_stmt = select(Customer).where(Customer.id == customer_id)
-                recipient_customer = (await session.execute(customer_stmt)).scalars().first()
-                if recipient_customer:
-                    name_parts = [recipient_customer.last_name, recipient_customer.first_name]
-                    if recipient_customer.middle_name:
-                        name_parts.append(recipient_customer.middle_name)
-                    to_fullname = " ".join(name_parts)
-
-        # Add transaction details in the requested format
-        resp.append(
-            {
-                "amount": float(Decimal(t.amount)),
-                "currency": t.currency,
-                "from_fullname": from_fullname,
-                "direction": "->",
-                "to_fullname": to_fullname,
-                "description": t.description or "",
-                "timestamp": _fmt_local(t.created_at),
-            }
-        )
+    resp: List[dict] = [
+        {
+            "amount": float(Decimal(t.amount)),
+            "currency": t.currency,
+            "from_fullname": _party_name(t, "from", _LAST_FIRST_MIDDLE, lang),
+            "direction": "->",
+            "to_fullname": _party_name(t, "to", _LAST_FIRST_MIDDLE, lang),
+            "description": t.description or "",
+            "timestamp": _fmt_local(t.created_at),
+        }
+        for t in txs
+    ]
     return resp, None
 async def get_last_incoming_transaction(
     session: AsyncSession, customer: Customer, *, lang: str = "ky"
 ) -> tuple[None, str]:
     # Get all account IDs for the customer
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
     # Query the latest incoming transaction where to_account_id matches any customer account
     tx_stmt = (
-        select(Transaction)
+        _transactions_with_parties()
         .where(
             Transaction.to_account_id.in_(acc_ids),
             Transaction.transaction_type.in_([TransactionType.deposit, TransactionType.transfer]),
@@ -224,26 +253,11 @@ async def get_last_incoming_transaction(
         .order_by(Transaction.created_at.desc())
         .limit(1)
     )
-    tx = (await session.execute(tx_stmt)).scalars().first()
+    tx = (await session.execute(tx_stmt)).first()
     if not tx:
         return None, _t(lang, "last_incoming_none")
 
-    # Determine sender by fetching Customer associated with from_account_id
-    sender = "белгисиз" if lang == "ky" else "неизвестно"
-    if tx.from_account_id:
-        account_stmt = select(Account.customer_id).where(Account.id == tx.from_account_id)
-        customer_id = (await session.execute(account_stmt)).scalars().first()
-        if customer_id:
-            customer_stmt = select(Customer).where(Customer.id == customer_id)
-            sender_customer = (await session.execute(customer_stmt)).scalars().first()
-            if sender_customer:
-                sender = " ".join(
-                    p.strip() for p in [
-                        sender_customer.first_name,
-                        getattr(sender_customer, "middle_name", None),
-                        sender_customer.last_name,
-                    ] if p
-                )
+    sender = _party_name(tx, "from", _FIRST_MIDDLE_LAST, lang)
 
     return None, _t(
         lang,
@@ -286,8 +300,7 @@ async def transfer_money(
         return False, _t(lang, "account_not_found", account_number=to_account_number)
 
     # --- Проверка, что это не свой счет ---
-    to_customer_stmt = select(Customer).where(Customer.id == to_acc.customer_id)
-    to_customer = (await session.execute(to_customer_stmt)).scalars().first()
+    to_customer = await get_customer_snapshot(session, to_acc.customer_id)
     if to_customer.id == from_customer.id:
         return False, _t(lang, "cannot_self")
 
@@ -342,6 +355,8 @@ async def transfer_money(
         session.add_all([tx_out])
         await session.flush()  # если нужно получить id транзакций до выхода
 
+    invalidate_customer(from_customer.id)
+    invalidate_customer(to_customer.id)
     return True, _t(lang, "ok_transfer", amount=amount, to_name=_full_name(to_customer))
 
 async def get_incoming_sum_for_period(
@@ -351,9 +366,8 @@ async def get_incoming_sum_for_period(
     end_date: str,
     *,
     lang: str = "ky",
-) -> tuple[Optional[Decimal], Optional[str]]:
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+) -> tuple[Optional[Dict[str, Decimal]], Optional[str]]:
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
@@ -366,16 +380,17 @@ async def get_incoming_sum_for_period(
     logger.debug("Account IDs: %s", acc_ids)
     logger.debug("Local start: %s, end: %s", start_dt_local, end_dt_local)
     tx_stmt = (
-        select(Transaction.amount)
+        select(Transaction.currency, func.sum(Transaction.amount))
         .where(
             Transaction.to_account_id.in_(acc_ids),
             Transaction.created_at >= start_dt,
             Transaction.created_at <= end_dt,
         )
+        .group_by(Transaction.currency)
+        .order_by(Transaction.currency)
     )
-    amounts = [Decimal(a or 0) for a in (await session.execute(tx_stmt)).scalars().all()]
-    total = sum(amounts, Decimal("0.00"))
-    return total, _t(lang, "period_in", start=start_date, end=end_date, total=total)
+    totals = await _sum_by_currency(session, tx_stmt)
+    return totals, _t(lang, "period_in", start=start_date, end=end_date, total=_format_totals(totals))
 
 
 async def get_outgoing_sum_for_period(
@@ -385,9 +400,8 @@ async def get_outgoing_sum_for_period(
     end_date: str,
     *,
     lang: str = "ky",
-) -> tuple[Optional[Decimal], Optional[str]]:
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+) -> tuple[Optional[Dict[str, Decimal]], Optional[str]]:
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
@@ -397,59 +411,44 @@ async def get_outgoing_sum_for_period(
     end_dt = LOCAL_TZ.localize(end_dt_local).astimezone(pytz.utc).replace(tzinfo=None)
 
     tx_stmt = (
-        select(Transaction.amount)
+        select(Transaction.currency, func.sum(Transaction.amount))
         .where(
             Transaction.from_account_id.in_(acc_ids),
             Transaction.created_at >= start_dt,
             Transaction.created_at <= end_dt,
         )
+        .group_by(Transaction.currency)
+        .order_by(Transaction.currency)
     )
-    amounts = [Decimal(a or 0) for a in (await session.execute(tx_stmt)).scalars().all()]
-    total = sum(amounts, Decimal("0.00"))
-    return total, _t(lang, "period_out", start=start_date, end=end_date, total=total)
+    totals = await _sum_by_currency(session, tx_stmt)
+    return totals, _t(lang, "period_out", start=start_date, end=end_date, total=_format_totals(totals))
 
 
 async def get_last_3_transfer_recipients(
     session: AsyncSession, customer: Customer, *, lang: str = "ky"
 ) -> tuple[Optional[List[str]], Optional[str]]:
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
     # Берём последние исходящие переводы по нашим счетам
     tx_stmt = (
-        select(Transaction)
+        _transactions_with_parties()
         .where(
             Transaction.from_account_id.in_(acc_ids),
         )
         .order_by(Transaction.created_at.desc())
-        .limit(10)  # небольшой буфер, потом выберем до 3 получателей
+        .limit(3)
     )
-    txs = (await session.execute(tx_stmt)).scalars().all()
+    txs = (await session.execute(tx_stmt)).all()
     if not txs:
         return [], None
 
-    recipients: List[str] = []
-    for t in txs:
-        recipient = "белгисиз" if lang == "ky" else "неизвестно"
-        if t.to_account_id:
-            account_stmt = select(Account.customer_id).where(Account.id == t.to_account_id)
-            customer_id = (await session.execute(account_stmt)).scalars().first()
-            if customer_id:
-                customer_stmt = select(Customer).where(Customer.id == customer_id)
-                recipient_customer = (await session.execute(customer_stmt)).scalars().first()
-                if recipient_customer:
-                    # Construct full name: last_name first_name middle_name (if exists)
-                    name_parts = [recipient_customer.first_name, recipient_customer.last_name]
-                    if recipient_customer.middle_name:
-                        name_parts.append(recipient_customer.middle_name)
-                    recipient = " ".join(name_parts)
-        # Format: ФИО amount currency created_at
-        recipient_info = f"{recipient} {t.amount} {t.currency} {t.description} {_fmt_local(t.created_at)}"
-        recipients.append(recipient_info)
-        if len(recipients) >= 3:
-            break
+    # Format: ФИО amount currency description created_at
+    recipients: List[str] = [
+        f"{_party_name(t, 'to', _FIRST_LAST_MIDDLE, lang)} {t.amount} {t.currency} {t.description} {_fmt_local(t.created_at)}"
+        for t in txs
+    ]
 
     return recipients[:3], None
 
@@ -457,52 +456,26 @@ async def get_last_3_transfer_recipients(
 async def get_largest_transaction(
     session: AsyncSession, customer: Customer, *, lang: str = "ky"
 ) -> tuple[Optional[dict], Optional[str]]:
-    acc_stmt = select(Account.id).where(Account.customer_id == customer.id)
-    acc_ids = [row for row in (await session.execute(acc_stmt)).scalars().all()]
+    acc_ids = await get_account_ids(session, customer.id)
     if not acc_ids:
         return None, _t(lang, "no_accounts")
 
     cond = or_(
-        Transaction.from_account_id.in_(list(acc_ids)),
-        Transaction.to_account_id.in_(list(acc_ids)),
+        Transaction.from_account_id.in_(acc_ids),
+        Transaction.to_account_id.in_(acc_ids),
     )
     tx_stmt = (
-        select(Transaction)
+        _transactions_with_parties()
         .where(cond)
         .order_by(Transaction.amount.desc())
         .limit(1)
     )
-    tx = (await session.execute(tx_stmt)).scalars().first()
+    tx = (await session.execute(tx_stmt)).first()
     if not tx:
         return None, _t(lang, "no_transactions")
 
-    # Determine sender (from_account_id)
-    from_fullname = "белгисиз" if lang == "ky" else "неизвестно"
-    if tx.from_account_id:
-        account_stmt = select(Account.customer_id).where(Account.id == tx.from_account_id)
-        customer_id = (await session.execute(account_stmt)).scalars().first()
-        if customer_id:
-            customer_stmt = select(Customer).where(Customer.id == customer_id)
-            sender_customer = (await session.execute(customer_stmt)).scalars().first()
-            if sender_customer:
-                name_parts = [sender_customer.first_name, sender_customer.last_name]
-                if sender_customer.middle_name:
-                    name_parts.append(sender_customer.middle_name)
-                from_fullname = " ".join(name_parts)
-
-    # Determine recipient (to_account_id)
-    to_fullname = "белгисиз" if lang == "ky" else "неизвестно"
-    if tx.to_account_id:
-        account_stmt = select(Account.customer_id).where(Account.id == tx.to_account_id)
-        customer_id = (await session.execute(account_stmt)).scalars().first()
-        if customer_id:
-            customer_stmt = select(Customer).where(Customer.id == customer_id)
-            recipient_customer = (await session.execute(customer_stmt)).scalars().first()
-            if recipient_customer:
-                name_parts = [recipient_customer.first_name, recipient_customer.last_name]
-                if recipient_customer.middle_name:
-                    name_parts.append(recipient_customer.middle_name)
-                to_fullname = " ".join(name_parts)
+    from_fullname = _party_name(tx, "from", _FIRST_LAST_MIDDLE, lang)
+    to_fullname = _party_name(tx, "to", _FIRST_LAST_MIDDLE, lang)
 
     return (
         {
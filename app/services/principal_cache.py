@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Customer, Employee, EmployeeRole
+from app.services.cache import TTLCache
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class CustomerPrincipal:
+    """Авторизованный клиент: поля, которые читают обработчики (без ORM-сессии)."""
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    middle_name: Optional[str]
+    email: Optional[str]
+
+
+@dataclass(frozen=True)
+class EmployeePrincipal:
+    """Авторизованный сотрудник: id, логин и роль."""
+    id: int
+    username: str
+    role: EmployeeRole
+
+
+# Каждый запрос с cookie-сессией раньше читал клиента/сотрудника из БД;
+# короткий TTL ограничивает, как долго живёт устаревший снимок, если
+# изменение прошло мимо invalidate_*
+customer_principals: TTLCache[CustomerPrincipal] = TTLCache(
+    "customer_principals",
+    max_size=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl,
+)
+employee_principals: TTLCache[EmployeePrincipal] = TTLCache(
+    "employee_principals",
+    max_size=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl,
+)
+
+
+async def get_customer_principal(session: AsyncSession, customer_id: int) -> Optional[CustomerPrincipal]:
+    """
+    Клиент из кэша или из БД.
+
+    :param session: AsyncSession
+    :param customer_id: ID клиента из сессии
+    :return: CustomerPrincipal или None, если клиент не найден (промах не кэшируется)
+    """
+    principal = customer_principals.get(customer_id)
+    if principal is not None:
+        return principal
+    stmt = select(
+        Customer.id, Customer.first_name, Customer.last_name, Customer.middle_name, Customer.email,
+    ).where(Customer.id == customer_id)
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        return None
+    principal = CustomerPrincipal(*row)
+    customer_principals.set(customer_id, principal)
+    return principal
+
+
+async def get_employee_principal(session: AsyncSession, employee_id: int) -> Optional[EmployeePrincipal]:
+    """
+    Сотрудник из кэша или из БД.
+
+    :param session: AsyncSession
+    :param employee_id: ID сотрудника из сессии
+    :return: EmployeePrincipal или None, если сотрудник не найден (промах не кэшируется)
+    """
+    principal = employee_principals.get(employee_id)
+    if principal is not None:
+        return principal
+    stmt = select(Employee.id, Employee.username, Employee.role).where(Employee.id == employee_id)
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        return None
+    principal = EmployeePrincipal(*row)
+    employee_principals.set(employee_id, principal)
+    return principal
+
+
+def invalidate_customer_principal(customer_id: int) -> None:
+    """Сбросить снимок клиента. Вызывать при logout и после изменения его профиля."""
+    customer_principals.invalidate(customer_id)
+
+
+def invalidate_employee_principal(employee_id: int) -> None:
+    """
+    Сбросить снимок сотрудника. Вызывать при logout, удалении сотрудника
+    и после смены его роли — иначе старая роль проживёт до конца TTL.
+    """
+    employee_principals.invalidate(employee_id)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "customers": customer_principals.stats(),
+        "employees": employee_principals.stats(),
+    }
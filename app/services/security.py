@@ -1,9 +1,144 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.settings import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    bcrypt hash/verify on a dedicated, bounded thread pool.
+
+    A bcrypt round takes 100-300 ms of CPU; done inline in an async handler it
+    stalls the event loop and every SSE stream with it. The bcrypt C extension
+    releases the GIL, so `workers` threads hash in parallel while the loop
+    keeps serving. At most `max_queue` jobs wait for a free worker; beyond that
+    the request is rejected with 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, *, rounds: int, workers: int, max_queue: int) -> None:
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0          # отправлено в пул и ещё не завершено
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._total_run_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, try again later",
+                )
+            self.pending += 1
+            self.max_queued = max(self.max_queued, self.pending - self.workers)
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                wait_ms = (started - submitted) * 1000
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._total_wait_ms += wait_ms
+                    self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                    self._total_run_ms += (finished - started) * 1000
+
+        try:
+            future = self._get_executor().submit(job)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        # Срабатывает и при отмене ожидающей задачи, так что pending не «залипает»
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def hash(self, raw: str) -> str:
+        return self.context.hash(raw)
+
+    def verify(self, raw: str, hashed: str) -> bool:
+        return self.context.verify(raw, hashed)
+
+    async def hash_async(self, raw: str) -> str:
+        return await self._run(self.context.hash, raw)
+
+    async def verify_async(self, raw: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, raw, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queued": max(0, self.pending - self.running),
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._total_wait_ms / self.completed, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "avg_run_ms": round(self._total_run_ms / self.completed, 2) if self.completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
 
 def hash_password(raw: str) -> str:
-    return pwd_context.hash(raw)
+    return password_hasher.hash(raw)
 
 def verify_password(raw: str, hashed: str) -> bool:
-    return pwd_context.verify(raw, hashed)
+    return password_hasher.verify(raw, hashed)
+
+async def hash_password_async(raw: str) -> str:
+    """hash_password on the bcrypt thread pool; use this from async code."""
+    return await password_hasher.hash_async(raw)
+
+async def verify_password_async(raw: str, hashed: str) -> bool:
+    """verify_password on the bcrypt thread pool; use this from async code."""
+    return await password_hasher.verify_async(raw, hashed)
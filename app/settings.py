@@ -3,10 +3,97 @@ from pathlib import Path
 
 class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./app.db"
+    read_database_url: str | None = None  # реплика для чтения (админка, тулы только для чтения)
     db_echo: bool = False
+
+    # Пул соединений БД (для SQLite-файла тоже — иначе aiosqlite открывает файл на каждую сессию)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800         # сек; пересоздавать соединения старше этого
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 30000  # только asyncpg (statement_timeout), 0 — без лимита
+
+    # SQLite: PRAGMA на каждое новое соединение
+    sqlite_journal_mode: str = "WAL"    # читатели не блокируются писателем
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456   # 256 МБ
+    sqlite_cache_size: int = -65536     # отрицательное — в КиБ (64 МБ)
     session_secret: str = "CHANGE_ME"   # 🔐 замени через .env
     debug: bool = True                  # в проде False
-    knowledge_base_dir: Path | None = None 
+    knowledge_base_dir: Path | None = None
+    knowledge_stat_interval: float = 1.0  # как часто (сек) проверять mtime файлов базы знаний
+
+    # История чата, которая уходит в LLM: последние N сообщений, но не больше M символов (0 — без лимита)
+    history_max_messages: int = 4
+    history_max_chars: int = 8000
+
+    # Отложенная запись сообщений: пачка уходит в БД раз в N мс или при M строках
+    message_write_behind: bool = True
+    message_flush_interval_ms: int = 100
+    message_flush_batch_size: int = 200
+    message_flush_max_retries: int = 5
+    message_flush_retry_backoff: float = 0.2
+    message_queue_max_size: int = 10000     # ходов в очереди, дальше put ждёт
+    message_save_drain_timeout: float = 10.0  # сек; ожидание незавершённых сохранений при остановке
+
+    # Вызов тулов: "inprocess" — напрямую через реестр FastMCP, "mcp" — через пул процессов mcp_server
+    tool_dispatch_mode: str = "inprocess"
+    # Параллельный вызов тулов в рамках одного хода
+    tool_max_concurrency: int = 4
+    tool_call_timeout: float = 20.0    # таймаут для тулов только для чтения
+
+    # MCP: пул долгоживущих процессов mcp_server
+    mcp_pool_size: int = 2
+    mcp_call_timeout: float = 30.0
+    mcp_startup_timeout: float = 30.0
+    mcp_health_check_interval: float = 30.0
+
+    # Пагинация в админке: сколько секунд кэшировать total (COUNT(*))
+    pagination_count_cache_ttl: float = 30.0
+
+    # Кэш профиля и счетов клиента для персональных тулов: нужен, чтобы тулы одного хода не ходили
+    # в БД повторно. Сбрасывается только после transfer_money; прочие изменения профиля и счетов
+    # (админка, внешние системы, другой процесс mcp_server) видны не позже чем через TTL секунд
+    customer_cache_ttl: float = 10.0
+    customer_cache_max_size: int = 1024
+
+    # Кэш авторизованных клиентов/сотрудников для зависимостей deps.py
+    principal_cache_ttl: float = 30.0
+    principal_cache_max_size: int = 4096
+
+    # bcrypt: cost factor и отдельный пул потоков, чтобы логины не блокировали event loop
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 256   # ожидающих задач сверх workers, дальше — 503
+
+    # Трассировка хода разговора (app/tracing.py); экспортеры через запятую: log, ring, otlp
+    tracing_enabled: bool = True
+    tracing_exporters: str = "ring"
+    tracing_ring_size: int = 200
+    tracing_otlp_endpoint: str = "http://127.0.0.1:4318/v1/traces"
+    tracing_service_name: str = "bank-assistant"
+
+    # Логи (app/logging_config.py): формат text или json, запись через очередь в отдельном потоке
+    log_level: str = "INFO"
+    log_format: str = "text"
+    log_file: Path | None = None
+    log_queue_size: int = 10000        # записей в очереди, дальше новые отбрасываются
+    # Доля записей, которые пишутся, по категориям log_event (остальные категории — все)
+    log_sample_rates: str = "llm.payload=0.01,llm.response=0.01"
+    log_max_field_chars: int = 500     # длинные строки в полях обрезаются
+
+    # LLM: общий HTTP-клиент к апстриму (keep-alive, опционально HTTP/2 — нужен пакет h2)
+    llm_url: str = "https://chat.aitil.kg/mcp_suroo"
+    llm_http2: bool = True
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 120.0     # между чанками стрима
+    llm_write_timeout: float = 10.0
+    llm_pool_timeout: float = 10.0      # ожидание свободного соединения
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="")
 
@@ -0,0 +1,352 @@
+"""
+Span-based tracing of a conversation turn.
+
+A span is opened with `tracer.span(name, **attributes)` (works in sync and
+async code) and becomes the parent of every span opened inside it, including
+spans in tasks created from that context. A span without a parent starts a
+new trace; when it ends, the whole trace is handed to the exporters:
+
+    log    one INFO line per trace on the "app.tracing" logger
+    ring   last N traces in memory, served by /api/admin/diagnostics/traces
+    otlp   OTLP/HTTP JSON to a collector (e.g. an OpenTelemetry Collector on :4318)
+
+Point-in-time stages (first token, FUNC_CALL marker, upstream headers) are
+recorded as span events rather than spans.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = (
+        "name", "trace", "span_id", "parent_id", "start_ns", "_t0", "duration_ns",
+        "attributes", "events", "status", "error",
+    )
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+        self.attributes = attributes
+        self.events: List[Tuple[str, int, Dict[str, Any]]] = []
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.perf_counter_ns() - self._t0, attributes))
+
+    def end(self) -> None:
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._t0
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.duration_ns is None else self.duration_ns / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self._t0 - self.trace.root._t0) / 1e6, 3),
+            "duration_ms": None if self.duration_ns is None else round(self.duration_ns / 1e6, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": [
+                {"name": name, "offset_ms": round(offset / 1e6, 3), "attributes": attrs}
+                for name, offset, attrs in self.events
+            ],
+        }
+
+
+class _NoopSpan:
+    """Returned by tracer.span() when tracing is disabled."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    __slots__ = ("trace_id", "root", "spans", "finished")
+
+    def __init__(self) -> None:
+        self.trace_id = _new_id(128)
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self.finished = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start": self.root.start_ns / 1e9,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "status": self.root.status,
+            "spans": [s.to_dict() for s in self.spans],
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, *, enabled: bool, exporters: Optional[List[Any]] = None) -> None:
+        self.enabled = enabled
+        self.exporters: List[Any] = exporters or []
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def event(self, name: str, **attributes: Any) -> None:
+        """Add an event to the current span (no-op outside a span)."""
+        span = _current_span.get()
+        if span is not None:
+            span.event(name, **attributes)
+
+    def set(self, **attributes: Any) -> None:
+        """Set attributes on the current span (no-op outside a span)."""
+        span = _current_span.get()
+        if span is not None:
+            span.set(**attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        parent = _current_span.get()
+        trace = parent.trace if parent is not None else Trace()
+        span = Span(name, trace, parent.span_id if parent is not None else None, attributes)
+        if parent is None:
+            trace.root = span
+        trace.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except GeneratorExit:
+            # Клиент закрыл SSE-стрим: генератор закрывают снаружи
+            span.status = "cancelled"
+            raise
+        except asyncio.CancelledError:
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Асинхронный генератор закрыт из другого контекста
+                _current_span.set(parent)
+            if parent is None:
+                self._finish(trace)
+
+    def _finish(self, trace: Trace) -> None:
+        trace.finished = True
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                logger.error("Trace exporter %s failed: %s", type(exporter).__name__, e)
+
+    def exporter(self, kind: type) -> Optional[Any]:
+        return next((e for e in self.exporters if isinstance(e, kind)), None)
+
+    async def shutdown(self) -> None:
+        for exporter in self.exporters:
+            close = getattr(exporter, "shutdown", None)
+            if close is not None:
+                await close()
+
+
+# ---------- exporters ----------
+
+class LogExporter:
+    """One line per trace: span durations in start order, events as +offset."""
+
+    def __init__(self, log: logging.Logger = logger) -> None:
+        self.log = log
+
+    def export(self, trace: Trace) -> None:
+        if not self.log.isEnabledFor(logging.INFO):
+            return
+        parts = []
+        for span in trace.spans[1:]:
+            if span.duration_ns is None:
+                continue
+            part = f"{span.name}={span.duration_ms:.1f}ms"
+            if span.events:
+                part += " (" + ", ".join(f"{name} +{offset / 1e6:.1f}ms" for name, offset, _ in span.events) + ")"
+            parts.append(part)
+        self.log.info(
+            "trace %s %s %.1fms %s: %s",
+            trace.trace_id, trace.root.name, trace.root.duration_ms, trace.root.status, "; ".join(parts),
+        )
+
+
+class RingBufferExporter:
+    """Keeps the last `size` traces for the admin diagnostics endpoint."""
+
+    def __init__(self, size: int) -> None:
+        self._traces: Deque[Dict[str, Any]] = deque(maxlen=max(1, size))
+
+    def export(self, trace: Trace) -> None:
+        self._traces.append(trace.to_dict())
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest first, without span details."""
+        items = list(self._traces)[-limit:] if limit > 0 else []
+        return [
+            {k: t[k] for k in ("trace_id", "name", "start", "duration_ms", "status")} | {"spans": len(t["spans"])}
+            for t in reversed(items)
+        ]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        return next((t for t in reversed(self._traces) if t["trace_id"] == trace_id), None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def otlp_payload(trace: Trace, service_name: str) -> Dict[str, Any]:
+    """ExportTraceServiceRequest in OTLP/JSON encoding (ids are hex strings)."""
+    spans = []
+    for span in trace.spans:
+        if span.duration_ns is None:
+            continue
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.start_ns + span.duration_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "events": [
+                {"timeUnixNano": str(span.start_ns + offset), "name": name, "attributes": _otlp_attributes(attrs)}
+                for name, offset, attrs in span.events
+            ],
+            "status": {"code": 2, "message": span.error or span.status} if span.status != "ok" else {"code": 1},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }],
+    }
+
+
+class OTLPHttpExporter:
+    """
+    Sends each finished trace to an OTLP/HTTP collector in a background task.
+
+    At most `max_pending` exports are in flight; further traces are dropped
+    (counted in `dropped`) so a slow collector never holds up a turn.
+    """
+
+    def __init__(self, endpoint: str, *, service_name: str, timeout: float = 5.0, max_pending: int = 100) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.dropped += 1
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        task = loop.create_task(self._send(otlp_payload(trace, self.service_name)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            resp = await self._client.post(self.endpoint, json=payload)
+            resp.raise_for_status()
+            self.exported += 1
+        except httpx.HTTPError as e:
+            self.failed += 1
+            logger.warning("OTLP export to %s failed: %s", self.endpoint, e)
+
+    async def shutdown(self) -> None:
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=self.timeout)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _build_exporters() -> List[Any]:
+    exporters: List[Any] = []
+    for name in filter(None, (n.strip() for n in settings.tracing_exporters.split(","))):
+        if name == "log":
+            exporters.append(LogExporter())
+        elif name == "ring":
+            exporters.append(RingBufferExporter(settings.tracing_ring_size))
+        elif name == "otlp":
+            exporters.append(OTLPHttpExporter(settings.tracing_otlp_endpoint, service_name=settings.tracing_service_name))
+        else:
+            logger.warning("Unknown trace exporter %r ignored", name)
+    return exporters
+
+
+tracer = Tracer(enabled=settings.tracing_enabled, exporters=_build_exporters())
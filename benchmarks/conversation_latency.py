@@ -0,0 +1,350 @@
+"""
+End-to-end latency of /api/conversation against a local fake upstream LLM.
+
+Starts benchmarks.fake_llm in a subprocess and the real FastAPI app (uvicorn,
+in this process) on a temporary SQLite database, logs in a seeded customer
+and drives three kinds of turns:
+
+    plain  the model answers directly
+    faq    the model calls get_faq_by_category, then answers from the FAQ
+    tool   the model calls get_balance, then answers from the tool output
+
+For every scenario the report has p50/p95/p99 of time to the first SSE event
+(ttfb), full turn latency and tool latency, plus the number of DB queries the
+app issued per turn (including the write-behind message inserts). The JSON
+goes to stdout and, with --output, to a file, so runs of different releases
+can be diffed.
+
+    python -m benchmarks.conversation_latency
+    python -m benchmarks.conversation_latency --turns 100 --concurrency 10 --output bench.json
+    python -m benchmarks.conversation_latency --scenarios tool --ttft-ms 500 --token-delay-ms 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.stats import percentiles
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+SCENARIOS = {
+    "plain": "Саламатсызбы, банк жөнүндө айтып бериңизчи",
+    "faq": "Кандай карталар бар? #faq",
+    "tool": "Менин балансым канча? #tool",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(path: str) -> int:
+    """Customer with two accounts, some transfers and a chat; returns the chat id."""
+    from sqlalchemy import create_engine, insert
+
+    from app.db.base import Base
+    from app.db.models import (
+        Account, AccountStatus, AccountType, Chat, ChatStatus, Customer,
+        Transaction, TransactionStatus, TransactionType,
+    )
+    from app.services.security import hash_password
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{
+            "id": 1,
+            "first_name": "Bench",
+            "last_name": "User",
+            "birth_date": date(1990, 1, 1),
+            "passport_number": "ID00000001",
+            "phone_number": "+996555000001",
+            "email": EMAIL,
+            "address": "Bishkek",
+            "password_hash": hash_password(PASSWORD),
+        }])
+        conn.execute(insert(Account), [
+            {
+                "id": k, "customer_id": 1, "account_number": f"KG0000000{k}",
+                "account_type": AccountType.current, "currency": currency,
+                "balance": Decimal("15000.00"), "status": AccountStatus.active,
+            }
+            for k, currency in ((1, "KGS"), (2, "USD"))
+        ])
+        conn.execute(insert(Transaction), [
+            {
+                "from_account_id": 1 + i % 2, "to_account_id": 2 - i % 2,
+                "transaction_type": TransactionType.transfer, "amount": Decimal(100 + i),
+                "currency": "KGS", "description": "bench", "status": TransactionStatus.completed,
+                "created_at": start + timedelta(hours=i),
+            }
+            for i in range(200)
+        ])
+        conn.execute(insert(Chat), [{"id": 1, "title": "bench", "customer_id": 1, "status": ChatStatus.open}])
+    engine.dispose()
+    return 1
+
+
+async def _wait_http(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                (await client.get(url)).raise_for_status()
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+class QueryCounter:
+    """Counts statements on the app's engines (before_cursor_execute)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args: Any) -> None:
+        self.count += 1
+
+    def install(self) -> None:
+        from sqlalchemy import event
+
+        from app.db.base import engine, read_engine
+
+        for e in filter(None, (engine, read_engine)):
+            event.listen(e.sync_engine, "before_cursor_execute", self)
+
+
+def _instrument_tools(latencies: List[float]) -> None:
+    """Time every tool dispatch (in-process registry or MCP pool)."""
+    from app.services.llm_services.function_processor import FunctionProcessor
+
+    call_tool = FunctionProcessor.call_tool
+
+    async def timed(name: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        started = time.perf_counter()
+        try:
+            return await call_tool(name, kwargs)
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    FunctionProcessor.call_tool = staticmethod(timed)
+
+
+async def _drain_write_queue(timeout: float = 10.0) -> None:
+    """Wait until the write-behind queue has stored every enqueued message."""
+    from app.services.customer_services.message_write_queue import message_write_queue
+
+    deadline = time.monotonic() + timeout
+    while message_write_queue.running and time.monotonic() < deadline:
+        stats = message_write_queue.stats()
+        if stats["flushed_rows"] + stats["dropped_rows"] >= stats["enqueued_rows"]:
+            return
+        await asyncio.sleep(0.02)
+
+
+async def _turn(client: httpx.AsyncClient, message: str, chat_id: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    ttfb: Optional[float] = None
+    events = 0
+    done = False
+    async with client.stream(
+        "POST", "/api/conversation/", json={"message": message, "language": "ky", "chat_id": chat_id},
+    ) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            if ttfb is None:
+                ttfb = (time.perf_counter() - started) * 1000
+            if line.strip() == "data: [DONE]":
+                done = True
+            else:
+                events += 1
+    return {
+        "ttfb_ms": ttfb,
+        "total_ms": (time.perf_counter() - started) * 1000,
+        "events": events,
+        "done": done,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    chat_id: int,
+    *,
+    turns: int,
+    concurrency: int,
+    warmup: int,
+    queries: QueryCounter,
+    tool_latencies: List[float],
+) -> Dict[str, Any]:
+    message = SCENARIOS[name]
+    for _ in range(warmup):
+        await _turn(client, message, chat_id)
+    await _drain_write_queue()
+
+    queries.count = 0
+    tool_latencies.clear()
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one() -> None:
+        async with semaphore:
+            try:
+                results.append(await _turn(client, message, chat_id))
+            except httpx.HTTPError as e:
+                errors.append(repr(e))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(turns)))
+    elapsed = time.perf_counter() - started
+    await _drain_write_queue()
+
+    completed = [r for r in results if r["done"]]
+    return {
+        "turns": turns,
+        "completed": len(completed),
+        "errors": len(errors) + len(results) - len(completed),
+        "turns_per_s": round(len(completed) / elapsed, 2) if elapsed else 0.0,
+        "ttfb": percentiles([r["ttfb_ms"] for r in completed if r["ttfb_ms"] is not None]),
+        "total": percentiles([r["total_ms"] for r in completed]),
+        "tool": percentiles(tool_latencies),
+        "tool_calls": len(tool_latencies),
+        "events_per_turn": round(sum(r["events"] for r in completed) / len(completed), 1) if completed else 0,
+        "db_queries": queries.count,
+        "db_queries_per_turn": round(queries.count / turns, 2) if turns else 0.0,
+        "error_samples": errors[:3],
+    }
+
+
+async def run(args: argparse.Namespace, chat_id: int, llm_port: int, app_port: int) -> Dict[str, Any]:
+    import uvicorn
+
+    from app.db.base import engine, read_engine
+    from app.main import app
+
+    queries = QueryCounter()
+    queries.install()
+    tool_latencies: List[float] = []
+    _instrument_tools(tool_latencies)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=app_port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    report: Dict[str, Any] = {}
+    try:
+        await _wait_http(f"http://127.0.0.1:{llm_port}/health")
+        await _wait_http(f"http://127.0.0.1:{app_port}/")
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{app_port}", timeout=120) as client:
+            (await client.post("/api/login", json={"email": EMAIL, "password": PASSWORD})).raise_for_status()
+            for name in args.scenarios:
+                report[name] = await run_scenario(
+                    client, name, chat_id,
+                    turns=args.turns,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                    queries=queries,
+                    tool_latencies=tool_latencies,
+                )
+    finally:
+        server.should_exit = True
+        await serving
+        for e in filter(None, (engine, read_engine)):
+            await e.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--turns", type=int, default=30, help="measured turns per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured turns before each scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="turns in flight at once")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="fake upstream: time to first token")
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="fake upstream: delay between tokens")
+    parser.add_argument("--tokens", type=int, default=50, help="fake upstream: tokens in a plain answer")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="bench_conv_")
+    llm_port, app_port = _free_port(), _free_port()
+    # Настройки читаются при импорте app.*, поэтому окружение задаём до первого импорта
+    os.environ.update(
+        DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}",
+        READ_DATABASE_URL="",
+        LLM_URL=f"http://127.0.0.1:{llm_port}/v1/chat",
+        DEBUG="true",
+    )
+    chat_id = seed(os.path.join(workdir, "bench.db"))
+
+    fake_llm = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_llm",
+        "--port", str(llm_port),
+        "--ttft-ms", str(args.ttft_ms),
+        "--token-delay-ms", str(args.token_delay_ms),
+        "--tokens", str(args.tokens),
+    ])
+    try:
+        scenarios = asyncio.run(run(args, chat_id, llm_port, app_port))
+    finally:
+        fake_llm.terminate()
+        fake_llm.wait(timeout=10)
+
+    from app.settings import settings
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "tool_dispatch_mode": settings.tool_dispatch_mode,
+            "message_write_behind": settings.message_write_behind,
+            "turns": args.turns,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "upstream": {"ttft_ms": args.ttft_ms, "token_delay_ms": args.token_delay_ms, "tokens": args.tokens},
+        },
+        "scenarios": scenarios,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
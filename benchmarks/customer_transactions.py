@@ -0,0 +1,235 @@
+"""
+Benchmark: customer transaction history, OR-join + DISTINCT + OFFSET (old)
+vs UNION ALL of two index-driven halves + keyset paging (CustomerRepository).
+
+Seeds a temporary SQLite database (1M transactions by default), then times
+the first page, a deep page and the total count for a regular and a "heavy"
+customer, and checks that both versions return the same rows.
+
+    python -m benchmarks.customer_transactions
+    python -m benchmarks.customer_transactions --rows 200000 --db /tmp/bench.db
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy import create_engine, func, insert, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Account, AccountStatus, AccountType, Customer, Transaction, TransactionStatus, TransactionType
+from app.db.pagination import count_cache, decode_cursor
+from app.db.repositories.customer_repository import CustomerRepository
+
+HEAVY_CUSTOMER_ID = 1
+REGULAR_CUSTOMER_ID = 2
+HEAVY_SHARE = 0.05   # доля транзакций, где участвует "тяжёлый" клиент
+CHUNK = 50_000
+
+
+def seed(path: str, rows: int, customers: int, accounts_per_customer: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rnd = random.Random(42)
+    start = datetime(2024, 1, 1)
+    accounts = customers * accounts_per_customer
+    heavy_accounts = list(range(1, accounts_per_customer + 1))
+
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {
+                "id": i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "birth_date": date(1990, 1, 1),
+                "passport_number": f"ID{i:08d}",
+                "phone_number": f"+996{i:09d}",
+                "email": f"user{i}@example.com",
+                "address": "Bishkek",
+                "password_hash": "x",
+                "created_at": start,
+            }
+            for i in range(1, customers + 1)
+        ])
+        conn.execute(insert(Account), [
+            {
+                "id": (c - 1) * accounts_per_customer + k + 1,
+                "customer_id": c,
+                "account_number": f"KG{c:08d}{k:02d}",
+                "account_type": AccountType.current,
+                "currency": "KGS",
+                "balance": Decimal("1000.00"),
+                "status": AccountStatus.active,
+            }
+            for c in range(1, customers + 1)
+            for k in range(accounts_per_customer)
+        ])
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, CHUNK):
+            batch = []
+            for i in range(offset, min(offset + CHUNK, rows)):
+                src, dst = rnd.randint(1, accounts), rnd.randint(1, accounts)
+                if rnd.random() < HEAVY_SHARE:
+                    if rnd.random() < 0.5:
+                        src = rnd.choice(heavy_accounts)
+                    else:
+                        dst = rnd.choice(heavy_accounts)
+                batch.append({
+                    "from_account_id": src,
+                    "to_account_id": dst,
+                    "transaction_type": TransactionType.transfer,
+                    "amount": Decimal(rnd.randint(1, 100_000)),
+                    "currency": "KGS",
+                    "description": "bench",
+                    "status": TransactionStatus.completed,
+                    "created_at": start + timedelta(seconds=i * 30),
+                })
+            conn.execute(insert(Transaction), batch)
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+# ---------- старая версия запроса (до перехода на UNION ALL) ----------
+
+def _legacy_join():
+    return or_(Transaction.from_account_id == Account.id, Transaction.to_account_id == Account.id)
+
+
+async def legacy_page(session: AsyncSession, customer_id: int, page: int, page_size: int) -> List[int]:
+    stmt = (
+        select(Transaction)
+        .distinct()
+        .join(Account, _legacy_join())
+        .where(Account.customer_id == customer_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    return [t.id for t in (await session.execute(stmt)).scalars().all()]
+
+
+async def legacy_count(session: AsyncSession, customer_id: int) -> int:
+    stmt = (
+        select(func.count(func.distinct(Transaction.id)))
+        .select_from(Transaction)
+        .join(Account, _legacy_join())
+        .where(Account.customer_id == customer_id)
+    )
+    return (await session.execute(stmt)).scalar_one()
+
+
+# ---------- новая версия ----------
+
+async def keyset_page(session: AsyncSession, customer_id: int, page: int, page_size: int) -> List[int]:
+    """Walks to `page` by following next_cursor, times only the last request."""
+    repo = CustomerRepository(session)
+    cursor = None
+    for _ in range(page - 1):
+        _, cursor = await repo.get_transactions_by_customer_id(customer_id, decode_cursor(cursor), page_size)
+        if cursor is None:
+            return []  # страница за концом истории
+    items, _ = await repo.get_transactions_by_customer_id(customer_id, decode_cursor(cursor), page_size)
+    return [t.id for t in items]
+
+
+async def union_count(session: AsyncSession, customer_id: int) -> int:
+    count_cache.invalidate(("customer_transactions", customer_id))
+    return await CustomerRepository(session).count_transactions_by_customer_id(customer_id)
+
+
+async def _time(make_session, fn: Callable[..., Awaitable[Any]], *args, repeat: int) -> Dict[str, Any]:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        async with make_session() as session:
+            started = time.perf_counter()
+            result = await fn(session, *args)
+            timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 2), "min_ms": round(min(timings), 2), "result": result}
+
+
+async def _keyset_deep_page(make_session, customer_id: int, page: int, page_size: int, repeat: int) -> Dict[str, Any]:
+    # Курсор на нужную страницу получаем заранее: клиент приходит с ним из предыдущего ответа
+    async with make_session() as session:
+        repo = CustomerRepository(session)
+        cursor = None
+        for _ in range(page - 1):
+            _, cursor = await repo.get_transactions_by_customer_id(customer_id, decode_cursor(cursor), page_size)
+            if cursor is None:
+                break
+
+    async def last_page(session):
+        if cursor is None:
+            return []
+        items, _ = await CustomerRepository(session).get_transactions_by_customer_id(
+            customer_id, decode_cursor(cursor), page_size
+        )
+        return [t.id for t in items]
+
+    return await _time(make_session, last_page, repeat=repeat)
+
+
+async def run(path: str, page_size: int, deep_page: int, repeat: int) -> Dict[str, Any]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    make_session = async_sessionmaker(engine, expire_on_commit=False)
+    report: Dict[str, Any] = {}
+    try:
+        for label, customer_id in (("regular", REGULAR_CUSTOMER_ID), ("heavy", HEAVY_CUSTOMER_ID)):
+            async with make_session() as session:
+                total = await legacy_count(session, customer_id)
+            page = min(deep_page, max(1, -(-total // page_size)))  # не дальше последней страницы
+            old_first = await _time(make_session, legacy_page, customer_id, 1, page_size, repeat=repeat)
+            new_first = await _time(make_session, keyset_page, customer_id, 1, page_size, repeat=repeat)
+            old_deep = await _time(make_session, legacy_page, customer_id, page, page_size, repeat=repeat)
+            new_deep = await _keyset_deep_page(make_session, customer_id, page, page_size, repeat)
+            old_count = await _time(make_session, legacy_count, customer_id, repeat=repeat)
+            new_count = await _time(make_session, union_count, customer_id, repeat=repeat)
+
+            assert old_first["result"] == new_first["result"], "first page differs"
+            assert old_deep["result"] == new_deep["result"], "deep page differs"
+            assert old_count["result"] == new_count["result"], "count differs"
+
+            report[label] = {
+                "transactions": old_count["result"],
+                "first_page": {"or_join_ms": old_first["median_ms"], "union_all_ms": new_first["median_ms"]},
+                f"page_{page}": {"or_join_ms": old_deep["median_ms"], "union_all_ms": new_deep["median_ms"]},
+                "count": {"or_join_ms": old_count["median_ms"], "union_all_ms": new_count["median_ms"]},
+            }
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="transactions to seed")
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--accounts-per-customer", type=int, default=2)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="reuse / keep this SQLite file instead of a temporary one")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench_tx_"), "bench.db")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        seed(path, args.rows, args.customers, args.accounts_per_customer)
+        print(f"seeded {args.rows} transactions in {time.perf_counter() - started:.1f}s -> {path}")
+
+    report = asyncio.run(run(path, args.page_size, args.deep_page, args.repeat))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local stand-in for the upstream LLM (chat.aitil.kg).
+
+Speaks the same SSE protocol the app consumes:
+
+    data: {"choices":[{"delta":{"content":"..."}}]}
+    ...
+    data: [DONE]
+
+Latency is configurable: time to first token, delay between tokens and the
+number of tokens in a plain answer. Scripted rules turn a user message into
+a [FUNC_CALL:...] answer: a rule fires when its `match` substring occurs in
+the last user message and the system prompt is the first-pass one (it
+teaches the [FUNC_CALL:...] format). The follow-up request that carries the
+tool output gets a plain answer, as a real model would give.
+
+    python -m benchmarks.fake_llm --port 8900
+    python -m benchmarks.fake_llm --ttft-ms 400 --token-delay-ms 30 --tokens 80 --script rules.json
+
+rules.json: [{"match": "#tool", "output": "[FUNC_CALL:name=get_balance]"}, ...]
+Then point the app at it: LLM_URL=http://127.0.0.1:8900/v1/chat
+"""
+
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+FIRST_PASS_MARKER = "FUNC_CALL"
+
+DEFAULT_SCRIPT: List[Dict[str, str]] = [
+    {"match": "#faq", "output": "[FUNC_CALL:name=get_faq_by_category, category=cards]"},
+    {"match": "#tool", "output": "[FUNC_CALL:name=get_balance]"},
+]
+
+WORDS = (
+    "Ai Bank сизге жардам берүүгө даяр. Бул тест жообу, ал жергиликтүү "
+    "серверден токен боюнча агылып келет жана кечигүүнү өлчөө үчүн колдонулат."
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    ttft_ms: float = 300.0
+    token_delay_ms: float = 20.0
+    tokens: int = 50
+    func_call_chunk: int = 8          # FUNC_CALL отдаём кусками, как настоящая модель
+    script: List[Dict[str, str]] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+
+
+def _sse(content: str) -> str:
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]}, ensure_ascii=False) + "\n\n"
+
+
+def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            return str(msg.get("content") or "")
+    return ""
+
+
+def pick_answer(config: FakeLLMConfig, payload: Dict[str, Any]) -> List[str]:
+    """Chunks of the answer for this request: a scripted FUNC_CALL or `tokens` words."""
+    messages = payload.get("messages") or []
+    system = str(messages[0].get("content") or "") if messages and messages[0].get("role") == "system" else ""
+    if FIRST_PASS_MARKER in system:
+        user_message = _last_user_message(messages)
+        for rule in config.script:
+            if rule["match"] in user_message:
+                text = rule["output"]
+                n = max(1, config.func_call_chunk)
+                return [text[i:i + n] for i in range(0, len(text), n)]
+    return [WORDS[i % len(WORDS)] + " " for i in range(config.tokens)]
+
+
+def create_app(config: Optional[FakeLLMConfig] = None) -> Starlette:
+    config = config or FakeLLMConfig()
+    counters = {"requests": 0, "func_calls": 0}
+
+    async def stream(chunks: List[str]) -> AsyncGenerator[str, None]:
+        await asyncio.sleep(config.ttft_ms / 1000)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(config.token_delay_ms / 1000)
+            yield _sse(chunk)
+        yield "data: [DONE]\n\n"
+
+    async def chat(request: Request) -> StreamingResponse:
+        payload = await request.json()
+        chunks = pick_answer(config, payload)
+        counters["requests"] += 1
+        if chunks and chunks[0].startswith("[FUNC_CALL"):
+            counters["func_calls"] += 1
+        return StreamingResponse(stream(chunks), media_type="text/event-stream")
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", **counters})
+
+    return Starlette(routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/{path:path}", chat, methods=["POST"]),
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="delay before the first token")
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="delay between tokens")
+    parser.add_argument("--tokens", type=int, default=50, help="tokens in a plain answer")
+    parser.add_argument("--script", help="JSON file with [{match, output}] rules (default: #faq / #tool)")
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(ttft_ms=args.ttft_ms, token_delay_ms=args.token_delay_ms, tokens=args.tokens)
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            config.script = json.load(f)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark: token cadence of streaming responses during a login storm.
+
+A number of simulated SSE streams emit a token every --token-interval-ms on
+the event loop while a burst of logins runs against a temporary SQLite
+database. Three runs are compared:
+
+    idle       streams only
+    inline     logins verify bcrypt on the event loop (the old behaviour)
+    offloaded  logins go through AuthService.validate_login, i.e. bcrypt on
+               the bounded thread pool of app.services.security
+
+For each run the gaps between consecutive tokens are reported (p50/p95/p99/
+max); with bcrypt offloaded they should stay close to the idle run.
+
+    python -m benchmarks.login_storm
+    python -m benchmarks.login_storm --logins 200 --concurrency 50 --rounds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Customer
+from app.db.repositories.customer_repository import CustomerRepository
+from app.services.customer_services.auth_service import AuthService
+from app.services.security import password_hasher
+from benchmarks.stats import percentiles
+
+PASSWORD = "storm-password"
+
+
+def seed(path: str, users: int, password_hash: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {
+                "id": i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "birth_date": date(1990, 1, 1),
+                "passport_number": f"ID{i:08d}",
+                "phone_number": f"+996{i:09d}",
+                "email": f"user{i}@example.com",
+                "address": "Bishkek",
+                "password_hash": password_hash,
+            }
+            for i in range(1, users + 1)
+        ])
+    engine.dispose()
+
+
+async def _stream(interval: float, stop: asyncio.Event, gaps: List[float]) -> None:
+    """Emits a "token" every `interval` seconds and records the real gap between tokens."""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+
+
+# ---------- старая версия: bcrypt прямо в корутине ----------
+
+async def inline_login(make_session, email: str) -> None:
+    async with make_session() as session:
+        user = await CustomerRepository(session).get_by_email(email)
+        assert user is not None and password_hasher.verify(PASSWORD, user.password_hash)
+
+
+# ---------- новая версия ----------
+
+async def offloaded_login(make_session, email: str) -> None:
+    async with make_session() as session:
+        await AuthService(session).validate_login(email=email, password=PASSWORD)
+
+
+async def _storm(
+    make_session,
+    login: Optional[Callable[..., Awaitable[None]]],
+    *,
+    users: int,
+    logins: int,
+    concurrency: int,
+    streams: int,
+    interval: float,
+    warmup: float,
+) -> Dict[str, Any]:
+    gaps: List[float] = []
+    stop = asyncio.Event()
+    tickers = [asyncio.create_task(_stream(interval, stop, gaps)) for _ in range(streams)]
+    latencies: List[float] = []
+    await asyncio.sleep(warmup)
+    started = time.perf_counter()
+
+    if login is None:
+        await asyncio.sleep(warmup * 4)
+    else:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                t0 = time.perf_counter()
+                await login(make_session, f"user{i % users + 1}@example.com")
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        await asyncio.gather(*(one(i) for i in range(logins)))
+
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*tickers)
+    result: Dict[str, Any] = {
+        "elapsed_s": round(elapsed, 2),
+        "token_gap": percentiles(gaps),
+    }
+    if latencies:
+        result["logins_per_s"] = round(len(latencies) / elapsed, 1)
+        result["login_latency"] = percentiles(latencies)
+    return result
+
+
+async def run(path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    make_session = async_sessionmaker(engine, expire_on_commit=False)
+    options = dict(
+        users=args.users,
+        logins=args.logins,
+        concurrency=args.concurrency,
+        streams=args.streams,
+        interval=args.token_interval_ms / 1000,
+        warmup=0.5,
+    )
+    report: Dict[str, Any] = {
+        "rounds": password_hasher.rounds,
+        "workers": password_hasher.workers,
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "streams": args.streams,
+        "token_interval_ms": args.token_interval_ms,
+    }
+    try:
+        report["idle"] = await _storm(make_session, None, **options)
+        report["inline"] = await _storm(make_session, inline_login, **options)
+        report["offloaded"] = await _storm(make_session, offloaded_login, **options)
+        report["offloaded"]["hasher"] = password_hasher.stats()
+    finally:
+        await engine.dispose()
+        password_hasher.shutdown()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--logins", type=int, default=60, help="logins per storm")
+    parser.add_argument("--concurrency", type=int, default=20, help="logins in flight at once")
+    parser.add_argument("--streams", type=int, default=20, help="simulated SSE streams")
+    parser.add_argument("--token-interval-ms", type=float, default=20.0)
+    parser.add_argument("--rounds", type=int, help="bcrypt cost factor (default: settings.bcrypt_rounds)")
+    args = parser.parse_args()
+
+    if args.rounds is not None:
+        password_hasher.context.update(bcrypt__rounds=args.rounds)
+        password_hasher.rounds = args.rounds
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_login_"), "bench.db")
+    seed(path, args.users, password_hasher.hash(PASSWORD))
+    report = asyncio.run(run(path, args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
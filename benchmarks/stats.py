@@ -0,0 +1,22 @@
+"""Helpers shared by the benchmark scripts."""
+
+import statistics
+from typing import Dict, List
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean of a list of milliseconds (nearest-rank)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+    return {
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1], 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+    }
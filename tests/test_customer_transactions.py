@@ -0,0 +1,96 @@
+"""
+Customer transaction history built from UNION ALL branches: pages match a
+plain OR query, transfers between the customer's own accounts appear once,
+and customers with hundreds of accounts stay under SQLite's compound SELECT
+limit.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import (
+    Account, AccountStatus, AccountType, Customer, Transaction, TransactionStatus, TransactionType,
+)
+from app.db.pagination import decode_cursor
+from app.db.repositories.customer_repository import MAX_ACCOUNT_BRANCHES, CustomerRepository
+
+OTHER_ACCOUNT = 10_000
+
+
+def _seed(path: str, accounts: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {
+                "id": c, "first_name": "F", "last_name": "L", "birth_date": date(1990, 1, 1),
+                "passport_number": f"ID{c}", "phone_number": f"+99655500000{c}",
+                "email": f"u{c}@example.com", "address": "Bishkek", "password_hash": "x",
+            }
+            for c in (1, 2)
+        ])
+        conn.execute(insert(Account), [
+            {
+                "id": a, "customer_id": 1 if a <= accounts else 2, "account_number": f"KG{a:08d}",
+                "account_type": AccountType.current, "currency": "KGS",
+                "balance": Decimal("0"), "status": AccountStatus.active,
+            }
+            for a in [*range(1, accounts + 1), OTHER_ACCOUNT]
+        ])
+        # Исходящие, входящие, пополнения без отправителя и переводы между своими счетами
+        ends = [(a, OTHER_ACCOUNT) for a in range(1, accounts + 1)]
+        ends += [(OTHER_ACCOUNT, a) for a in range(1, accounts + 1, 3)]
+        ends += [(None, a) for a in range(1, accounts + 1, 7)]
+        ends += [(a, a % accounts + 1) for a in range(1, accounts + 1, 5)]
+        conn.execute(insert(Transaction), [
+            {
+                "from_account_id": src, "to_account_id": dst, "transaction_type": TransactionType.transfer,
+                "amount": Decimal(1), "currency": "KGS", "status": TransactionStatus.completed,
+                # Одинаковое время у пар строк проверяет разрешение ничьих по id
+                "created_at": start + timedelta(minutes=i // 2),
+            }
+            for i, (src, dst) in enumerate(ends)
+        ])
+    engine.dispose()
+
+
+def _history(path: str, page_size: int):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                acc_ids = select(Account.id).where(Account.customer_id == 1)
+                expected = (await session.execute(
+                    select(Transaction.id)
+                    .where(or_(Transaction.from_account_id.in_(acc_ids), Transaction.to_account_id.in_(acc_ids)))
+                    .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+                )).scalars().all()
+
+                repo, pages, cursor = CustomerRepository(session), [], None
+                while True:
+                    items, cursor = await repo.get_transactions_by_customer_id(1, decode_cursor(cursor), page_size)
+                    pages.append([t.id for t in items])
+                    if cursor is None:
+                        return expected, pages
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("accounts", [3, MAX_ACCOUNT_BRANCHES + 1, 300])
+def test_pages_match_or_query(tmp_path, accounts):
+    path = str(tmp_path / "history.db")
+    _seed(path, accounts)
+
+    expected, pages = _history(path, page_size=25)
+
+    assert [i for page in pages for i in page] == list(expected)
+    assert all(len(page) == 25 for page in pages[:-1])
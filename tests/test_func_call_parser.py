@@ -0,0 +1,48 @@
+"""
+FuncCallStreamParser: text is forwarded as it arrives, only a possible
+marker prefix is held back, and everything from [FUNC_CALL: on is kept for
+tool parsing.
+"""
+
+from app.services.llm_services.utils import FuncCallStreamParser, extract_func_calls
+
+
+def _feed(chunks):
+    parser = FuncCallStreamParser()
+    forwarded = [parser.feed(chunk) for chunk in chunks]
+    forwarded.append(parser.flush())
+    return parser, forwarded
+
+
+def test_marker_split_across_chunks():
+    parser, forwarded = _feed(["Азыр текшерем. [FU", "NC_CA", "LL:name=get_balance", "]", " ignored"])
+
+    assert forwarded == ["Азыр текшерем. ", "", "", "", "", ""]
+    assert parser.tool_mode
+    assert parser.tool_text == "[FUNC_CALL:name=get_balance] ignored"
+    assert extract_func_calls(parser.tool_text) == ["name=get_balance"]
+
+
+def test_bracket_that_is_not_a_marker_is_forwarded():
+    parser, forwarded = _feed(["Курс [", "USD] 87.5, [F", "AQ] бөлүмүн кара"])
+
+    assert forwarded == ["Курс ", "[USD] 87.5, ", "[FAQ] бөлүмүн кара", ""]
+    assert not parser.tool_mode
+    assert parser.tool_text == ""
+
+
+def test_held_back_prefix_is_returned_by_flush():
+    parser, forwarded = _feed(["Жооп: [FUNC"])
+
+    assert forwarded == ["Жооп: ", "[FUNC"]
+    assert not parser.tool_mode
+
+
+def test_unterminated_marker_yields_no_calls():
+    parser, forwarded = _feed(["Сейчас ", "[FUNC_CALL:name=get_bal"])
+
+    assert "".join(forwarded) == "Сейчас "
+    assert parser.tool_mode
+    assert parser.tool_text == "[FUNC_CALL:name=get_bal"
+    # llm_client отдаёт такой текст клиенту как обычный ответ
+    assert extract_func_calls(parser.tool_text) == []
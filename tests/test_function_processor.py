@@ -0,0 +1,37 @@
+"""
+Tool execution: only the per-call deadline is reported as a timeout; a
+TimeoutError raised inside the tool itself is an ordinary tool error.
+"""
+
+import asyncio
+
+from app import metrics
+from app.services.llm_services.function_processor import FunctionProcessor
+
+
+def _run(monkeypatch, tool, timeout):
+    monkeypatch.setattr(FunctionProcessor, "call_tool", staticmethod(tool))
+    return asyncio.run(FunctionProcessor._run_tool("get_balance", {}, timeout))
+
+
+def _count(status):
+    return metrics.tool_calls.labels("get_balance", status).value
+
+
+def test_deadline_is_reported_as_timeout(monkeypatch):
+    async def slow(name, kwargs):
+        await asyncio.sleep(10)
+
+    before = _count("timeout")
+    assert "превышено время ожидания" in _run(monkeypatch, slow, timeout=0.01)
+    assert _count("timeout") == before + 1
+
+
+def test_timeout_raised_by_the_tool_is_an_error(monkeypatch):
+    async def failing(name, kwargs):
+        raise TimeoutError("read timeout")
+
+    before = _count("timeout"), _count("error")
+    for timeout in (None, 5.0):
+        assert _run(monkeypatch, failing, timeout) == "Ошибка: read timeout"
+    assert (_count("timeout"), _count("error")) == (before[0], before[1] + 2)
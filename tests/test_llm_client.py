@@ -0,0 +1,116 @@
+"""
+A client that closes the SSE stream after [DONE], while the turn waits for
+its save: the turn keeps its outcome in the metrics and both messages are
+still stored. A stream closed before the answer is complete is counted as
+cancelled.
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import metrics
+from app.db.base import Base
+from app.db.models import Chat, ChatStatus, Message, MessageRole
+from app.services.llm_services import llm_client
+from app.services.llm_services.llm_client import build_llm_client
+
+
+def _client(monkeypatch, tokens):
+    client = build_llm_client()
+
+    async def build_payload(**kwargs):
+        return {"messages": []}
+
+    async def raw_stream(payload):
+        for token in tokens:
+            yield token
+
+    async def slow_save():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(client, "_build_payload", build_payload)
+    monkeypatch.setattr(client, "_raw_stream", raw_stream)
+    monkeypatch.setattr(client, "_schedule_save", lambda *args: asyncio.ensure_future(slow_save()))
+    return client
+
+
+def _turns(outcome):
+    return metrics.chat_turns.labels(outcome).value
+
+
+def _read_until(client, stop):
+    async def run():
+        stream = client.astream_answer("салам", chat_id=1)
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk)
+            if stop(chunk):
+                break
+        await stream.aclose()
+        return chunks
+
+    return asyncio.run(run())
+
+
+def test_close_after_done_keeps_outcome(monkeypatch):
+    client = _client(monkeypatch, ["Сала", "м!"])
+    before = _turns("plain"), _turns("cancelled")
+
+    chunks = _read_until(client, lambda chunk: chunk == "data: [DONE]\n\n")
+
+    assert chunks[-1] == "data: [DONE]\n\n"
+    assert client.outcome == "plain"
+    assert (_turns("plain"), _turns("cancelled")) == (before[0] + 1, before[1])
+    assert metrics.chat_active_streams.labels().value == 0
+
+
+def test_close_mid_answer_is_cancelled(monkeypatch):
+    client = _client(monkeypatch, ["Сала", "м", "!"])
+    before = _turns("cancelled")
+
+    _read_until(client, lambda chunk: True)
+
+    assert client.outcome == "cancelled"
+    assert _turns("cancelled") == before + 1
+
+
+def test_save_survives_close_after_done_without_write_behind(monkeypatch, tmp_path):
+    path = tmp_path / "chat.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Chat), [{"id": 1, "title": "t", "customer_id": 1, "status": ChatStatus.open}])
+    engine.dispose()
+
+    async def run():
+        db = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        make_session = async_sessionmaker(db, expire_on_commit=False)
+        monkeypatch.setattr(llm_client, "SessionLocal", make_session)
+        try:
+            # Как в /api/conversation: сессия стрима закрывается вместе с генератором
+            async with make_session() as session:
+                client = build_llm_client(db_session=session)
+
+                async def build_payload(**kwargs):
+                    return {"messages": []}
+
+                async def raw_stream(payload):
+                    yield "Салам!"
+
+                monkeypatch.setattr(client, "_build_payload", build_payload)
+                monkeypatch.setattr(client, "_raw_stream", raw_stream)
+                stream = client.astream_answer("салам", chat_id=1)
+                async for chunk in stream:
+                    if chunk == "data: [DONE]\n\n":
+                        break
+                await stream.aclose()
+            await llm_client.drain_pending_saves(timeout=5)
+            async with make_session() as session:
+                rows = await session.execute(select(Message.role, Message.content).order_by(Message.id))
+                return [tuple(r) for r in rows]
+        finally:
+            await db.dispose()
+
+    assert asyncio.run(run()) == [(MessageRole.user, "салам"), (MessageRole.assistant, "Салам!")]
@@ -0,0 +1,86 @@
+"""
+Logging: redaction/truncation of payloads, sampled lazy events and the
+non-blocking queue handler with the JSON formatter.
+"""
+
+import json
+import logging
+import queue
+
+from app import logging_config
+from app.logging_config import JsonFormatter, Lazy, NonBlockingQueueHandler, log_event, redact
+
+
+def test_redact_masks_sensitive_keys_digits_and_long_strings():
+    payload = {
+        "messages": [{"role": "system", "content": "x" * 30}, {"role": "user", "content": "карта 4169585312345678"}],
+        "Authorization": "Bearer abc",
+        "customer": {"email": "a@b.kg", "first_name": "Айбек"},
+        "temperature": 0.2,
+    }
+
+    assert redact(payload, max_chars=10) == {
+        "messages": [
+            {"role": "system", "content": "xxxxxxxxxx…(+20 chars)"},
+            {"role": "user", "content": "карта ****…(+12 chars)"},
+        ],
+        "Authorization": "***",
+        "customer": {"email": "***", "first_name": "Айбек"},
+        "temperature": 0.2,
+    }
+    assert redact("карта 4169585312345678", max_chars=0) == "карта ************5678"
+
+
+def test_log_event_is_lazy_and_sampled(monkeypatch):
+    logger = logging.getLogger("tests.logging_config")
+    logger.setLevel(logging.INFO)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    calls = []
+
+    def payload():
+        calls.append(1)
+        return {"messages": []}
+
+    try:
+        monkeypatch.setattr(logging_config.sampler, "rates", {"llm.payload": 0.0})
+        log_event(logger, logging.INFO, "llm.payload", "LLM request payload", payload=Lazy(payload))
+        monkeypatch.setattr(logging_config.sampler, "rates", {"llm.payload": 1.0})
+        log_event(logger, logging.DEBUG, "llm.payload", "LLM request payload", payload=Lazy(payload))
+        assert records == [] and calls == []
+
+        log_event(logger, logging.INFO, "llm.payload", "LLM request payload", leg="first", payload=Lazy(payload))
+    finally:
+        logger.removeHandler(handler)
+
+    [record] = records
+    assert record.category == "llm.payload"
+    assert record.funcName == "test_log_event_is_lazy_and_sampled"
+    assert calls == []  # вычисляется только при постановке в очередь
+
+
+def test_queue_handler_resolves_fields_and_drops_when_full():
+    records = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(records)
+    logger = logging.getLogger("tests.logging_queue")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.info("turn %s", 7, extra={"category": "llm.response", "fields": {"text": Lazy(lambda: "ok")}})
+        logger.info("dropped")
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert handler.dropped == 1
+    data = json.loads(JsonFormatter().format(records.get_nowait()))
+    assert {k: data[k] for k in ("level", "logger", "message", "category", "text")} == {
+        "level": "INFO",
+        "logger": "tests.logging_queue",
+        "message": "turn 7",
+        "category": "llm.response",
+        "text": "ok",
+    }
@@ -0,0 +1,113 @@
+"""
+MCP session pool: a call cancelled mid-flight (tool timeout, client
+disconnect) must not hand the busy session to the next caller, and a call
+that hits a dead server process is retried once on a fresh session.
+"""
+
+import asyncio
+import time
+
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, CallToolResult, ErrorData, TextContent, Tool, ToolAnnotations
+
+from app.services.llm_services.mcp_client import MCPClientPool
+
+
+class FakeClient:
+    """ClientSession stand-in; `failures` are raised by the next calls."""
+
+    def __init__(self, failures) -> None:
+        self.failures = failures
+
+    async def call_tool(self, name, arguments, read_timeout_seconds=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        return CallToolResult(content=[TextContent(type="text", text=f"{name}: ok")])
+
+
+class FakeSession:
+    def __init__(self, failures=None) -> None:
+        self.index = 0
+        self.last_used = time.monotonic()
+        self.failures = failures if failures is not None else []
+        self.session = FakeClient(self.failures)
+        self.starts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None
+
+    def discard(self) -> None:
+        self.session = None
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self.session = None
+
+    async def start(self, timeout: float) -> None:
+        self.starts += 1
+        self.session = FakeClient(self.failures)
+
+
+def _pool(pooled):
+    pool = MCPClientPool(size=1, call_timeout=1, startup_timeout=1, health_check_interval=60)
+    pool._sessions = [pooled]
+    pool._idle = asyncio.Queue()
+    pool._idle.put_nowait(pooled)
+    pool._started = True
+    pool.tools = {
+        name: Tool(name=name, inputSchema={"type": "object"}, annotations=ToolAnnotations(readOnlyHint=read_only))
+        for name, read_only in (("get_balance", True), ("transfer_money", False))
+    }
+    return pool
+
+
+def test_cancelled_call_restarts_session_on_next_acquire():
+    async def run():
+        pooled = FakeSession()
+        pool = _pool(pooled)
+
+        async def call():
+            async with pool.acquire():
+                await asyncio.sleep(10)  # сервер ещё отвечает
+
+        try:
+            async with asyncio.timeout(0.01):
+                await call()
+        except TimeoutError:
+            pass
+        assert not pooled.alive
+
+        async with pool.acquire() as again:
+            assert again is pooled and pooled.alive
+        return pooled.starts, pool.restarts
+
+    assert asyncio.run(run()) == (1, 1)
+
+
+_CLOSED = McpError(ErrorData(code=CONNECTION_CLOSED, message="Connection closed"))
+
+
+@pytest.mark.parametrize("tool, error", [
+    ("get_balance", anyio.BrokenResourceError()),
+    ("transfer_money", anyio.ClosedResourceError()),
+    ("get_balance", _CLOSED),
+])
+def test_dead_session_is_restarted_and_call_retried(tool, error):
+    async def run():
+        pooled = FakeSession([error])
+        pool = _pool(pooled)
+        return await pool.call_tool(tool, {}), pooled.starts, pool.retries
+
+    assert asyncio.run(run()) == (f"{tool}: ok", 1, 1)
+
+
+def test_ambiguous_failure_of_a_write_tool_is_not_retried():
+    async def run():
+        pool = _pool(FakeSession([_CLOSED]))
+        with pytest.raises(McpError):
+            await pool.call_tool("transfer_money", {})
+        return pool.retries
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,95 @@
+"""
+Write-behind message queue: batching by size, drain on stop, retries of
+transient DB errors and the row-by-row fallback for rejected batches.
+"""
+
+import asyncio
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.db.models import MessageRole
+from app.schemas.message_schemas import MessageCreate
+from app.services.customer_services.message_write_queue import MessageWriteQueue
+
+BAD_CHAT = 999
+
+
+class RecordingQueue(MessageWriteQueue):
+    """Keeps inserted batches in memory; `failures` are raised by the next inserts."""
+
+    def __init__(self, **options):
+        defaults = dict(flush_interval=10.0, batch_size=4, max_retries=2, retry_backoff=0.001, max_size=100)
+        super().__init__(**{**defaults, **options})
+        self.batches = []
+        self.failures = []
+
+    async def _insert(self, rows):
+        if self.failures:
+            raise self.failures.pop(0)
+        if any(r["chat_id"] == BAD_CHAT for r in rows):
+            raise IntegrityError("INSERT INTO messages", {}, Exception("FOREIGN KEY constraint failed"))
+        self.batches.append([(r["chat_id"], r["content"]) for r in rows])
+
+
+def _turn(chat_id, n):
+    return [
+        MessageCreate(chat_id=chat_id, role=MessageRole.user, content=f"q{n}"),
+        MessageCreate(chat_id=chat_id, role=MessageRole.assistant, content=f"a{n}"),
+    ]
+
+
+def test_full_batch_is_flushed_and_rest_drained_on_stop():
+    async def run():
+        queue = RecordingQueue()
+        queue.start()
+        await queue.put(_turn(1, 1))
+        await queue.put(_turn(1, 2))
+        for _ in range(100):  # пачка из batch_size строк уходит, не дожидаясь flush_interval
+            if queue.batches:
+                break
+            await asyncio.sleep(0.01)
+        await queue.put(_turn(2, 3))
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert queue.batches == [
+        [(1, "q1"), (1, "a1"), (1, "q2"), (1, "a2")],
+        [(2, "q3"), (2, "a3")],
+    ]
+    assert queue.stats()["flushed_rows"] == queue.stats()["enqueued_rows"] == 6
+    assert not queue.running
+
+
+def test_transient_errors_are_retried_then_dropped():
+    transient = OperationalError("INSERT INTO messages", {}, Exception("database is locked"))
+
+    async def run():
+        queue = RecordingQueue()
+        queue.failures = [transient, transient]
+        await queue._flush([{"chat_id": 1, "content": "q"}])
+        queue.failures = [transient] * 3
+        await queue._flush([{"chat_id": 1, "content": "lost"}])
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert queue.batches == [[(1, "q")]]
+    assert (queue.retries, queue.flushed_rows, queue.dropped_rows) == (4, 1, 1)
+
+
+def test_rejected_batch_is_written_row_by_row():
+    async def run():
+        queue = RecordingQueue()
+        await queue._flush([
+            {"chat_id": 1, "content": "q"},
+            {"chat_id": BAD_CHAT, "content": "orphan"},
+            {"chat_id": 1, "content": "a"},
+        ])
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert queue.batches == [[(1, "q")], [(1, "a")]]
+    assert (queue.flushed_rows, queue.dropped_rows) == (2, 1)
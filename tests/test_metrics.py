@@ -0,0 +1,71 @@
+"""
+Metrics registry: text exposition format, cumulative histogram buckets and
+per-request query counting by the ASGI middleware.
+"""
+
+import asyncio
+
+from app.metrics import QueryCountMiddleware, Registry, count_query, db_queries_per_request
+
+
+def test_render_counters_gauges_and_labels():
+    registry = Registry()
+    turns = registry.counter("turns_total", "Turns.", ["outcome"])
+    streams = registry.gauge("active_streams", "Open streams.")
+    turns.labels("tool").inc()
+    turns.labels("plain").inc(2)
+    streams.inc()
+    streams.inc()
+    streams.dec()
+    registry.callback("cache_total", "Cache.", "counter", lambda: {("hit",): 3, ("miss",): 1}, ["result"])
+
+    assert registry.render().splitlines() == [
+        "# HELP turns_total Turns.",
+        "# TYPE turns_total counter",
+        'turns_total{outcome="plain"} 2',
+        'turns_total{outcome="tool"} 1',
+        "# HELP active_streams Open streams.",
+        "# TYPE active_streams gauge",
+        "active_streams 1",
+        "# HELP cache_total Cache.",
+        "# TYPE cache_total counter",
+        'cache_total{result="hit"} 3',
+        'cache_total{result="miss"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("tool_seconds", "Tool latency.", ["tool"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("get_balance").observe(value)
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'tool_seconds_bucket{tool="get_balance",le="0.1"} 2',
+        'tool_seconds_bucket{tool="get_balance",le="1"} 3',
+        'tool_seconds_bucket{tool="get_balance",le="+Inf"} 4',
+        'tool_seconds_sum{tool="get_balance"} 3.65',
+        'tool_seconds_count{tool="get_balance"} 4',
+    ]
+
+
+def test_middleware_counts_queries_of_a_request():
+    class Route:
+        path = "/api/accounts/{id}"
+
+    async def app(scope, receive, send):
+        scope["route"] = Route()
+        count_query()
+
+        async def background():
+            count_query()
+
+        await asyncio.create_task(background())
+
+    child = db_queries_per_request.labels(Route.path)
+    before = child.sum, child.count
+    asyncio.run(QueryCountMiddleware(app)({"type": "http"}, None, None))
+    count_query()  # вне запроса не считается
+
+    assert (child.sum - before[0], child.count - before[1]) == (2, 1)
@@ -0,0 +1,93 @@
+"""
+Principal cache behind the session-cookie auth dependencies: repeated lookups
+are served without a query, and invalidation picks up role changes and
+deletions.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, delete, event, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Customer, Employee, EmployeeRole
+from app.services import principal_cache
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    path = tmp_path / "principals.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{
+            "id": 1,
+            "first_name": "Aibek",
+            "last_name": "Test",
+            "birth_date": date(1990, 1, 1),
+            "passport_number": "ID0000001",
+            "phone_number": "+996555000001",
+            "email": "user1@example.com",
+            "address": "Bishkek",
+            "password_hash": "x",
+        }])
+        conn.execute(insert(Employee), [{"id": 1, "username": "boss", "password_hash": "x", "role": EmployeeRole.admin}])
+    engine.dispose()
+    principal_cache.customer_principals.clear()
+    principal_cache.employee_principals.clear()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def _run(db_url, scenario):
+    async def run():
+        engine = create_async_engine(db_url)
+        queries = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                return await scenario(session, queries)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_repeated_lookups_hit_the_cache(db_url):
+    async def scenario(session, queries):
+        first = await principal_cache.get_customer_principal(session, 1)
+        second = await principal_cache.get_customer_principal(session, 1)
+        assert first is second
+        assert (first.id, first.first_name, first.email) == (1, "Aibek", "user1@example.com")
+        assert len(queries) == 1
+
+    _run(db_url, scenario)
+
+
+def test_missing_principal_is_not_cached(db_url):
+    async def scenario(session, queries):
+        assert await principal_cache.get_customer_principal(session, 99) is None
+        assert await principal_cache.get_customer_principal(session, 99) is None
+        assert len(queries) == 2
+
+    _run(db_url, scenario)
+
+
+def test_invalidation_picks_up_role_change_and_deletion(db_url):
+    async def scenario(session, queries):
+        assert (await principal_cache.get_employee_principal(session, 1)).role == EmployeeRole.admin
+
+        await session.execute(update(Employee).where(Employee.id == 1).values(role=EmployeeRole.manager))
+        await session.commit()
+        # До сброса отдаётся старый снимок
+        assert (await principal_cache.get_employee_principal(session, 1)).role == EmployeeRole.admin
+        principal_cache.invalidate_employee_principal(1)
+        assert (await principal_cache.get_employee_principal(session, 1)).role == EmployeeRole.manager
+
+        await session.execute(delete(Employee).where(Employee.id == 1))
+        await session.commit()
+        principal_cache.invalidate_employee_principal(1)
+        assert await principal_cache.get_employee_principal(session, 1) is None
+
+    _run(db_url, scenario)
@@ -0,0 +1,249 @@
+"""
+Query-plan regression tests.
+
+Every hot repository / tool query is executed against a seeded temporary
+SQLite database; the SQL it emits is captured and run through
+EXPLAIN QUERY PLAN. A test fails if the plan contains a full scan of a table
+(a bare "SCAN <table>" without an index), i.e. an index was dropped or a
+query was rewritten in a way the indexes no longer cover.
+"""
+
+import asyncio
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Awaitable, Callable, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.pagination import Cursor
+from app.db.models import (
+    Account, AccountStatus, AccountType, Card, CardApplication, CardApplicationStatus, CardStatus, CardType,
+    Chat, ChatStatus, Customer, Loan, LoanApplication, LoanApplicationStatus, LoanStatus, LoanType,
+    Message, MessageRole, Transaction, TransactionStatus, TransactionType,
+)
+from app.db.repositories.app_repository import CardApplicationRepository, LoanApplicationRepository
+from app.db.repositories.chat_repository import ChatRepository
+from app.db.repositories.customer_repository import CustomerRepository
+from app.db.repositories.message_repository import MessageRepository
+from app.services.mcp_services import customer_cache, personal_services
+
+CUSTOMERS = 200
+ACCOUNTS_PER_CUSTOMER = 2
+TRANSACTIONS = 5000
+CHATS = 100
+MESSAGES_PER_CHAT = 20
+APPLICATIONS = 300
+
+CUSTOMER_ID = 42
+CHAT_ID = 7
+
+# SQLite до 3.36 пишет "SCAN TABLE x" / "SEARCH TABLE x USING ...", новее — "SCAN x"
+_FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+_TABLE_ACCESS_RE = re.compile(r"^(?:SCAN|SEARCH) ")
+_SUBQUERY_RE = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)$")
+
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime(2025, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {
+                "id": i,
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "birth_date": date(1990, 1, 1),
+                "passport_number": f"ID{i:07d}",
+                "phone_number": f"+996555{i:06d}",
+                "email": f"user{i}@example.com",
+                "address": "Bishkek",
+                "password_hash": "x",
+            }
+            for i in range(1, CUSTOMERS + 1)
+        ])
+        conn.execute(insert(Account), [
+            {
+                "id": (c - 1) * ACCOUNTS_PER_CUSTOMER + k + 1,
+                "customer_id": c,
+                "account_number": f"KG{c:06d}{k}",
+                "account_type": AccountType.current,
+                "currency": "KGS" if k == 0 else "USD",
+                "balance": Decimal("1000.00"),
+                "status": AccountStatus.active,
+            }
+            for c in range(1, CUSTOMERS + 1)
+            for k in range(ACCOUNTS_PER_CUSTOMER)
+        ])
+        accounts = CUSTOMERS * ACCOUNTS_PER_CUSTOMER
+        conn.execute(insert(Card), [
+            {
+                "account_id": a,
+                "card_number": f"{a:016d}",
+                "card_type": CardType.debit,
+                "expiration_date": date(2030, 1, 1),
+                "status": CardStatus.active,
+            }
+            for a in range(1, accounts + 1)
+        ])
+        conn.execute(insert(Transaction), [
+            {
+                "from_account_id": i % accounts + 1,
+                "to_account_id": (i * 7) % accounts + 1,
+                "transaction_type": TransactionType.transfer,
+                "amount": Decimal(i % 500 + 1),
+                "currency": "KGS",
+                "description": "seed",
+                "status": TransactionStatus.completed,
+                "created_at": now + timedelta(minutes=i),
+            }
+            for i in range(TRANSACTIONS)
+        ])
+        conn.execute(insert(Loan), [
+            {
+                "customer_id": c,
+                "loan_type": LoanType.personal,
+                "principal_amount": Decimal("50000.00"),
+                "interest_rate": Decimal("24.00"),
+                "start_date": date(2025, 1, 1),
+                "end_date": date(2026, 1, 1),
+                "status": LoanStatus.active,
+            }
+            for c in range(1, CUSTOMERS + 1)
+        ])
+        conn.execute(insert(Chat), [
+            {"id": i, "title": f"chat {i}", "customer_id": i % CUSTOMERS + 1, "status": ChatStatus.open}
+            for i in range(1, CHATS + 1)
+        ])
+        conn.execute(insert(Message), [
+            {
+                "chat_id": chat_id,
+                "role": MessageRole.user if m % 2 == 0 else MessageRole.assistant,
+                "content": f"message {m}",
+                "created_at": now + timedelta(seconds=m),
+            }
+            for chat_id in range(1, CHATS + 1)
+            for m in range(MESSAGES_PER_CHAT)
+        ])
+        conn.execute(insert(LoanApplication), [
+            {
+                "customer_id": i % CUSTOMERS + 1,
+                "loan_type": "consumer",
+                "amount": Decimal("100000.00"),
+                "term_months": 12,
+                "interest_rate": Decimal("24.00"),
+                "status": LoanApplicationStatus.pending,
+                "created_at": now + timedelta(hours=i),
+            }
+            for i in range(APPLICATIONS)
+        ])
+        conn.execute(insert(CardApplication), [
+            {
+                "customer_id": i % CUSTOMERS + 1,
+                "account_id": (i % CUSTOMERS) * ACCOUNTS_PER_CUSTOMER + 1,
+                "card_type": CardType.debit,
+                "card_name": "Visa Classic",
+                "status": CardApplicationStatus.pending,
+                "created_at": now + timedelta(hours=i),
+            }
+            for i in range(APPLICATIONS)
+        ])
+        # Планировщик должен видеть реальную статистику, как в рабочей БД
+        conn.execute(text("ANALYZE"))
+
+    engine.dispose()
+    return str(path)
+
+
+def _plans(db_path: str, call: Callable[[AsyncSession], Awaitable[object]]) -> List[Tuple[str, List[str]]]:
+    """Run `call` on a fresh session and return (sql, plan lines) for every SELECT it issued."""
+
+    async def run() -> List[Tuple[str, List[str]]]:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        captured: List[Tuple[str, tuple]] = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                captured.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        customer_cache.customer_profiles.clear()
+        customer_cache.customer_account_ids.clear()
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                await call(session)
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+            plans = []
+            async with engine.connect() as conn:
+                for statement, parameters in captured:
+                    rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                    plans.append((statement, [row[-1] for row in rows]))
+            return plans
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _cursor(id: int) -> Cursor:
+    """A cursor in the middle of a listing, as a deep page would send."""
+    return Cursor(created_at=datetime(2025, 1, 1) + timedelta(minutes=id), id=id)
+
+
+def _customer() -> Customer:
+    return Customer(id=CUSTOMER_ID, first_name=f"First{CUSTOMER_ID}", last_name=f"Last{CUSTOMER_ID}")
+
+
+CASES = {
+    "messages.get_last_n": lambda s: MessageRepository(s).get_last_n(CHAT_ID, 4),
+    "messages.get_by_chat_id": lambda s: MessageRepository(s).get_by_chat_id(CHAT_ID),
+    "chats.get_by_customer_id": lambda s: ChatRepository(s).get_by_customer_id(CUSTOMER_ID),
+    "customers.get_accounts_by_customer_id": lambda s: CustomerRepository(s).get_accounts_by_customer_id(CUSTOMER_ID),
+    "customers.get_cards_by_customer_id": lambda s: CustomerRepository(s).get_cards_by_customer_id(CUSTOMER_ID),
+    "customers.get_transactions_by_customer_id": lambda s: CustomerRepository(s).get_transactions_by_customer_id(
+        CUSTOMER_ID, cursor=_cursor(TRANSACTIONS // 2)
+    ),
+    "customers.get_loans_by_customer_id": lambda s: CustomerRepository(s).get_loans_by_customer_id(CUSTOMER_ID),
+    "loan_applications.get_all": lambda s: LoanApplicationRepository(s).get_all(cursor=_cursor(APPLICATIONS // 2)),
+    "card_applications.get_all": lambda s: CardApplicationRepository(s).get_all(cursor=_cursor(APPLICATIONS // 2)),
+    "customers.get_all_customers": lambda s: CustomerRepository(s).get_all_customers(cursor=_cursor(CUSTOMERS // 2)),
+    "customers.count_transactions_by_customer_id": lambda s: CustomerRepository(s).count_transactions_by_customer_id(CUSTOMER_ID),
+    "tools.get_account_ids": lambda s: customer_cache.get_account_ids(s, CUSTOMER_ID),
+    "tools.get_balance": lambda s: personal_services.get_balance(s, _customer()),
+    "tools.get_accounts_info": lambda s: personal_services.get_accounts_info(s, _customer()),
+    "tools.get_transactions": lambda s: personal_services.get_transactions(s, _customer()),
+    "tools.get_last_incoming_transaction": lambda s: personal_services.get_last_incoming_transaction(s, _customer()),
+    "tools.get_incoming_sum_for_period": lambda s: personal_services.get_incoming_sum_for_period(
+        s, _customer(), "2025-01-01", "2025-01-03"
+    ),
+    "tools.get_outgoing_sum_for_period": lambda s: personal_services.get_outgoing_sum_for_period(
+        s, _customer(), "2025-01-01", "2025-01-03"
+    ),
+    "tools.get_last_3_transfer_recipients": lambda s: personal_services.get_last_3_transfer_recipients(s, _customer()),
+    "tools.get_largest_transaction": lambda s: personal_services.get_largest_transaction(s, _customer()),
+}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_hot_query_uses_indexes(db_path, name):
+    plans = _plans(db_path, CASES[name])
+    assert plans, f"{name} issued no SELECT"
+    # Иначе при незнакомом формате плана проверка ниже прошла бы впустую
+    accesses = [line for _, plan in plans for line in plan if _TABLE_ACCESS_RE.match(line)]
+    assert accesses, f"{name}: no table access parsed from plans {plans}"
+    for statement, plan in plans:
+        # Подзапросы (UNION ALL, derived tables) SQLite показывает как "SCAN anon_1" — это не таблицы
+        subqueries = {m.group(1) for m in map(_SUBQUERY_RE.match, plan) if m}
+        scans = [
+            line for line in plan
+            if (m := _FULL_SCAN_RE.match(line)) and m.group(1) not in subqueries
+        ]
+        assert not scans, f"{name}: full table scan {scans}\n{statement}\nplan: {plan}"
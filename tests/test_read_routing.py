@@ -0,0 +1,95 @@
+"""
+Read-replica routing: RoutingSession sends reads to the replica, writes to the
+primary, and keeps a session on the primary after its first write.
+
+Two SQLite files stand in for the primary and the replica; each holds a
+customer with a different name, so the result shows which database was read.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+
+from app.db.base import Base, create_engine_from_url, make_routing_sessionmaker
+from app.db.models import Customer
+
+
+def _seed(path, first_name: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{
+            "id": 1,
+            "first_name": first_name,
+            "last_name": "Test",
+            "birth_date": date(1990, 1, 1),
+            "passport_number": "ID0000001",
+            "phone_number": "+996555000001",
+            "email": "user1@example.com",
+            "address": "Bishkek",
+            "password_hash": "x",
+        }])
+    engine.dispose()
+
+
+@pytest.fixture
+def db_urls(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    _seed(primary, "Primary")
+    _seed(replica, "Replica")
+    return f"sqlite+aiosqlite:///{primary}", f"sqlite+aiosqlite:///{replica}"
+
+
+def _run(db_urls, scenario):
+    async def run():
+        primary = create_engine_from_url(db_urls[0])
+        replica = create_engine_from_url(db_urls[1])
+        try:
+            return await scenario(make_routing_sessionmaker(primary, replica), primary)
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    return asyncio.run(run())
+
+
+async def _first_name(session) -> str:
+    return (await session.execute(select(Customer.first_name).where(Customer.id == 1))).scalar_one()
+
+
+def test_reads_go_to_replica(db_urls):
+    async def scenario(make_session, primary):
+        async with make_session() as session:
+            return await _first_name(session), (await session.get(Customer, 1)).first_name
+
+    assert _run(db_urls, scenario) == ("Replica", "Replica")
+
+
+def test_writes_go_to_primary_and_reads_stick_to_it(db_urls):
+    async def scenario(make_session, primary):
+        async with make_session() as session:
+            await session.execute(update(Customer).where(Customer.id == 1).values(last_name="Updated"))
+            # После записи сессия читает свои же изменения из основной БД
+            after_write = await _first_name(session)
+            await session.commit()
+        async with primary.connect() as conn:
+            primary_last = (await conn.execute(select(Customer.last_name))).scalar_one()
+        async with make_session() as session:
+            fresh = await _first_name(session)
+        return after_write, primary_last, fresh
+
+    assert _run(db_urls, scenario) == ("Primary", "Updated", "Replica")
+
+
+def test_orm_flush_goes_to_primary(db_urls):
+    async def scenario(make_session, primary):
+        async with make_session() as session:
+            customer = await session.get(Customer, 1)  # с реплики
+            customer.middle_name = "Flushed"
+            await session.commit()
+        async with primary.connect() as conn:
+            return (await conn.execute(select(Customer.middle_name))).scalar_one()
+
+    assert _run(db_urls, scenario) == "Flushed"
@@ -0,0 +1,52 @@
+"""
+Password hashing on the bounded bcrypt thread pool: results match the sync
+path, and jobs beyond workers + max_queue are rejected with 503.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.security import PasswordHasher
+
+
+def test_async_hash_and_verify_round_trip():
+    hasher = PasswordHasher(rounds=4, workers=2, max_queue=4)
+
+    async def scenario():
+        hashed = await hasher.hash_async("secret")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify_async("secret", hashed)
+        assert not await hasher.verify_async("wrong", hashed)
+        assert hasher.verify("secret", hashed)
+
+    try:
+        asyncio.run(scenario())
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["running"] == stats["queued"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_rejects_when_queue_is_full():
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["running"] == 1 and hasher.stats()["queued"] == 1
+        with pytest.raises(HTTPException) as exc:
+            await hasher.verify_async("secret", "$2b$04$" + "a" * 53)
+        assert exc.value.status_code == 503
+        release.set()
+        await asyncio.gather(*blocked)
+
+    try:
+        asyncio.run(scenario())
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        hasher.shutdown()
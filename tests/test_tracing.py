@@ -0,0 +1,108 @@
+"""
+Span tracing: parent/child links (also across asyncio tasks), export of a
+finished trace to the ring buffer, OTLP/JSON encoding and a stream closed by
+the client.
+"""
+
+import asyncio
+from contextlib import aclosing
+
+from app.tracing import RingBufferExporter, Tracer, otlp_payload
+
+
+def _tracer():
+    buffer = RingBufferExporter(10)
+    return Tracer(enabled=True, exporters=[buffer]), buffer
+
+
+def test_spans_nest_and_propagate_into_tasks():
+    tracer, buffer = _tracer()
+
+    async def tool(i):
+        with tracer.span("tool.execute", index=i):
+            await asyncio.sleep(0)
+
+    async def turn():
+        with tracer.span("conversation.turn") as root:
+            with tracer.span("llm.first_leg") as leg:
+                leg.event("first_token")
+            async with asyncio.TaskGroup() as tg:
+                for i in range(2):
+                    tg.create_task(tool(i))
+            root.set(outcome="tool")
+
+    asyncio.run(turn())
+
+    [summary] = buffer.recent()
+    trace = buffer.get(summary["trace_id"])
+    spans = {(s["name"], s["attributes"].get("index")): s for s in trace["spans"]}
+    root_id = spans[("conversation.turn", None)]["span_id"]
+    assert spans[("conversation.turn", None)]["parent_id"] is None
+    assert spans[("conversation.turn", None)]["attributes"] == {"outcome": "tool"}
+    assert spans[("llm.first_leg", None)]["parent_id"] == root_id
+    assert [e["name"] for e in spans[("llm.first_leg", None)]["events"]] == ["first_token"]
+    assert spans[("tool.execute", 0)]["parent_id"] == spans[("tool.execute", 1)]["parent_id"] == root_id
+    assert tracer.current() is None
+
+
+def test_otlp_payload_shape():
+    tracer, _ = _tracer()
+    captured = []
+    tracer.exporters.append(type("Capture", (), {"export": lambda self, t: captured.append(t)})())
+
+    with tracer.span("conversation.turn", chat_id=7, authenticated=True):
+        with tracer.span("tool.execute"):
+            pass
+        try:
+            with tracer.span("mcp.call"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    payload = otlp_payload(captured[0], "bank-assistant")
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {s["name"]: s for s in spans}
+    assert len(by_name["conversation.turn"]["traceId"]) == 32
+    assert "parentSpanId" not in by_name["conversation.turn"]
+    assert by_name["tool.execute"]["parentSpanId"] == by_name["conversation.turn"]["spanId"]
+    assert {"key": "chat_id", "value": {"intValue": "7"}} in by_name["conversation.turn"]["attributes"]
+    assert {"key": "authenticated", "value": {"boolValue": True}} in by_name["conversation.turn"]["attributes"]
+    assert by_name["mcp.call"]["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert int(by_name["tool.execute"]["endTimeUnixNano"]) >= int(by_name["tool.execute"]["startTimeUnixNano"])
+
+
+def test_stream_closed_by_client_marks_spans_cancelled():
+    tracer, buffer = _tracer()
+
+    async def inner():
+        with tracer.span("llm.first_leg"):
+            for i in range(10):
+                yield i
+
+    async def answer():
+        with tracer.span("conversation.turn"):
+            async with aclosing(inner()) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    async def client():
+        stream = answer()
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(client())
+
+    trace = buffer.get(buffer.recent()[0]["trace_id"])
+    assert [(s["name"], s["status"]) for s in trace["spans"]] == [
+        ("conversation.turn", "cancelled"),
+        ("llm.first_leg", "cancelled"),
+    ]
+
+
+def test_disabled_tracer_exports_nothing():
+    buffer = RingBufferExporter(10)
+    tracer = Tracer(enabled=False, exporters=[buffer])
+    with tracer.span("conversation.turn") as span:
+        span.set(outcome="plain")
+        span.event("stream_end")
+    assert buffer.recent() == []